@@ -1,27 +1,52 @@
-from collections.abc import Iterator
+import warnings
+from collections.abc import Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
 
 import h5py
 import netCDF4
-import numpy as np
-from colorama import Fore
 
+from ncompare.cache import MetadataCache
+from ncompare.digests import with_digests
+from ncompare.filters import PathFilter, matches_any
 from ncompare.getters import (
+    LazyHdf5Hierarchy,
+    detach_var_properties,
     get_and_check_variable_attributes,
     get_and_check_variable_scale_factor,
+    get_attribute_digest,
     get_root_dims,
     get_root_groups,
     get_subgroups,
+    get_var_properties,
     get_variables,
+    open_dataset,
+    walk_hdf5_hierarchy,
+)
+from ncompare.moves import UnmatchedVariable, pair_moved_variables, variable_signature
+from ncompare.parallel import run_pool
+from ncompare.results import (
+    ComparisonResult,
+    GroupDiff,
+    ListDiff,
+    PropertyDiff,
+    VariableDiff,
+    difference_status,
 )
-from ncompare.printing import Outputter
 from ncompare.sequence_operations import common_elements, count_diffs
+from ncompare.stats import STATISTICS_LABELS, format_statistics, with_statistics
 from ncompare.utility_types import (
     FileToCompare,
     GroupPair,
-    SummaryDifferenceKeys,
-    SummaryDifferencesDict,
+    Manifest,
+    ManifestGroup,
+    ValueComparison,
     VarProperties,
 )
+from ncompare.values import compare_values, compare_values_at, open_worker_files, variable_path
+
+if TYPE_CHECKING:
+    from ncompare.printing import Outputter
+    from ncompare.rendering import Renderer
 
 
 class Comparison:
@@ -29,231 +54,435 @@ class Comparison:
         self,
         file1: FileToCompare,
         file2: FileToCompare,
-        out: Outputter,
-        show_chunks: bool,
-        show_attributes: bool,
+        out: "Outputter | None" = None,
+        show_chunks: bool = False,
+        show_attributes: bool = False,
+        cache: MetadataCache | None = None,
+        compare_values: bool = False,
+        atol: float = 0.0,
+        rtol: float = 0.0,
+        sample_fraction: float | None = None,
+        sample_bytes: int | None = None,
+        seed: int = 0,
+        jobs: int | None = 1,
+        digests: bool = False,
+        statistics: bool = False,
+        fail_fast: bool = False,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        max_depth: int | None = None,
+        ignore_attributes: Sequence[str] = (),
+        detect_moves: bool = False,
     ):
-        assert file1.type == file2.type
         self.file1 = file1
         self.file2 = file2
-        self.file_types = file1.type
-        self.out: Outputter = out
+        self.file1_type = file1.type
+        self.file2_type = file2.type
+        # Where the results are displayed; None if they are only collected (see `compare`).
+        self.out = out
         self.show_chunks: bool = show_chunks
         self.show_attributes: bool = show_attributes
-
-        blank_difference_dict: SummaryDifferencesDict = {
-            "shared": 0,
-            "left": 0,
-            "right": 0,
-            "both": 0,
-            "difference_types": set(),
+        self.cache = cache
+        self.compare_values: bool = compare_values
+        # Options for `values.compare_values`.
+        self._value_options: dict[str, Any] = {
+            "atol": atol,
+            "rtol": rtol,
+            "sample_fraction": sample_fraction,
+            "sample_bytes": sample_bytes,
+            "seed": seed,
         }
-        self.num_group_diffs: SummaryDifferencesDict = blank_difference_dict.copy()
-        self.num_var_diffs: SummaryDifferencesDict = blank_difference_dict.copy()
-        self.num_attribute_diffs: SummaryDifferencesDict = blank_difference_dict.copy()
-
-        self.open_file1 = None
-        self.open_file2 = None
+        self.jobs = jobs
+        self.digests = digests
+        self.statistics = statistics
+        # Whether to stop at the first difference, e.g., when only a yes/no answer is needed.
+        self.fail_fast = fail_fast
+        # Which groups and variables are compared; excluded groups are never opened.
+        self.path_filter = PathFilter(include, exclude, max_depth)
+        # Names (or glob patterns) of attributes that are not compared, e.g., "history".
+        self.ignore_attributes = tuple(ignore_attributes)
+        # Whether to pair variables that were moved to another group, or renamed (see `moves`).
+        self.detect_moves = detect_moves
+
+        self.open_file1: netCDF4.Dataset | h5py.File | Manifest | None = None
+        self.open_file2: netCDF4.Dataset | h5py.File | Manifest | None = None
+        # For HDF5 files, the group/variable tree of each file is built once, in a single pass.
+        #   When failing fast or filtering, each group is only listed if it is reached.
+        self._hdf5_hierarchy1: Mapping[str, tuple[list[str], list[str]]] | None = None
+        self._hdf5_hierarchy2: Mapping[str, tuple[list[str], list[str]]] | None = None
+        # Value comparisons that were run ahead of the traversal, on a pool of processes,
+        #   keyed by the paths of the variable in each file.
+        self._precomputed_values: dict[tuple[str, str], ValueComparison | None] | None = None
+        # Variables found only in File A, and only in File B, when detecting moves.
+        self._only_a: list[UnmatchedVariable] = []
+        self._only_b: list[UnmatchedVariable] = []
 
     def run_through_comparisons(self) -> int:
-        """Execute a series of comparisons between two netCDF or HDF files.
+        """Execute a series of comparisons between two netCDF or HDF files, and display the results.
 
         Returns
         -------
         int
             total number of differences found (across variables, groups, and attributes)
         """
-        self._print_root_dimensions()
-        self._print_root_groups()
-
-        # Run through all the rest of the groups and variables, tallying differences along the way.
-        self.out.print(Fore.LIGHTBLUE_EX + "\nAll variables:", add_to_history=True)
-        self.out.side_by_side(" ", "File A", "File B", force_display_even_if_same=True)
+        # The renderer is imported here, so that collecting results alone does no formatting.
+        from ncompare.rendering import ResultRenderer
 
-        self._traverse_hierarchy()
-        self._print_summary()
+        if self.out is None:
+            raise ValueError("An Outputter is required to display the comparison.")
+        return self.compare(ResultRenderer(self.out)).total_diff_count
 
-        # Return the total number of differences; zero indicates no differences were found.
-        total_diff_count = sum(
-            [
-                x["left"] + x["right"]
-                for x in [self.num_var_diffs, self.num_group_diffs, self.num_attribute_diffs]
-            ]
-        )
+    def compare(self, *renderers: "Renderer") -> ComparisonResult:
+        """Compare the two files, and collect the differences into a typed result tree.
 
-        return total_diff_count
-
-    def _traverse_hierarchy(self):
-        self.out.side_by_side(
-            "All Variables", " ", " ", dash_line=False, force_display_even_if_same=True
-        )
-        self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
-
-        # Determine how the files will be opened.
-        file_opener = netCDF4.Dataset if self.file_types == "netcdf" else h5py.File
+        Parameters
+        ----------
+        renderers
+            any renderers, which are given each part of the result as soon as it is complete,
+            so that output is written while the comparison is still running
 
-        # Open and go through files.
-        with (
-            file_opener(self.file1.path, mode="r") as ds_a,
-            file_opener(self.file2.path, mode="r") as ds_b,
-        ):
+        Returns
+        -------
+        ComparisonResult
+        """
+        # Open each file only once, and share the open handles across every step below.
+        #   When a metadata cache is used, a file's cached manifest is used in place of the file.
+        with self._open(self.file1) as ds_a, self._open(self.file2) as ds_b:
             self.open_file1 = ds_a
             self.open_file2 = ds_b
+            if isinstance(ds_a, Manifest):
+                self.file1_type = "manifest"
+            if isinstance(ds_b, Manifest):
+                self.file2_type = "manifest"
+            self._check_source_types_match()
+            walk = LazyHdf5Hierarchy if self._partial else walk_hdf5_hierarchy
+            if self.file1_type == "hdf5":
+                self._hdf5_hierarchy1 = walk(ds_a)
+            if self.file2_type == "hdf5":
+                self._hdf5_hierarchy2 = walk(ds_b)
+            # The value comparisons are planned from the same hierarchies that are traversed below.
+            if self.compare_values and "manifest" in (self.file1_type, self.file2_type):
+                warnings.warn("Data values are not compared, because a manifest has no data.")
+            elif self.compare_values and self.jobs != 1 and not self.fail_fast:
+                self._precompute_var_values()
+
+            result = ComparisonResult(
+                file_a=str(self.file1.path),
+                file_b=str(self.file2.path),
+                root_dimensions=ListDiff(
+                    get_root_dims(ds_a, self.file1_type), get_root_dims(ds_b, self.file2_type)
+                ),
+                root_groups=ListDiff(
+                    get_root_groups(ds_a, self.file1_type), get_root_groups(ds_b, self.file2_type)
+                ),
+                compared_values=self.compare_values,
+            )
+            for renderer in renderers:
+                renderer.root_dimensions(result.root_dimensions)
+                renderer.root_groups(result.root_groups)
+
+            # Run through all the rest of the groups and variables, tallying differences along the way.
+            for group in self._traverse_hierarchy(result):
+                result.groups.append(group)
+                for renderer in renderers:
+                    renderer.group(group)
+                if self._should_stop(result):
+                    # The files are closed right away, without comparing the rest of them.
+                    result.complete = False
+                    break
 
-            # Start with the Root Group, printing all the variables from it.
-            group_counter = 0
-            self._print_group_details_side_by_side(
-                ds_a,
-                "/",
-                ds_b,
-                "/",
-                group_counter,
+        self.open_file1 = None
+        self.open_file2 = None
+        if self.detect_moves and result.complete:
+            self._pair_moved_variables(result)
+        self._only_a = []
+        self._only_b = []
+        self._hdf5_hierarchy1 = None
+        self._hdf5_hierarchy2 = None
+        self._precomputed_values = None
+
+        for renderer in renderers:
+            renderer.summary(result)
+
+        return result
+
+    def _open(self, file: FileToCompare) -> netCDF4.Dataset | h5py.File | Manifest:
+        if self.cache is not None:
+            # When only part of a file is compared, it is not read in full just to fill the cache.
+            return self.cache.open(
+                file,
+                digests=self.digests,
+                statistics=self.statistics,
+                extract_on_miss=not self._partial,
+            )
+        return open_dataset(file)
+
+    @property
+    def _partial(self) -> bool:
+        """Whether only part of each file may be compared, i.e., when failing fast or filtering."""
+        return self.fail_fast or bool(self.path_filter)
+
+    def _should_stop(self, result: ComparisonResult) -> bool:
+        """Whether to stop the traversal, because failing fast and a difference was found."""
+        return self.fail_fast and (result.total_diff_count > 0)
+
+    def _check_source_types_match(self) -> None:
+        """Ensure both sides describe the same type of file, even if one (or both) is a manifest."""
+        source_types = [
+            opened.source_type if isinstance(opened, Manifest) else file.type
+            for opened, file in ((self.open_file1, self.file1), (self.open_file2, self.file2))
+        ]
+        if source_types[0] != source_types[1]:
+            raise TypeError(
+                "Both files must be of the same type (either both netCDF or both HDF). "
+                f"Got <{source_types[0]}> and <{source_types[1]}>."
             )
-            group_counter += 1
 
+    def _precompute_var_values(self) -> None:
+        """Compare the values of all shared variables on a pool of processes, ahead of the traversal.
+
+        The results are looked up, and tallied, as each variable is reached in the traversal,
+        so that the output and the counts do not depend on the order in which workers finish.
+        """
+        group_pairs = [(self.open_file1, self.open_file2)] + [
+            (group_pair.group_a, group_pair.group_b)
             for group_pair in self._dataset_pair_iterator(
                 "",
-                ds_a,
-                get_subgroups(ds_a, self.file_types),
+                self.open_file1,
+                get_subgroups(self.open_file1, self.file1_type, self._hdf5_hierarchy1),
                 "",
-                ds_b,
-                get_subgroups(ds_b, self.file_types),
-            ):
-                if group_pair.group_a_name == "":
-                    self.num_group_diffs["right"] += 1
-                elif group_pair.group_b_name == "":
-                    self.num_group_diffs["left"] += 1
-                else:
-                    self.num_group_diffs["shared"] += 1
+                self.open_file2,
+                get_subgroups(self.open_file2, self.file2_type, self._hdf5_hierarchy2),
+            )
+            if (group_pair.group_a is not None) and (group_pair.group_b is not None)
+        ]
 
-                self._print_group_details_side_by_side(
-                    group_pair.group_a,
-                    group_pair.group_a_name,
-                    group_pair.group_b,
-                    group_pair.group_b_name,
-                    group_counter,
-                )
-                group_counter += 1
+        tasks = []
+        for group_a, group_b in group_pairs:
+            prefix_a = _group_path(group_a).rstrip("/")
+            prefix_b = _group_path(group_b).rstrip("/")
+            for _, varname_a, varname_b in common_elements(
+                self._get_variables(group_a, prefix_a, self.file1_type, self._hdf5_hierarchy1),
+                self._get_variables(group_b, prefix_b, self.file2_type, self._hdf5_hierarchy2),
+            ):
+                if varname_a and varname_b:
+                    tasks.append(
+                        (f"{prefix_a}/{varname_a}", f"{prefix_b}/{varname_b}", self._value_options)
+                    )
+
+        if len(tasks) < 2:
+            # Nothing is gained from a pool, so the values are compared during the traversal.
+            return
+
+        results = run_pool(
+            compare_values_at,
+            tasks,
+            jobs=self.jobs,
+            initializer=open_worker_files,
+            initargs=(self.file1, self.file2),
+        )
+        self._precomputed_values = {task[:2]: result for task, result in zip(tasks, results)}
+
+    def _traverse_hierarchy(self, result: ComparisonResult) -> Iterator[GroupDiff]:
+        """Compare each pair of groups, starting with the root group, and tally the differences."""
+        ds_a = self.open_file1
+        ds_b = self.open_file2
+
+        # Start with the Root Group, comparing all the variables from it.
+        group_counter = 0
+        yield self._compare_groups(result, ds_a, "/", ds_b, "/", group_counter)
+        group_counter += 1
+
+        for group_pair in self._dataset_pair_iterator(
+            "",
+            ds_a,
+            get_subgroups(ds_a, self.file1_type, self._hdf5_hierarchy1),
+            "",
+            ds_b,
+            get_subgroups(ds_b, self.file2_type, self._hdf5_hierarchy2),
+        ):
+            if group_pair.group_a_name == "":
+                result.group_counts["right"] += 1
+            elif group_pair.group_b_name == "":
+                result.group_counts["left"] += 1
+            else:
+                result.group_counts["shared"] += 1
+
+            yield self._compare_groups(
+                result,
+                group_pair.group_a,
+                group_pair.group_a_name,
+                group_pair.group_b,
+                group_pair.group_b_name,
+                group_counter,
+            )
+            group_counter += 1
 
-    def _print_group_details_side_by_side(
+    def _compare_groups(
         self,
+        result: ComparisonResult,
         group_a: netCDF4.Dataset | netCDF4.Group | h5py.Group,
         group_a_name: str,
         group_b: netCDF4.Dataset | netCDF4.Group | h5py.Group,
         group_b_name: str,
         group_counter: int,
-    ) -> None:
-        """Align and display group details side by side."""
-        self.out.side_by_side(
-            " ", " ", " ", dash_line=False, highlight_diff=False, force_display_even_if_same=True
-        )
-        self.out.side_by_side(
-            f"GROUP #{group_counter:02}",
-            group_a_name.strip(),
-            group_b_name.strip(),
-            dash_line=True,
-            highlight_diff=False,
-            force_display_even_if_same=True,
-        )
-
+    ) -> GroupDiff:
+        """Compare the variables of two groups."""
         # Count the number of variables in this group as long as this group exists.
         vars_a_sorted: list | str = ""
         vars_b_sorted: list | str = ""
         if group_a:
-            vars_a_sorted = get_variables(group_a, self.file_types)
+            vars_a_sorted = self._get_variables(
+                group_a, group_a_name, self.file1_type, self._hdf5_hierarchy1
+            )
         if group_b:
-            vars_b_sorted = get_variables(group_b, self.file_types)
-        self.out.side_by_side(
-            "num variables in group:",
-            len(vars_a_sorted),
-            len(vars_b_sorted),
-            highlight_diff=True,
-            force_display_even_if_same=True,
+            vars_b_sorted = self._get_variables(
+                group_b, group_b_name, self.file2_type, self._hdf5_hierarchy2
+            )
+        group = GroupDiff(
+            index=group_counter,
+            name_a=group_a_name,
+            name_b=group_b_name,
+            num_variables_a=len(vars_a_sorted),
+            num_variables_b=len(vars_b_sorted),
         )
-        self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
 
         # Count differences between the lists of variables in this group.
         left, right, shared = count_diffs(vars_a_sorted, vars_b_sorted)
-        self.num_var_diffs["left"] += left
-        self.num_var_diffs["right"] += right
-        self.num_var_diffs["shared"] += shared
+        result.variable_counts["left"] += left
+        result.variable_counts["right"] += right
+        result.variable_counts["shared"] += shared
 
         # Go through each variable in the current group.
         for variable_pair in common_elements(vars_a_sorted, vars_b_sorted):
-            # Get and print the properties of each variable
-            self._print_var_properties_side_by_side(
-                self._create_var_properties(
-                    group_a, variable_pair[1], original_dataset=self.open_file1
-                ),
-                self._create_var_properties(
-                    group_b, variable_pair[2], original_dataset=self.open_file1
-                ),
+            if self._should_stop(result):
+                break
+            # Each variable's properties are read exactly once. The open handles are only kept
+            #   long enough to compare data values; the properties are compared without them.
+            v_a = self._create_var_properties(
+                group_a,
+                variable_pair[1],
+                original_dataset=self.open_file1,
+                file_type=self.file1_type,
+            )
+            v_b = self._create_var_properties(
+                group_b,
+                variable_pair[2],
+                original_dataset=self.open_file2,
+                file_type=self.file2_type,
             )
+            values = self._compare_var_values(result, v_a, v_b)
+            v_a = detach_var_properties(v_a)
+            v_b = detach_var_properties(v_b)
+            variable = self._compare_variables(result, v_a, v_b, values)
+            group.variables.append(variable)
+
+            if self.detect_moves and not (v_a.varname and v_b.varname):
+                # Keep what is needed to pair this variable with one elsewhere in the other file.
+                if v_a.varname:
+                    path = f"{group_a_name.rstrip('/')}/{v_a.varname}"
+                    self._only_a.append(UnmatchedVariable(path, variable_signature(v_a), variable))
+                else:
+                    path = f"{group_b_name.rstrip('/')}/{v_b.varname}"
+                    self._only_b.append(UnmatchedVariable(path, variable_signature(v_b), variable))
 
-    def _print_var_properties_side_by_side(
-        self,
-        v_a: VarProperties,
-        v_b: VarProperties,
-    ) -> None:
-        """Align and display variable properties side by side."""
-        # Gather all variable property pairs first, before printing,
-        # so we can decide whether to highlight the variable header.
-        pairs_to_check_and_show = [
-            (v_a.dtype, v_b.dtype),
-            (v_a.dimensions, v_b.dimensions),
-            (v_a.shape, v_b.shape),
-        ]
-        if self.show_chunks:
-            pairs_to_check_and_show.append((v_a.chunking, v_b.chunking))
-        if self.show_attributes:
-            for attr_a_key, attr_a, attr_b_key, attr_b in get_and_check_variable_attributes(
-                v_a, v_b
-            ):
-                # Check whether attr_a_key is empty,
-                # because it might be if the variable doesn't exist in File A.
-                pairs_to_check_and_show.append((attr_a, attr_b))
-        # Scale Factor
-        scale_factor_pair = get_and_check_variable_scale_factor(v_a, v_b)
-        if scale_factor_pair:
-            pairs_to_check_and_show.append((scale_factor_pair[0], scale_factor_pair[1]))
+        return group
 
-        there_is_a_difference = False
-        for pair in pairs_to_check_and_show:
-            if pair[0] != pair[1]:
-                there_is_a_difference = True
-                break
+    def _pair_moved_variables(self, result: ComparisonResult) -> None:
+        """Pair the variables only in one file with those only in the other, as moves or renames."""
+        result.detected_moves = True
+        result.add_moved_variables(
+            (variable_a.path, variable_a.payload, variable_b.path, variable_b.payload)
+            for variable_a, variable_b in pair_moved_variables(self._only_a, self._only_b)
+        )
 
-        # If all attributes are the same, and keep-only-diffs is set -> DON'T print
-        # If all attributes are the same, and keep-only-diffs is NOT set -> print
-        # If some attributes are different -> print no matter else
-        if there_is_a_difference or (not self.out.keep_only_diffs):
-            self.out.side_by_side(
-                "-----VARIABLE-----:",
-                v_a.varname[:47],
-                v_b.varname[:47],
-                highlight_diff=False,
-                force_display_even_if_same=True,
-            )
+    def _get_variables(
+        self,
+        group: netCDF4.Dataset | netCDF4.Group | h5py.Group | ManifestGroup,
+        group_path: str,
+        file_type: str,
+        hdf5_hierarchy: Mapping[str, tuple[list[str], list[str]]] | None,
+    ) -> list:
+        """Get the variables of a group that are to be compared, i.e., that pass the path filter."""
+        variables = get_variables(group, file_type, hdf5_hierarchy)
+        if not self.path_filter:
+            return variables
+        prefix = group_path.rstrip("/")
+        return [varname for varname in variables if self.path_filter.selects(f"{prefix}/{varname}")]
+
+    def _compare_var_values(
+        self, result: ComparisonResult, v_a: VarProperties, v_b: VarProperties
+    ) -> ValueComparison | str | None:
+        """Compare the data values of two variables, if value comparisons are requested.
 
-        # Go through each attribute, show differences, and add differences to running tally.
-        def _var_attribute_side_by_side(attribute_name, attribute_a, attribute_b):
-            diff_condition: SummaryDifferenceKeys = self.out.side_by_side(
-                f"{attribute_name}:", attribute_a, attribute_b, highlight_diff=True
-            )
-            self.num_attribute_diffs[diff_condition] += 1
-            if diff_condition in ("left", "right", "both"):
-                self.num_attribute_diffs["difference_types"].add(attribute_name)
+        Returns
+        -------
+        ValueComparison, str, or None
+            the result of the comparison, or a reason why the values could not be compared,
+            or None if the values are not to be compared (e.g., the variable is only in one file)
+        """
+        if not self.compare_values or v_a.variable is None or v_b.variable is None:
+            return None
 
-        _var_attribute_side_by_side("dtype", v_a.dtype, v_b.dtype)
-        _var_attribute_side_by_side("dimensions", v_a.dimensions, v_b.dimensions)
-        _var_attribute_side_by_side("shape", v_a.shape, v_b.shape)
+        if self._precomputed_values is not None:
+            values = self._precomputed_values[
+                (variable_path(v_a.variable), variable_path(v_b.variable))
+            ]
+        else:
+            values = compare_values(v_a.variable, v_b.variable, **self._value_options)
+        if values is None:
+            if (v_a.variable.shape is None) or (v_b.variable.shape is None):
+                return "not compared (no data)"
+            return "not compared (shapes differ)"
+
+        if values.num_mismatches:
+            result.value_counts["both"] += 1
+        else:
+            result.value_counts["shared"] += 1
+        return values
+
+    def _compare_variables(
+        self,
+        result: ComparisonResult,
+        v_a: VarProperties,
+        v_b: VarProperties,
+        values: ValueComparison | str | None = None,
+    ) -> VariableDiff:
+        """Compare the properties of two variables, and add differences to the running tally."""
+        variable = VariableDiff(name_a=v_a.varname, name_b=v_b.varname, values=values)
+
+        def _compare_property(name: str, value_a, value_b, digest_a=None, digest_b=None) -> None:
+            status = difference_status(value_a, value_b)
+            if status == "shared" and digest_a and digest_b and (digest_a != digest_b):
+                # The values are shown alike (e.g., truncated), but differ somewhere in full.
+                status = "both"
+            variable.properties.append(PropertyDiff(name, value_a, value_b, status))
+            result.attribute_counts[status] += 1
+            if status != "shared":
+                result.attribute_counts["difference_types"].add(name)
+
+        _compare_property("dtype", v_a.dtype, v_b.dtype)
+        _compare_property("dimensions", v_a.dimensions, v_b.dimensions)
+        _compare_property("shape", v_a.shape, v_b.shape)
+        # Data digests
+        if self.digests:
+            _compare_property("data digest", v_a.data_digest or "", v_b.data_digest or "")
+            _compare_property("raw digest", v_a.raw_digest or "", v_b.raw_digest or "")
+        # Summary statistics
+        if self.statistics:
+            for label, statistic_a, statistic_b in zip(
+                STATISTICS_LABELS,
+                format_statistics(v_a.statistics),
+                format_statistics(v_b.statistics),
+            ):
+                _compare_property(label, statistic_a, statistic_b)
         # Chunking
         if self.show_chunks:
-            _var_attribute_side_by_side("chunksize", v_a.chunking, v_b.chunking)
+            _compare_property("chunksize", v_a.chunking, v_b.chunking)
         # Scale Factor
         scale_factor_pair = get_and_check_variable_scale_factor(v_a, v_b)
-        if scale_factor_pair:
-            _var_attribute_side_by_side("scale_factor", scale_factor_pair[0], scale_factor_pair[1])
+        if scale_factor_pair and not matches_any("scale_factor", self.ignore_attributes):
+            _compare_property("scale_factor", scale_factor_pair[0], scale_factor_pair[1])
         # Other attributes
         if self.show_attributes:
             for attr_a_key, attr_a, attr_b_key, attr_b in get_and_check_variable_attributes(
@@ -262,63 +491,17 @@ class Comparison:
                 # Check whether attr_a_key is empty,
                 # because it might be if the variable doesn't exist in File A.
                 attribute_key = attr_a_key if attr_a_key else attr_b_key
-                _var_attribute_side_by_side(attribute_key, attr_a, attr_b)
-
-    def _print_root_dimensions(self):
-        # Show the dimensions of each file and evaluate differences.
-        self.out.print(Fore.LIGHTBLUE_EX + "\nRoot-level Dimensions:", add_to_history=True)
-        list_a = get_root_dims(self.file1)
-        list_b = get_root_dims(self.file2)
-        _, _, _ = self.out.lists_diff(list_a, list_b)
-
-    def _print_root_groups(self):
-        # Show the groups in each NetCDF file and evaluate differences.
-        self.out.print(Fore.LIGHTBLUE_EX + "\nRoot-level Groups:", add_to_history=True)
-        list_a = get_root_groups(self.file1)
-        list_b = get_root_groups(self.file2)
-        _, _, _ = self.out.lists_diff(list_a, list_b)
-
-    def _print_summary(self):
-        """Print summary counts of similarities and differences."""
-        self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
-        self.out.side_by_side("SUMMARY", "-", "-", dash_line=True, force_display_even_if_same=True)
-
-        self.__print_summary_count_comparison_side_by_side("variable", self.num_var_diffs)
-        self.__print_summary_count_comparison_side_by_side("group", self.num_group_diffs)
-        self.__print_summary_count_comparison_side_by_side("attribute", self.num_attribute_diffs)
-
-        if self.num_attribute_diffs["difference_types"]:
-            self.out.print(
-                Fore.LIGHTBLUE_EX + "\nDifferences were found in these attributes:",
-                add_to_history=True,
-            )
-            self.out.print(
-                Fore.LIGHTBLUE_EX + f"\n{sorted(self.num_attribute_diffs['difference_types'])}",
-                add_to_history=True,
-            )
-
-    def __print_summary_count_comparison_side_by_side(
-        self,
-        item_type: str,
-        diff_dictionary: SummaryDifferencesDict,
-    ) -> None:
-        # Tally up instances where there were non-empty entries on both left and right sides.
-        diff_dictionary["left"] += diff_dictionary["both"]
-        diff_dictionary["right"] += diff_dictionary["both"]
-
-        self.out.side_by_side(
-            f"Total # of shared {item_type}s:",
-            str(diff_dictionary["shared"]),
-            str(diff_dictionary["shared"]),
-            force_display_even_if_same=True,
-        )
+                if matches_any(attribute_key, self.ignore_attributes):
+                    continue
+                _compare_property(
+                    attribute_key,
+                    attr_a,
+                    attr_b,
+                    get_attribute_digest(v_a, attr_a_key),
+                    get_attribute_digest(v_b, attr_b_key),
+                )
 
-        self.out.side_by_side(
-            f"Total # of non-shared {item_type}s:",
-            str(diff_dictionary["left"]),
-            str(diff_dictionary["right"]),
-            force_display_even_if_same=True,
-        )
+        return variable
 
     def _dataset_pair_iterator(
         self,
@@ -331,16 +514,24 @@ class Comparison:
     ) -> Iterator[GroupPair]:
         """Yield names and groups, as pairs, from two netCDF or HDF hierarchies.
 
+        All the subgroups of a group are yielded, and then those of each subgroup in turn
+        (depth first). The hierarchies are walked with an explicit stack rather than by recursion,
+        so there is no limit on how deep they can be, and each group is only opened once.
+
         Parameters
         ----------
         node_a_name
             name of the first group or dataset
         node_a
             the first group or dataset
+        node_a_subgroups
+            names of the subgroups of the first group
         node_b_name
             name of the second group or dataset
         node_b
             the second group or dataset
+        node_b_subgroups
+            names of the subgroups of the second group
 
         Yields
         ------
@@ -350,60 +541,87 @@ class Comparison:
             group B name : str
             group B object : netCDF4.Group or None
         """
-        # get a sorted list of subgroups from both node_a and node_b
-        for _, group_a_name, group_b_name in common_elements(
-            node_a_subgroups if node_a is not None else "",
-            node_b_subgroups if node_b is not None else "",
-        ):
-            yield GroupPair(
-                group_a_name=node_a_name + "/" + group_a_name if group_a_name else "",
-                group_a=(
-                    node_a[group_a_name]
-                    if (group_a_name and (group_a_name in node_a_subgroups))
-                    else None
+        subgroup_pairs = self._align_subgroups(
+            node_a_name, node_a, node_a_subgroups, node_b_name, node_b, node_b_subgroups
+        )
+        yield from subgroup_pairs
+
+        # Each entry holds the subgroup pairs of one group, which are descended into one at a time.
+        stack = [iter(subgroup_pairs)]
+        while stack:
+            group_pair = next(stack[-1], None)
+            if group_pair is None:
+                stack.pop()
+                continue
+
+            subgroup_pairs = self._align_subgroups(
+                group_pair.group_a_name,
+                group_pair.group_a,
+                get_subgroups(
+                    group_pair.group_a,
+                    file_type=self.file1_type,
+                    hdf5_hierarchy=self._hdf5_hierarchy1,
                 ),
-                group_b_name=node_b_name + "/" + group_b_name if group_b_name else "",
-                group_b=(
-                    node_b[group_b_name]
-                    if (group_b_name and (group_b_name in node_b_subgroups))
-                    else None
+                group_pair.group_b_name,
+                group_pair.group_b,
+                get_subgroups(
+                    group_pair.group_b,
+                    file_type=self.file2_type,
+                    hdf5_hierarchy=self._hdf5_hierarchy2,
                 ),
             )
+            yield from subgroup_pairs
+            stack.append(iter(subgroup_pairs))
 
+    def _align_subgroups(
+        self,
+        node_a_name: str,
+        node_a: netCDF4.Dataset | netCDF4.Group | h5py.Group | None,
+        node_a_subgroups: list,
+        node_b_name: str,
+        node_b: netCDF4.Dataset | netCDF4.Group | h5py.Group | None,
+        node_b_subgroups: list,
+    ) -> list[GroupPair]:
+        """Pair up the subgroups of two groups by name, and open each of them (once).
+
+        A group that is only in one file is paired with None, and an empty name.
+        """
+        pairs = []
         for _, subgroup_a_name, subgroup_b_name in common_elements(
             node_a_subgroups if node_a is not None else "",
             node_b_subgroups if node_b is not None else "",
         ):
-            subnode_a_name = node_a_name + "/" + subgroup_a_name if subgroup_a_name else ""
-            subnode_a = (
-                node_a[subgroup_a_name]
-                if (subgroup_a_name and (subgroup_a_name in node_a_subgroups))
-                else None
-            )
-            subnode_a_subgroups = get_subgroups(subnode_a, file_type=self.file_types)
-
-            subnode_b_name = node_a_name + "/" + subgroup_b_name if subgroup_b_name else ""
-            subnode_b = (
-                node_b[subgroup_b_name]
-                if (subgroup_b_name and (subgroup_b_name in node_b_subgroups))
-                else None
-            )
-            subnode_b_subgroups = get_subgroups(subnode_b, file_type=self.file_types)
-
-            yield from self._dataset_pair_iterator(
-                subnode_a_name,
-                subnode_a,
-                subnode_a_subgroups,
-                subnode_b_name,
-                subnode_b,
-                subnode_b_subgroups,
+            # Filtered-out subgroups are skipped before they are opened, along with their subtrees.
+            if self._prunes_subgroup(node_a_name, subgroup_a_name, node_b_name, subgroup_b_name):
+                continue
+            subgroup_a = node_a[subgroup_a_name] if subgroup_a_name and node_a is not None else None
+            subgroup_b = node_b[subgroup_b_name] if subgroup_b_name and node_b is not None else None
+            pairs.append(
+                GroupPair(
+                    group_a_name=f"{node_a_name}/{subgroup_a_name}" if subgroup_a_name else "",
+                    group_a=subgroup_a,
+                    group_b_name=f"{node_b_name}/{subgroup_b_name}" if subgroup_b_name else "",
+                    group_b=subgroup_b,
+                )
             )
+        return pairs
+
+    def _prunes_subgroup(
+        self, node_a_name: str, subgroup_a_name: str, node_b_name: str, subgroup_b_name: str
+    ) -> bool:
+        """Whether a pair of subgroups is filtered out, and so is neither opened nor walked."""
+        if not self.path_filter:
+            return False
+        if subgroup_a_name:
+            return self.path_filter.prunes(f"{node_a_name}/{subgroup_a_name}")
+        return self.path_filter.prunes(f"{node_b_name}/{subgroup_b_name}")
 
     def _create_var_properties(
         self,
-        group: netCDF4.Dataset | netCDF4.Group | h5py.Dataset | h5py.Group,
+        group: netCDF4.Dataset | netCDF4.Group | h5py.Dataset | h5py.Group | ManifestGroup,
         varname: str,
         original_dataset,
+        file_type: str,
     ) -> VarProperties:
         """Get the properties of a variable.
 
@@ -413,78 +631,25 @@ class Comparison:
             a dataset or group of variables
         varname
             the name of the variable
+        original_dataset
+            the file that contains the group, used to resolve HDF5 object references
+        file_type
+            the type of the file that contains the group
 
         Returns
         -------
         VarProperties
         """
-        if varname:
-            if self.file_types == "netcdf":
-                the_variable = group.variables[varname]
-            elif self.file_types == "hdf5":
-                the_variable = group[varname]
-
-            v_dtype = str(the_variable.dtype)
-
-            if self.file_types == "netcdf":
-                v_dimensions = str(the_variable.dimensions)
-            elif self.file_types == "hdf5":
-                dim_list: list[str] = []
-                for dim in the_variable.dims:
-                    try:
-                        dim_list.append(dim.label)
-                    except RuntimeError:
-                        dim_list.append("none")
-
-                v_dimensions = str(dim_list)
-
-            v_shape = str(the_variable.shape).strip()
-
-            if self.file_types == "netcdf":
-                v_chunking = str(the_variable.chunking()).strip()
-            elif self.file_types == "hdf5":
-                v_chunking = str(the_variable.chunks)
-
-            def __name_from_h5_ref(ref):
-                return original_dataset[ref].name
-
-            v_attributes = {}
-            if self.file_types == "netcdf":
-                for name in the_variable.ncattrs():
-                    try:
-                        retrieved_value = the_variable.getncattr(name)
-                    except KeyError as key_err:
-                        # Added this check because of "unsupported datatype" error that prevented
-                        # fully running comparisons on S5P_OFFL_L1B_IR_UVN collections.
-                        retrieved_value = f"netCDF error: {str(key_err)}"
-
-                    v_attributes[name] = retrieved_value
-            elif self.file_types == "hdf5":
-                for name in the_variable.attrs.keys():
-                    attribute_value = the_variable.attrs[name]
-                    if isinstance(attribute_value, np.ndarray):
-                        if attribute_value.dtype == h5py.ref_dtype:
-                            retrieved_value = __name_from_h5_ref(attribute_value[0][0])
-                        else:
-                            try:
-                                retrieved_value = str(
-                                    [__name_from_h5_ref(a[0]) for a in attribute_value]
-                                )
-                            except IndexError:
-                                retrieved_value = str(attribute_value)
-
-                    else:
-                        retrieved_value = str(attribute_value)
-
-                    v_attributes[name] = retrieved_value
-        else:
-            the_variable = None
-            v_dtype = ""
-            v_dimensions = ""
-            v_shape = ""
-            v_chunking = ""
-            v_attributes = None
-
-        return VarProperties(
-            varname, the_variable, v_dtype, v_dimensions, v_shape, v_chunking, v_attributes
-        )
+        properties = get_var_properties(group, varname, file_type, original_dataset)
+        if self.digests:
+            properties = with_digests(properties)
+        if self.statistics:
+            properties = with_statistics(properties)
+        return properties
+
+
+def _group_path(group: netCDF4.Dataset | netCDF4.Group | h5py.Group) -> str:
+    """Get the full path of an open netCDF or HDF5 group, e.g., "/group/subgroup"."""
+    if isinstance(group, h5py.Group):
+        return group.name
+    return group.path
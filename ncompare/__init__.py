@@ -26,13 +26,40 @@
 """Main code for comparing NetCDF files."""
 
 from importlib.metadata import version
+from typing import TYPE_CHECKING
 
-from .core import (
-    compare,
-)
+if TYPE_CHECKING:
+    from .batch import compare_many
+    from .core import compare, diff
+    from .manifest import write_manifest
 
 __all__ = [
     "compare",
+    "compare_many",
+    "diff",
+    "write_manifest",
 ]
 
 __version__ = version("ncompare")
+
+
+def __getattr__(name: str):
+    # The comparison machinery (and its dependencies, e.g., netCDF4 and h5py) is imported lazily,
+    # on first access, so that importing the package (e.g., for `ncompare --version`) stays fast.
+    if name == "compare":
+        from .core import compare
+
+        return compare
+    if name == "diff":
+        from .core import diff
+
+        return diff
+    if name == "compare_many":
+        from .batch import compare_many
+
+        return compare_many
+    if name == "write_manifest":
+        from .manifest import write_manifest
+
+        return write_manifest
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
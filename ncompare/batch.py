@@ -0,0 +1,405 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Compare many pairs of files, e.g., two directories of granules, on a pool of processes."""
+
+import contextlib
+import csv
+import os
+import re
+import traceback
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from ncompare.core import compare
+from ncompare.getters import open_dataset
+from ncompare.manifest import extract_manifest
+from ncompare.parallel import run_pool
+from ncompare.path_and_string_operations import ensure_valid_path_exists, validate_file_type
+from ncompare.utility_types import Manifest
+
+BATCH_OUTPUT_FORMATS = ("txt", "csv", "xlsx", "ndjson", "parquet")
+
+# The Parquet files of all pairs are written to this directory, which is read as one dataset.
+PARQUET_DATASET_DIR = "comparisons.parquet"
+
+
+@dataclass
+class PairResult:
+    """The outcome of comparing one pair of files."""
+
+    path_a: str
+    path_b: str
+    total_diff_count: int | None = None
+    error: str = ""
+
+
+def pair_files(
+    dir_a: str | Path,
+    dir_b: str | Path,
+    pattern: str = "*",
+    regex: str | None = None,
+    replacement: str | None = None,
+) -> list[tuple[Path, Path | None]]:
+    """Pair each file in one directory with its counterpart in another directory.
+
+    Parameters
+    ----------
+    dir_a
+        directory of the first (e.g., previous version) files
+    dir_b
+        directory of the second (e.g., new version) files
+    pattern
+        glob pattern, relative to `dir_a`, that selects which files to compare (e.g., "**/*.nc")
+    regex
+        optional regular expression that is applied to each file's path relative to `dir_a`...
+    replacement
+        ...and replaced by this template to get the counterpart's path relative to `dir_b`,
+        e.g., regex="_v01\\.nc$" and replacement="_v02.nc".
+        Without a regex, files are paired by having the same relative path.
+
+    Returns
+    -------
+    list
+        (file A, file B) pairs, sorted by file A, where file B is None if there is no counterpart
+    """
+    dir_a, dir_b = Path(dir_a), Path(dir_b)
+    for directory in (dir_a, dir_b):
+        if not directory.is_dir():
+            raise NotADirectoryError(f"Expected directory does not exist: {directory}")
+    if (regex is None) != (replacement is None):
+        raise ValueError("A regex and a replacement must be given together.")
+
+    compiled = re.compile(regex) if regex is not None else None
+
+    pairs: list[tuple[Path, Path | None]] = []
+    for path_a in sorted(p for p in dir_a.glob(pattern) if p.is_file()):
+        relative = path_a.relative_to(dir_a).as_posix()
+        if compiled is not None:
+            relative = compiled.sub(replacement, relative)  # type: ignore[arg-type]
+        path_b = dir_b / relative
+        pairs.append((path_a, path_b if path_b.is_file() else None))
+
+    return pairs
+
+
+def _report_stem(path_a: Path, root: Path | None) -> str:
+    """Create a unique, flat file name (without suffix) for the report of a pair of files."""
+    relative = path_a.relative_to(root) if root is not None else Path(path_a.name)
+    return "__".join(relative.with_suffix("").parts)
+
+
+def _candidate_report_stems(candidates: list[Path]) -> list[str]:
+    """Create a unique, flat file name (without suffix) for the report of each candidate.
+
+    A candidate's report is named after the candidate's file name; candidates that share a file
+    name are named after their paths relative to their common directory instead, e.g.,
+    "a__granule" and "b__granule" for "a/granule.nc" and "b/granule.nc".
+    Any name that is still not unique (e.g., a candidate given twice) gets a numeric suffix.
+    """
+    indices_by_stem: dict[str, list[int]] = defaultdict(list)
+    for index, candidate in enumerate(candidates):
+        indices_by_stem[_report_stem(candidate, None)].append(index)
+
+    stems = [""] * len(candidates)
+    for stem, indices in indices_by_stem.items():
+        if len(indices) == 1:
+            stems[indices[0]] = stem
+            continue
+        paths = [candidates[index].absolute() for index in indices]
+        try:
+            root: Path | None = Path(os.path.commonpath([path.parent for path in paths]))
+        except ValueError:  # e.g., paths on different drives
+            root = None
+        for index, path in zip(indices, paths, strict=True):
+            stems[index] = _report_stem(path, root)
+
+    used: set[str] = set()
+    for index, stem in enumerate(stems):
+        unique, suffix = stem, 1
+        while unique in used:
+            suffix += 1
+            unique = f"{stem}__{suffix}"
+        used.add(unique)
+        stems[index] = unique
+    return stems
+
+
+def _report_kwargs(output_dir: Path, stem: str, formats: tuple[str, ...]) -> dict[str, Path]:
+    """Get the `compare` keyword arguments that write each report format for one pair of files."""
+    for output_format in formats:
+        if output_format not in BATCH_OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output format <{output_format}>.")
+    return {
+        f"file_{'text' if fmt == 'txt' else fmt}": (
+            output_dir / PARQUET_DATASET_DIR / f"{stem}.parquet"
+            if fmt == "parquet"
+            else output_dir / f"{stem}.{fmt}"
+        )
+        for fmt in formats
+    }
+
+
+def _make_output_dir(output_dir: Path, formats: tuple[str, ...]) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if "parquet" in formats:
+        (output_dir / PARQUET_DATASET_DIR).mkdir(exist_ok=True)
+
+
+def _compare_pair(task: tuple[Path | Manifest, Path, dict]) -> PairResult:
+    """Compare one pair of files, quietly, in a worker process."""
+    path_a, path_b, compare_kwargs = task
+    name_a = path_a.source if isinstance(path_a, Manifest) else str(path_a)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                total_diff_count = compare(path_a, path_b, no_color=True, **compare_kwargs)
+        return PairResult(name_a, str(path_b), total_diff_count=total_diff_count)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return PairResult(name_a, str(path_b), error=traceback.format_exc(limit=1).strip())
+
+
+# The reference structure for `compare_many`, which is sent to each worker process only once.
+_worker_reference: Manifest | None = None
+
+
+def _set_worker_reference(reference: Manifest) -> None:
+    global _worker_reference  # pylint: disable=global-statement
+    _worker_reference = reference
+
+
+def _compare_with_reference(task: tuple[Path, dict]) -> PairResult:
+    """Compare a candidate file with the reference structure held by this worker process."""
+    path_b, compare_kwargs = task
+    assert _worker_reference is not None
+    return _compare_pair((_worker_reference, path_b, compare_kwargs))
+
+
+def compare_pairs(
+    pairs: Iterable[tuple[Path, Path | None]],
+    output_dir: str | Path,
+    jobs: int | None = None,
+    formats: Iterable[str] = ("txt",),
+    relative_to: str | Path | None = None,
+    **compare_kwargs,
+) -> list[PairResult]:
+    """Compare pairs of files on a pool of processes, and write a report for each pair.
+
+    Parameters
+    ----------
+    pairs
+        (file A, file B) pairs; a pair whose file B is None is reported as missing a counterpart
+    output_dir
+        directory to which the per-pair reports and the aggregated `summary.csv` are written
+    jobs
+        number of worker processes; by default, the number of CPUs available to this process
+    formats
+        which report files to write for each pair, any of "txt", "csv", "xlsx", "ndjson",
+        and "parquet"; the Parquet files of all pairs are written to one dataset directory,
+        `comparisons.parquet`
+    relative_to
+        optional directory of the first files, used to give unique names to the per-pair reports
+    compare_kwargs
+        additional keyword arguments that are passed to `ncompare.compare`,
+        e.g., only_diffs, show_chunks, or show_attributes
+
+    Returns
+    -------
+    list
+        a PairResult for each pair, in the same order as the pairs
+    """
+    output_dir = Path(output_dir)
+    formats = tuple(formats)
+    _make_output_dir(output_dir, formats)
+
+    root = Path(relative_to) if relative_to is not None else None
+    results: list[PairResult | None] = []
+    tasks = []
+    for path_a, path_b in pairs:
+        if path_b is None:
+            results.append(PairResult(str(path_a), "", error="No matching file to compare with."))
+            continue
+        report_kwargs = _report_kwargs(output_dir, _report_stem(Path(path_a), root), formats)
+        tasks.append((Path(path_a), Path(path_b), {**compare_kwargs, **report_kwargs}))
+        results.append(None)
+
+    # Fill in the placeholders with the comparison results, which are returned in task order.
+    compared = iter(run_pool(_compare_pair, tasks, jobs=jobs))
+    final_results = [result if result is not None else next(compared) for result in results]
+
+    write_summary(final_results, output_dir / "summary.csv")
+
+    return final_results
+
+
+def compare_directories(
+    dir_a: str | Path,
+    dir_b: str | Path,
+    output_dir: str | Path,
+    pattern: str = "*",
+    regex: str | None = None,
+    replacement: str | None = None,
+    jobs: int | None = None,
+    formats: Iterable[str] = ("txt",),
+    **compare_kwargs,
+) -> list[PairResult]:
+    """Compare every file in one directory with its counterpart in another directory.
+
+    Files are paired with `pair_files` (see there for the `pattern`, `regex`, and `replacement`
+    arguments), and then compared with `compare_pairs` (see there for the other arguments).
+
+    Returns
+    -------
+    list
+        a PairResult for each file selected from `dir_a`
+    """
+    pairs = pair_files(dir_a, dir_b, pattern=pattern, regex=regex, replacement=replacement)
+    return compare_pairs(
+        pairs, output_dir, jobs=jobs, formats=formats, relative_to=dir_a, **compare_kwargs
+    )
+
+
+def compare_many(
+    reference: str | Path,
+    candidates: Iterable[str | Path],
+    jobs: int | None = 1,
+    output_dir: str | Path | None = None,
+    formats: Iterable[str] = ("txt",),
+    **compare_kwargs,
+) -> list[PairResult]:
+    """Compare many candidate files with one reference file, whose structure is only read once.
+
+    The structure of the reference is extracted into memory (as a manifest) a single time,
+    and then every candidate is compared against that in-memory structure.
+    Because a manifest holds no data, data values cannot be compared (`compare_values`);
+    digests and statistics can, but a reference that is a manifest must have recorded them.
+
+    Parameters
+    ----------
+    reference
+        filepath to the reference netCDF or HDF file, or to a manifest of it
+    candidates
+        filepaths to the netCDF or HDF files to compare with the reference
+    jobs
+        number of worker processes; if None, the number of CPUs available to this process
+    output_dir
+        optional directory to which a report per candidate, and the aggregated `summary.csv`,
+        are written
+    formats
+        which report files to write for each candidate, any of "txt", "csv", "xlsx", "ndjson",
+        and "parquet"; the Parquet files of all candidates are written to one dataset directory,
+        `comparisons.parquet`
+    compare_kwargs
+        additional keyword arguments that are passed to `ncompare.compare`,
+        e.g., only_diffs, show_chunks, or show_attributes
+
+    Returns
+    -------
+    list
+        a PairResult for each candidate, in the same order as the candidates
+
+    Raises
+    ------
+    ValueError
+        if `compare_values` is requested, or if digests or statistics are requested but the
+        reference is a manifest that did not record them
+    """
+    if compare_kwargs.get("compare_values", False):
+        raise ValueError(
+            "Data values cannot be compared with compare_many, because the reference is read "
+            "as a manifest, which has no data; use compare_directories or compare instead."
+        )
+
+    reference_file = validate_file_type(ensure_valid_path_exists(reference))
+    with open_dataset(reference_file) as dataset:
+        reference_manifest = extract_manifest(
+            dataset,
+            reference_file.type,
+            source=str(reference_file.path),
+            digests=compare_kwargs.get("digests", False),
+            statistics=compare_kwargs.get("statistics", False),
+        )
+    for option in ("digests", "statistics"):
+        if compare_kwargs.get(option, False) and not getattr(reference_manifest, option):
+            raise ValueError(
+                f"The reference manifest <{reference_file.path}> has no {option}; "
+                f"write it with {option}=True to compare {option}."
+            )
+
+    formats = tuple(formats)
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        _make_output_dir(output_dir, formats)
+
+    candidate_paths = [Path(candidate) for candidate in candidates]
+    tasks = []
+    for candidate, stem in zip(
+        candidate_paths, _candidate_report_stems(candidate_paths), strict=True
+    ):
+        report_kwargs = _report_kwargs(output_dir, stem, formats) if output_dir is not None else {}
+        tasks.append((candidate, {**compare_kwargs, **report_kwargs}))
+
+    results = run_pool(
+        _compare_with_reference,
+        tasks,
+        jobs=jobs,
+        initializer=_set_worker_reference,
+        initargs=(reference_manifest,),
+    )
+
+    if output_dir is not None:
+        write_summary(results, output_dir / "summary.csv")
+
+    return results
+
+
+def write_summary(results: list[PairResult], filename: str | Path) -> None:
+    """Save the difference counts of all compared pairs to a CSV file, with a final total row."""
+    with open(filename, "w", encoding="utf-8", newline="") as target:
+        writer = csv.writer(target)
+        writer.writerow(["File A", "File B", "Total differences", "Error"])
+        for result in results:
+            writer.writerow(
+                [
+                    result.path_a,
+                    result.path_b,
+                    "" if result.total_diff_count is None else result.total_diff_count,
+                    result.error,
+                ]
+            )
+        writer.writerow(["TOTAL", "", summarize(results)["total_differences"], ""])
+
+
+def summarize(results: list[PairResult]) -> dict[str, int]:
+    """Aggregate the outcomes of many comparisons into overall counts."""
+    return {
+        "pairs": len(results),
+        "pairs_with_differences": sum(1 for r in results if r.total_diff_count),
+        "pairs_without_differences": sum(1 for r in results if r.total_diff_count == 0),
+        "errors": sum(1 for r in results if r.error),
+        "total_differences": sum(r.total_diff_count or 0 for r in results),
+    }
@@ -0,0 +1,216 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""A persistent, size-bounded, on-disk cache of the metadata extracted from compared files."""
+
+import hashlib
+import json
+import os
+import re
+import time
+import warnings
+from pathlib import Path
+
+import h5py
+import netCDF4
+
+from ncompare.getters import open_dataset
+from ncompare.manifest import extract_manifest, manifest_from_dict, manifest_to_dict
+from ncompare.utility_types import FileToCompare, Manifest
+
+DEFAULT_CACHE_SIZE_MB = 256
+
+# Number of bytes read from each end of a file to compute its (optional) content fingerprint.
+_FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+# Names of the entries, and of the temporary files they are first written to, that this cache owns;
+#   no other file in the cache directory is ever deleted.
+_ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.json")
+_TEMPORARY_NAME = re.compile(r"[0-9a-f]{64}\.\d+\.tmp")
+# A temporary file this old is left over from an interrupted write, rather than being written.
+_STALE_TEMPORARY_SECONDS = 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Get the default cache location, which follows the XDG base directory convention."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    return (Path(cache_home) if cache_home else Path.home() / ".cache") / "ncompare"
+
+
+class MetadataCache:
+    """An on-disk cache of file manifests, bounded in size with least-recently-used eviction.
+
+    Entries are keyed by a file's resolved path, size, and modification time,
+    and optionally by a fingerprint of its content, so that a changed file is never matched.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_size_mb: int | float = DEFAULT_CACHE_SIZE_MB,
+        fingerprint: bool = False,
+    ):
+        """Set up the cache.
+
+        Parameters
+        ----------
+        directory
+            where cached entries are stored; by default, see `default_cache_dir`
+        max_size_mb
+            the cache is trimmed to this many megabytes, by evicting the least recently used entries
+        fingerprint
+            whether to also key entries by a hash of the first and last megabyte of each file
+        """
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.fingerprint = fingerprint
+
+    def key(self, path: str | Path) -> str:
+        """Compute the cache key that identifies a file in its current state."""
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        identity = f"{resolved}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        if self.fingerprint:
+            identity += f"\0{_content_fingerprint(resolved, stat.st_size)}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, path: str | Path) -> Manifest | None:
+        """Get the cached manifest of a file, or None if there is no (valid) entry for it."""
+        entry = self._entry_path(self.key(path))
+        try:
+            with open(entry, encoding="utf-8") as source:
+                manifest = manifest_from_dict(json.load(source))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # An unreadable or outdated entry is treated as a miss, and is dropped.
+            entry.unlink(missing_ok=True)
+            return None
+
+        # Mark the entry as recently used.
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return manifest
+
+    def put(self, path: str | Path, manifest: Manifest) -> None:
+        """Store the manifest of a file, and then evict old entries if the cache is too large."""
+        entry = self._entry_path(self.key(path))
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent readers never see a partial entry.
+            temporary = entry.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "w", encoding="utf-8") as target:
+                json.dump(manifest_to_dict(manifest), target, separators=(",", ":"))
+            os.replace(temporary, entry)
+        except OSError as err:
+            warnings.warn(f"Unable to write to the metadata cache at <{self.directory}>: {err}")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits within its maximum size.
+
+        Only files that the cache wrote are deleted: its entries, and any temporary files
+        left over from interrupted writes. Other files in the cache directory are left alone.
+        """
+        try:
+            files = list(self.directory.iterdir())
+        except OSError:
+            return
+
+        entries = []
+        stale_before = time.time() - _STALE_TEMPORARY_SECONDS
+        for entry in files:
+            is_temporary = _TEMPORARY_NAME.fullmatch(entry.name) is not None
+            if not (is_temporary or _ENTRY_NAME.fullmatch(entry.name)):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if is_temporary:
+                if stat.st_mtime < stale_before:
+                    entry.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+    def open(
+        self,
+        file: FileToCompare,
+        digests: bool = False,
+        statistics: bool = False,
+        extract_on_miss: bool = True,
+    ) -> netCDF4.Dataset | h5py.File | Manifest:
+        """Get the manifest of a file from the cache, extracting (and caching) it on a miss.
+
+        If digests or statistics are requested, a cached manifest that lacks them is treated as a miss.
+        If `extract_on_miss` is False, the file itself is opened on a miss, and nothing is cached.
+        """
+        if file.type == "manifest":
+            return open_dataset(file)
+
+        manifest = self.get(file.path)
+        if (
+            (manifest is None)
+            or (digests and not manifest.digests)
+            or (statistics and not manifest.statistics)
+        ):
+            if not extract_on_miss:
+                return open_dataset(file)
+            with open_dataset(file) as dataset:
+                manifest = extract_manifest(
+                    dataset,
+                    file.type,
+                    source=str(file.path),
+                    digests=digests,
+                    statistics=statistics,
+                )
+            self.put(file.path, manifest)
+
+        return manifest
+
+
+def _content_fingerprint(path: Path, size: int) -> str:
+    """Hash the first and last block of a file, which is cheap even for very large files."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        digest.update(source.read(_FINGERPRINT_BLOCK_SIZE))
+        if size > _FINGERPRINT_BLOCK_SIZE:
+            source.seek(max(size - _FINGERPRINT_BLOCK_SIZE, _FINGERPRINT_BLOCK_SIZE))
+            digest.update(source.read(_FINGERPRINT_BLOCK_SIZE))
+    return digest.hexdigest()
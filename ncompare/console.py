@@ -32,8 +32,6 @@ import sys
 import traceback
 from collections.abc import Sequence
 
-from ncompare.core import compare
-
 __version__ = importlib.metadata.version("ncompare")
 
 
@@ -48,8 +46,8 @@ def _cli(args: Sequence[str] | None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Compare the variables contained within two different netCDF datasets"
     )
-    parser.add_argument("path_a", help="First (netCDF or HDF) file")
-    parser.add_argument("path_b", help="Second (netCDF or HDF) file")
+    parser.add_argument("path_a", help="First (netCDF or HDF) file, or a manifest (.json) file")
+    parser.add_argument("path_b", help="Second (netCDF or HDF) file, or a manifest (.json) file")
     parser.add_argument(
         "--only-diffs",
         action="store_true",
@@ -59,9 +57,31 @@ def _cli(args: Sequence[str] | None) -> argparse.Namespace:
     parser.add_argument("--file-text", help="A text file to which the output will be written.")
     parser.add_argument(
         "--file-csv",
-        help="A csv (comma separated values) file to which the output will be written.",
+        help="A csv (comma separated values) file to which the output will be written, "
+        "as it is produced; it is compressed if the name ends with '.gz' or '.zst'.",
+    )
+    parser.add_argument(
+        "--file-xlsx",
+        help="An Excel file to which the output will be written, as it is produced; "
+        "sheets are added automatically when one is full.",
+    )
+    parser.add_argument(
+        "--file-ndjson",
+        help="A newline-delimited JSON file, to which a record of each group, variable, and "
+        "property comparison is written as it is produced; it is compressed if the name ends "
+        "with '.gz' or '.zst'. Use '-' to write the records to stdout instead of the usual output.",
+    )
+    parser.add_argument(
+        "--file-parquet",
+        help="A Parquet file to which a row for each compared property is written "
+        "(requires the `pyarrow` package).",
+    )
+    parser.add_argument(
+        "--xlsx-sheet-per-group",
+        action="store_true",
+        default=False,
+        help="Put each group (and the summary) on its own sheet of the Excel file",
     )
-    parser.add_argument("--file-xlsx", help="An Excel file to which the output will be written.")
     parser.add_argument(
         "--no-color",
         action="store_true",
@@ -89,6 +109,114 @@ def _cli(args: Sequence[str] | None) -> argparse.Namespace:
         help="Width, in number of characters, of the three columns in the comparison report",
     )
 
+    parser.add_argument(
+        "--manifest-a",
+        help="A manifest (.json) file to which the structure of the first file will be written.",
+    )
+    parser.add_argument(
+        "--manifest-b",
+        help="A manifest (.json) file to which the structure of the second file will be written.",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Bypass the persistent metadata cache, and always read metadata from the files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory of the metadata cache (default: ~/.cache/ncompare, or under $XDG_CACHE_HOME)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=256,
+        help="Maximum size of the metadata cache, in megabytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-fingerprint",
+        action="store_true",
+        default=False,
+        help="Also identify cached files by a hash of their content, not only path, size, and mtime",
+    )
+    parser.add_argument(
+        "--compare-values",
+        action="store_true",
+        default=False,
+        help="Also compare the data values of shared variables, one block of chunks at a time",
+    )
+    parser.add_argument(
+        "--atol",
+        type=float,
+        default=0.0,
+        help="Absolute tolerance for comparing numeric data values (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rtol",
+        type=float,
+        default=0.0,
+        help="Relative tolerance for comparing numeric data values (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sample-fraction",
+        type=float,
+        default=None,
+        help="Only compare the data values of this fraction (0 to 1) of each variable's chunks, "
+        "chosen at random",
+    )
+    parser.add_argument(
+        "--sample-bytes",
+        type=int,
+        default=None,
+        help="Only compare about this many bytes of each variable's data values, "
+        "in chunks chosen at random",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for choosing the sampled chunks, for reproducible results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for comparing data values; "
+        "0 means the number of CPUs available (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--digests",
+        action="store_true",
+        default=False,
+        help="Show digests of the data of each variable (decoded, and as stored), "
+        "which are also saved in any manifest that is written",
+    )
+    parser.add_argument(
+        "--statistics",
+        action="store_true",
+        default=False,
+        help="Show the min, max, mean, std, NaN count, and fill-value count of each variable, "
+        "which are also saved in any manifest that is written",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        default=False,
+        help="Print nothing, and exit with status 0 if the files are the same, "
+        "1 if they differ, or 2 if there is an error",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        default=False,
+        help="Stop at the first difference, e.g., for a quick yes/no check in CI; implies --quiet",
+    )
+
+    _add_filter_arguments(parser)
+
     parser.add_argument(
         "--version",
         action="version",
@@ -100,18 +228,277 @@ def _cli(args: Sequence[str] | None) -> argparse.Namespace:
     return parser.parse_args(args)
 
 
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that select which groups, variables, and attributes are compared,
+    and how variables in one file are matched with those in the other.
+    """
+    parser.add_argument(
+        "--include",
+        nargs="+",
+        action="extend",
+        default=[],
+        metavar="PATTERN",
+        help="Only compare the groups and variables whose paths match these glob patterns "
+        "(or regular expressions, if prefixed with 're:'), e.g., '/gt1l' or '*/h_li'",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        action="extend",
+        default=[],
+        metavar="PATTERN",
+        help="Do not compare (or open) the groups and variables whose paths match these patterns",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Only compare this many levels of groups below the root group (0: the root group only)",
+    )
+    parser.add_argument(
+        "--ignore-attributes",
+        nargs="+",
+        action="extend",
+        default=[],
+        metavar="NAME",
+        help="Do not compare the variable attributes with these names (or glob patterns), "
+        "e.g., 'history' and 'date_created'",
+    )
+    parser.add_argument(
+        "--detect-moves",
+        action="store_true",
+        default=False,
+        help="Pair variables that were likely moved to another group, or renamed, "
+        "and count each pair as one difference",
+    )
+
+
+def _batch_cli(args: Sequence[str] | None) -> argparse.Namespace:
+    """Parse input arguments for comparing two directories of files from the command line.
+
+    Parameters
+    ----------
+    args
+        if None, then argparse will use `sys.argv[1:]`
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare every (netCDF or HDF) file in one directory "
+        "with its counterpart in another directory"
+    )
+    parser.add_argument("dir_a", help="Directory of the first (e.g., previous version) files")
+    parser.add_argument("dir_b", help="Directory of the second (e.g., new version) files")
+    parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="Directory to which a report per pair, and the summary.csv, will be written.",
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*",
+        help="Glob pattern that selects the files to compare from dir_a (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--regex",
+        default=None,
+        help="Regular expression applied to each file name from dir_a, to find its counterpart",
+    )
+    parser.add_argument(
+        "--replacement",
+        default=None,
+        help="Replacement for the --regex match, giving the name of the counterpart in dir_b",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: the number of CPUs available)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=["txt"],
+        choices=["txt", "csv", "xlsx", "ndjson", "parquet"],
+        help="Report file formats to write for each pair (default: txt)",
+    )
+    parser.add_argument(
+        "--only-diffs",
+        action="store_true",
+        default=False,
+        help="Only display variables and attributes that are different",
+    )
+    parser.add_argument(
+        "--show-attributes",
+        action="store_true",
+        default=False,
+        help="Include variable attributes in comparison",
+    )
+    parser.add_argument(
+        "--show-chunks",
+        action="store_true",
+        default=False,
+        help="Include chunk sizes in the table that compares variables",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Bypass the persistent metadata cache, and always read metadata from the files",
+    )
+    _add_filter_arguments(parser)
+
+    return parser.parse_args(args)
+
+
+def _batch_exit_status(summary: dict[str, int]) -> int:
+    """Get the exit status of many comparisons, as with `--quiet` for one comparison.
+
+    Returns
+    -------
+    int
+        0 if all pairs of files match, 1 if any pair differs, or 2 if any comparison failed
+    """
+    if summary["errors"]:
+        return 2
+    return 1 if summary["pairs_with_differences"] else 0
+
+
+def batch_main() -> None:  # pragma: no cover
+    """Run a batch of comparisons between two directories from the command line."""
+    args = _batch_cli(None)
+
+    from ncompare.batch import compare_directories, summarize
+
+    try:
+        results = compare_directories(**vars(args))
+    except Exception:  # pylint: disable=broad-exception-caught
+        print(traceback.format_exc())
+        sys.exit(2)
+
+    summary = summarize(results)
+    print(
+        f"Compared {summary['pairs']} pairs: "
+        f"{summary['pairs_with_differences']} with differences, "
+        f"{summary['pairs_without_differences']} without differences, "
+        f"{summary['errors']} errors."
+    )
+    print(summary["total_differences"])
+    sys.exit(_batch_exit_status(summary))
+
+
+def _many_cli(args: Sequence[str] | None) -> argparse.Namespace:
+    """Parse input arguments for comparing many files with one reference from the command line.
+
+    Parameters
+    ----------
+    args
+        if None, then argparse will use `sys.argv[1:]`
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare many (netCDF or HDF) files with one reference file, "
+        "whose structure is only read once"
+    )
+    parser.add_argument("reference", help="First (reference) netCDF or HDF file, or its manifest")
+    parser.add_argument("candidates", nargs="+", help="Files to compare with the reference")
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Directory to which a report per candidate, and the summary.csv, will be written.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes; 0 means the number of CPUs available (default: 1)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=["txt"],
+        choices=["txt", "csv", "xlsx", "ndjson", "parquet"],
+        help="Report file formats to write for each candidate (default: txt)",
+    )
+    parser.add_argument(
+        "--only-diffs",
+        action="store_true",
+        default=False,
+        help="Only display variables and attributes that are different",
+    )
+    parser.add_argument(
+        "--show-attributes",
+        action="store_true",
+        default=False,
+        help="Include variable attributes in comparison",
+    )
+    parser.add_argument(
+        "--show-chunks",
+        action="store_true",
+        default=False,
+        help="Include chunk sizes in the table that compares variables",
+    )
+    _add_filter_arguments(parser)
+
+    return parser.parse_args(args)
+
+
+def many_main() -> None:  # pragma: no cover
+    """Run comparisons of many files with one reference file from the command line."""
+    args = _many_cli(None)
+
+    from ncompare.batch import compare_many, summarize
+
+    try:
+        results = compare_many(
+            args.reference,
+            args.candidates,
+            jobs=args.jobs or None,
+            output_dir=args.output_dir,
+            formats=args.formats,
+            only_diffs=args.only_diffs,
+            show_attributes=args.show_attributes,
+            show_chunks=args.show_chunks,
+            include=args.include,
+            exclude=args.exclude,
+            max_depth=args.max_depth,
+            ignore_attributes=args.ignore_attributes,
+            detect_moves=args.detect_moves,
+        )
+    except Exception:  # pylint: disable=broad-exception-caught
+        print(traceback.format_exc())
+        sys.exit(2)
+
+    for result in results:
+        outcome = result.error.splitlines()[-1] if result.error else result.total_diff_count
+        print(f"{result.path_b}: {outcome}")
+    summary = summarize(results)
+    print(summary["total_differences"])
+    sys.exit(_batch_exit_status(summary))
+
+
 def main() -> None:  # pragma: no cover
     """Run from the command line."""
     args = _cli(None)
 
     delattr(args, "version")
+    args.jobs = args.jobs or None
+    args.quiet = args.quiet or args.fail_fast
+
+    # Imported here, after arguments are parsed, so that `--help` and `--version` stay fast.
+    from ncompare.core import compare
 
     try:
         total_diff_count = compare(**vars(args))
     except Exception:  # pylint: disable=broad-exception-caught
+        if args.quiet:
+            print(traceback.format_exc(), file=sys.stderr)
+            sys.exit(2)
         print(traceback.format_exc())
         sys.exit(1)
-    print(total_diff_count)
+    if args.quiet:
+        # As with `cmp` and `diff`, the exit status tells whether the files differ.
+        sys.exit(1 if total_diff_count else 0)
+    if args.file_ndjson != "-":
+        # (NDJSON records on stdout end with a summary record, which includes the total.)
+        print(total_diff_count)
     sys.exit(0)  # a clean, no-issue, exit
 
 
@@ -29,20 +29,29 @@
 
 """Compare the structure of two netCDF or HDF files."""
 
+import contextlib
+import sys
+from collections.abc import Sequence
 from pathlib import Path
 
+from ncompare.cache import DEFAULT_CACHE_SIZE_MB, MetadataCache
 from ncompare.Comparison import Comparison
+from ncompare.manifest import save_manifest, write_manifest
+from ncompare.parquet import ParquetRenderer
 from ncompare.path_and_string_operations import (
     ensure_valid_path_exists,
     ensure_valid_path_with_suffix,
     validate_file_type,
 )
-from ncompare.printing import Outputter
+from ncompare.printing import COMPRESSION_SUFFIXES, Outputter, open_text_for_writing
+from ncompare.rendering import NdjsonRenderer, Renderer, ResultRenderer
+from ncompare.results import ComparisonResult
+from ncompare.utility_types import FileToCompare, Manifest
 
 
 def compare(
-    path_a: str | Path,
-    path_b: str | Path,
+    path_a: str | Path | Manifest,
+    path_b: str | Path | Manifest,
     only_diffs: bool = False,
     no_color: bool = False,
     show_chunks: bool = False,
@@ -50,16 +59,45 @@ def compare(
     file_text: str | Path = "",
     file_csv: str | Path = "",
     file_xlsx: str | Path = "",
+    xlsx_sheet_per_group: bool = False,
+    file_ndjson: str | Path = "",
+    file_parquet: str | Path = "",
     column_widths: tuple[int | str, int | str, int | str] | None = None,
+    manifest_a: str | Path = "",
+    manifest_b: str | Path = "",
+    cache: bool = False,
+    cache_dir: str | Path | None = None,
+    cache_size: int | float = DEFAULT_CACHE_SIZE_MB,
+    cache_fingerprint: bool = False,
+    compare_values: bool = False,
+    atol: float = 0.0,
+    rtol: float = 0.0,
+    sample_fraction: float | None = None,
+    sample_bytes: int | None = None,
+    seed: int = 0,
+    jobs: int | None = 1,
+    digests: bool = False,
+    statistics: bool = False,
+    fail_fast: bool = False,
+    quiet: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_depth: int | None = None,
+    ignore_attributes: Sequence[str] = (),
+    detect_moves: bool = False,
 ) -> int:
     """Compare the variables contained within two netCDF or HDF files.
 
+    Either file may instead be a manifest (see `ncompare.manifest`),
+    i.e., a JSON file that records the structure of a netCDF or HDF file,
+    or a `Manifest` that is already loaded in memory.
+
     Parameters
     ----------
     path_a
-        filepath to the first netCDF or HDF
+        filepath to the first netCDF or HDF, or to a manifest (or a loaded manifest)
     path_b
-        filepath to the second netCDF or HDF
+        filepath to the second netCDF or HDF, or to a manifest (or a loaded manifest)
     only_diffs
         Whether to show only the variables/attributes that are different between the two files
     no_color
@@ -71,58 +109,265 @@ def compare(
     file_text
         filepath destination to save captured text output as a TXT file.
     file_csv
-        filepath destination to save comparison output as comma-separated values (CSV).
+        filepath destination to save comparison output as comma-separated values (CSV),
+        which is compressed if the name ends with ".gz" or ".zst".
     file_xlsx
         filepath destination to save comparison output as an Excel workbook.
+    xlsx_sheet_per_group
+        Whether to put each group (and the summary) on its own sheet of the Excel workbook.
+    file_ndjson
+        filepath destination to save comparison output as newline-delimited JSON records,
+        which is compressed if the name ends with ".gz" or ".zst";
+        or "-" to write the records to stdout, in place of the usual console output.
+    file_parquet
+        filepath destination to save a row for each compared property as a Parquet file,
+        which requires the `pyarrow` package.
     column_widths
         the width in number of characters for each column of the comparison table.
+    manifest_a
+        filepath destination to save the structure of the first file as a manifest (JSON).
+    manifest_b
+        filepath destination to save the structure of the second file as a manifest (JSON).
+    cache
+        Whether to use the persistent metadata cache, i.e., to reuse the metadata of files that were
+        compared before, and to store that of other files. It is off by default in the library,
+        and on by default on the command line (see `--no-cache`).
+    cache_dir
+        directory of the metadata cache; by default, `ncompare` under the user's cache directory.
+    cache_size
+        maximum size of the metadata cache, in megabytes; least recently used entries are evicted.
+    cache_fingerprint
+        Whether to also identify cached files by a hash of their content, not only path, size, and mtime.
+    compare_values
+        Whether to also compare the data values of shared variables, chunk by chunk.
+        The metadata cache is not used in this mode, because values are read from the files.
+    atol
+        absolute tolerance for comparing numeric data values.
+    rtol
+        relative tolerance for comparing numeric data values, with respect to the values in File A.
+    sample_fraction
+        if given, only this fraction (between 0 and 1) of the chunks of each variable are compared.
+    sample_bytes
+        if given, only about this many bytes of (randomly chosen chunks of) each variable are compared.
+    seed
+        seed for the reproducible, random choice of which chunks to compare when sampling.
+    jobs
+        number of worker processes for comparing data values; if None, the number of CPUs available.
+    digests
+        Whether to compute (or, for a manifest, use the stored) digests of the data of each variable,
+        to show which variables hold identical data. Digests are also saved in any manifest written.
+    statistics
+        Whether to compute (or, for a manifest, use the stored) min, max, mean, std, NaN count,
+        and fill-value count of each variable. Statistics are also saved in any manifest written.
+    fail_fast
+        Whether to stop comparing (and close the files) as soon as any difference is found,
+        e.g., when only a yes/no answer is needed. The metadata cache is then only read, not filled.
+    quiet
+        Whether to print nothing to the console; output files are still written.
+    include
+        glob patterns (or regular expressions, if prefixed with "re:") of the paths of the groups
+        and variables to compare, e.g., "/gt1l" or "*/h_li"; by default, everything is compared.
+        Groups that cannot contain a match are skipped without being opened.
+    exclude
+        glob patterns (or regular expressions, if prefixed with "re:") of the paths of the groups
+        and variables not to compare; excluded groups are skipped without being opened.
+    max_depth
+        how many levels of groups to compare below the root group (0 compares only the root group).
+    ignore_attributes
+        names (or glob patterns) of variable attributes not to compare, e.g., "history".
+    detect_moves
+        Whether to pair variables that are only in one group of each file, but have the same
+        dtype, shape, dimensions, and attributes, as moved (or renamed) variables,
+        which are then counted as one difference each, rather than as two.
 
     Returns
     -------
     int
-        total number of differences found (across variables, groups, and attributes)
+        total number of differences found (across variables, groups, and attributes);
+        when failing fast, this is nonzero if, and only if, the files differ.
     """
     # Check the validity of paths.
-    path_a = ensure_valid_path_exists(path_a)
-    path_b = ensure_valid_path_exists(path_b)
     if file_text:
         file_text = ensure_valid_path_with_suffix(file_text, ".txt")
     if file_csv:
-        file_csv = ensure_valid_path_with_suffix(file_csv, ".csv")
+        file_csv = ensure_valid_path_with_suffix(file_csv, ".csv", COMPRESSION_SUFFIXES)
     if file_xlsx:
         file_xlsx = ensure_valid_path_with_suffix(file_xlsx, ".xlsx")
+    ndjson_to_stdout = str(file_ndjson) == "-"
+    if file_ndjson and not ndjson_to_stdout:
+        file_ndjson = ensure_valid_path_with_suffix(file_ndjson, ".ndjson", COMPRESSION_SUFFIXES)
+    if file_parquet:
+        file_parquet = ensure_valid_path_with_suffix(file_parquet, ".parquet")
 
     # Check the validity of file types
-    file_a = validate_file_type(path_a)
-    file_b = validate_file_type(path_b)
-    if file_a.type != file_b.type:
-        # I'm not sure if there is a use-case where we'd want to compare a netCDF with an HDF file?
-        # This assumption of files being the same type, affects the rest of the comparison logic.
-        raise TypeError("Both files must be of the same type (either both netCDF or both HDF).")
+    file_a, file_b = _files_to_compare(path_a, path_b)
+
+    # Optionally save the structure of either file, so it can be compared against without reopening it.
+    for file, destination in ((file_a, manifest_a), (file_b, manifest_b)):
+        if not destination:
+            continue
+        if file.manifest is not None:
+            save_manifest(file.manifest, destination)
+        else:
+            write_manifest(file.path, destination, digests=digests, statistics=statistics)
 
     # The Outputter object is initialized to handle stdout and optional writing to a text file.
-    with Outputter(
-        keep_print_history=True,
-        keep_only_diffs=only_diffs,
-        no_color=no_color,
-        text_file=file_text,
-        column_widths=column_widths,
-    ) as out:
+    #   CSV and Excel rows are written as they are produced, so no history needs to be kept.
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(
+            Outputter(
+                keep_only_diffs=only_diffs,
+                no_color=no_color,
+                text_file=file_text,
+                column_widths=column_widths,
+                csv_file=file_csv,
+                xlsx_file=file_xlsx,
+                xlsx_sheet_per_group=xlsx_sheet_per_group,
+                console=not (quiet or ndjson_to_stdout),
+            )
+        )
+        renderers: list[Renderer] = []
+        if not quiet or file_text or file_csv or file_xlsx:
+            # (When there is nothing to display, the side-by-side rows are not even formatted.)
+            renderers.append(ResultRenderer(out))
+        if file_ndjson:
+            # NDJSON records are also written as they are produced.
+            ndjson_target = (
+                sys.stdout
+                if ndjson_to_stdout
+                else stack.enter_context(open_text_for_writing(file_ndjson))
+            )
+            renderers.append(NdjsonRenderer(ndjson_target, only_diffs=only_diffs))
+        if file_parquet:
+            renderers.append(
+                stack.enter_context(
+                    ParquetRenderer(file_parquet, str(file_a.path), str(file_b.path))
+                )
+            )
+
         out.print(f"File A: {file_a.path}")
         out.print(f"File B: {file_b.path}")
 
         # Start the comparison process.
         comparison = Comparison(
-            file_a, file_b, out, show_chunks=show_chunks, show_attributes=show_attributes
+            file_a,
+            file_b,
+            out,
+            show_chunks=show_chunks,
+            show_attributes=show_attributes,
+            cache=_metadata_cache(
+                cache and not compare_values, cache_dir, cache_size, cache_fingerprint
+            ),
+            compare_values=compare_values,
+            atol=atol,
+            rtol=rtol,
+            sample_fraction=sample_fraction,
+            sample_bytes=sample_bytes,
+            seed=seed,
+            jobs=jobs,
+            digests=digests,
+            statistics=statistics,
+            fail_fast=fail_fast,
+            include=include,
+            exclude=exclude,
+            max_depth=max_depth,
+            ignore_attributes=ignore_attributes,
+            detect_moves=detect_moves,
         )
-        total_diff_count = comparison.run_through_comparisons()
+        result = comparison.compare(*renderers)
+
+        out.print("\nDone.", colors=False)
+
+        return result.total_diff_count
+
+
+def diff(
+    path_a: str | Path | Manifest,
+    path_b: str | Path | Manifest,
+    show_chunks: bool = False,
+    show_attributes: bool = False,
+    cache: bool = False,
+    cache_dir: str | Path | None = None,
+    cache_size: int | float = DEFAULT_CACHE_SIZE_MB,
+    cache_fingerprint: bool = False,
+    compare_values: bool = False,
+    atol: float = 0.0,
+    rtol: float = 0.0,
+    sample_fraction: float | None = None,
+    sample_bytes: int | None = None,
+    seed: int = 0,
+    jobs: int | None = 1,
+    digests: bool = False,
+    statistics: bool = False,
+    fail_fast: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_depth: int | None = None,
+    ignore_attributes: Sequence[str] = (),
+    detect_moves: bool = False,
+) -> ComparisonResult:
+    """Compare two netCDF or HDF files, and return the differences without displaying anything.
+
+    This does the same comparison as `compare` (see there for the parameters),
+    but nothing is printed, formatted, or written to a file.
+
+    Returns
+    -------
+    ComparisonResult
+        a tree of groups, variables, and properties, with tallies of the differences
+    """
+    file_a, file_b = _files_to_compare(path_a, path_b)
+    comparison = Comparison(
+        file_a,
+        file_b,
+        show_chunks=show_chunks,
+        show_attributes=show_attributes,
+        cache=_metadata_cache(
+            cache and not compare_values, cache_dir, cache_size, cache_fingerprint
+        ),
+        compare_values=compare_values,
+        atol=atol,
+        rtol=rtol,
+        sample_fraction=sample_fraction,
+        sample_bytes=sample_bytes,
+        seed=seed,
+        jobs=jobs,
+        digests=digests,
+        statistics=statistics,
+        fail_fast=fail_fast,
+        include=include,
+        exclude=exclude,
+        max_depth=max_depth,
+        ignore_attributes=ignore_attributes,
+        detect_moves=detect_moves,
+    )
+    return comparison.compare()
+
+
+def _files_to_compare(
+    path_a: str | Path | Manifest, path_b: str | Path | Manifest
+) -> tuple[FileToCompare, FileToCompare]:
+    """Check the validity of both paths, and that they are files of the same type."""
+    file_a = _file_to_compare(path_a)
+    file_b = _file_to_compare(path_b)
+    if ("manifest" not in (file_a.type, file_b.type)) and (file_a.type != file_b.type):
+        # I'm not sure if there is a use-case where we'd want to compare a netCDF with an HDF file?
+        # This assumption of files being the same type, affects the rest of the comparison logic.
+        raise TypeError("Both files must be of the same type (either both netCDF or both HDF).")
+    return file_a, file_b
+
 
-        # Write to CSV and Excel files.
-        if file_csv:
-            comparison.out.write_history_to_csv(filename=file_csv)
-        if file_xlsx:
-            comparison.out.write_history_to_excel(filename=file_xlsx)
+def _metadata_cache(
+    enabled: bool, cache_dir: str | Path | None, cache_size: int | float, fingerprint: bool
+) -> MetadataCache | None:
+    """Set up the metadata cache, if it is enabled (and not, e.g., because values are compared)."""
+    if not enabled:
+        return None
+    return MetadataCache(cache_dir, max_size_mb=cache_size, fingerprint=fingerprint)
 
-        comparison.out.print("\nDone.", colors=False)
 
-        return total_diff_count
+def _file_to_compare(path: str | Path | Manifest) -> FileToCompare:
+    """Check the validity of a path and its file type, or wrap a manifest that is already loaded."""
+    if isinstance(path, Manifest):
+        return FileToCompare(path=path.source or "<manifest>", type="manifest", manifest=path)
+    return validate_file_type(ensure_valid_path_exists(path))
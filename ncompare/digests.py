@@ -0,0 +1,133 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Compute digests (hashes) of the data of variables, one block at a time, with bounded memory.
+
+Two variables with equal digests hold identical data, so digests that are stored,
+e.g., in a manifest, can be compared without rereading the file they were computed from.
+"""
+
+import hashlib
+
+import h5py
+import netCDF4
+import numpy as np
+
+from ncompare.utility_types import VarProperties
+from ncompare.values import DEFAULT_BLOCK_BYTES, block_shape, element_size, iter_blocks
+
+DIGEST_SIZE = 16
+
+
+def data_digest(
+    variable: netCDF4.Variable | h5py.Dataset, max_block_bytes: int = DEFAULT_BLOCK_BYTES
+) -> str:
+    """Compute a digest of the decoded data of a variable, i.e., after any masking and scaling.
+
+    The data are read in blocks that are contiguous in C order,
+    so the digest does not depend on how the variable is chunked or compressed.
+
+    Parameters
+    ----------
+    variable
+        an open netCDF4 variable or h5py dataset
+    max_block_bytes
+        upper bound on the number of bytes read at a time
+
+    Returns
+    -------
+    str
+        hexadecimal BLAKE2b digest
+    """
+    if variable.shape is None:
+        # An HDF5 dataset with a null dataspace has a dtype, but no data.
+        return hashlib.blake2b(
+            f"{variable.dtype}None".encode(), digest_size=DIGEST_SIZE
+        ).hexdigest()
+    shape = tuple(variable.shape)
+    digest = hashlib.blake2b(f"{variable.dtype}{shape}".encode(), digest_size=DIGEST_SIZE)
+    mask_digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    any_masked = False
+    for slices in iter_blocks(
+        shape, block_shape(shape, element_size(variable), None, max_block_bytes)
+    ):
+        values = variable[slices]
+        data = np.ma.getdata(values)
+        if data.dtype.kind == "O":
+            for item in data.ravel():
+                digest.update(str(item).encode("utf-8") + b"\0")
+        else:
+            digest.update(np.ascontiguousarray(data).tobytes())
+
+        mask = np.ma.getmaskarray(values)
+        mask_digest.update(mask.tobytes())
+        any_masked = any_masked or bool(mask.any())
+
+    if any_masked:
+        digest.update(mask_digest.digest())
+    return digest.hexdigest()
+
+
+def raw_digest(
+    variable: netCDF4.Variable | h5py.Dataset, max_block_bytes: int = DEFAULT_BLOCK_BYTES
+) -> str:
+    """Compute a digest of the data of a variable as stored, i.e., without masking or scaling.
+
+    Parameters
+    ----------
+    variable
+        an open netCDF4 variable or h5py dataset
+    max_block_bytes
+        upper bound on the number of bytes read at a time
+
+    Returns
+    -------
+    str
+        hexadecimal BLAKE2b digest
+    """
+    if isinstance(variable, h5py.Dataset):
+        # h5py does not mask or scale values, so the stored values are what is read.
+        return data_digest(variable, max_block_bytes)
+
+    # Turn off the decoding by netCDF4, and then restore the variable's original settings.
+    mask, scale = variable.mask, variable.scale
+    variable.set_auto_maskandscale(False)
+    try:
+        return data_digest(variable, max_block_bytes)
+    finally:
+        variable.set_auto_mask(mask)
+        variable.set_auto_scale(scale)
+
+
+def with_digests(properties: VarProperties) -> VarProperties:
+    """Add the data and raw digests of an open variable to its properties."""
+    if properties.variable is None:
+        return properties
+    if isinstance(properties.variable, h5py.Dataset):
+        digest = data_digest(properties.variable)
+        return properties._replace(data_digest=digest, raw_digest=digest)
+    return properties._replace(
+        data_digest=data_digest(properties.variable), raw_digest=raw_digest(properties.variable)
+    )
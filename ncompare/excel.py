@@ -0,0 +1,149 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Write comparison output to an Excel workbook, one row at a time, with bounded memory."""
+
+from pathlib import Path
+from typing import Any
+
+# The maximum number of rows in an Excel worksheet.
+EXCEL_MAX_ROWS = 1_048_576
+
+EXCEL_HEADERS = ["Info", "File A", "File B"]
+
+# Names of the shared cell styles, which are registered once per workbook.
+DIFFERENCE_STYLE = "ncompare difference"
+SUBHEADER_STYLE = "ncompare subheader"
+
+
+class ExcelWriter:
+    """Stream rows to a write-only openpyxl workbook, starting new sheets as needed.
+
+    Rows are written as they are appended, rather than held in memory,
+    and highlighted cells reuse two named styles instead of each creating their own font.
+    A new sheet is started when a sheet is full (see `EXCEL_MAX_ROWS`),
+    and, optionally, for each group and for the summary.
+    """
+
+    def __init__(
+        self,
+        filename: str | Path,
+        difference_marker: str = "***",
+        sheet_per_group: bool = False,
+        max_rows: int = EXCEL_MAX_ROWS,
+    ):
+        """Set up the workbook.
+
+        Parameters
+        ----------
+        filename
+            filepath destination of the Excel file, which is written on `close`
+        difference_marker
+            the value in the fourth column of a row that marks the row as a difference
+        sheet_per_group
+            whether to start a new sheet for each group (and for the summary)
+        max_rows
+            the maximum number of rows per sheet, including its header row
+        """
+        # openpyxl is imported here, so it is only loaded when Excel output is requested.
+        import openpyxl
+        from openpyxl.styles import Font, NamedStyle
+
+        self.filename = filename
+        self._difference_marker = difference_marker
+        self._sheet_per_group = sheet_per_group
+        self._max_rows = max_rows
+
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._workbook.add_named_style(
+            NamedStyle(name=DIFFERENCE_STYLE, font=Font(bold=True, color="FFFF0000"))
+        )
+        self._workbook.add_named_style(
+            NamedStyle(name=SUBHEADER_STYLE, font=Font(bold=True, underline="single"))
+        )
+
+        self._sheet_titles: set[str] = set()
+        self._sheet: Any = None
+        self._sheet_base_title = ""
+        self._sheet_rows = 0
+        # The first sheet keeps openpyxl's default title, as in workbooks from earlier versions.
+        self._new_sheet("Sheet")
+
+    def __enter__(self):  # noqa: D105
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):  # noqa: D105
+        self.close()
+
+    def _new_sheet(self, title: str) -> None:
+        # Sheet titles must be unique, and at most 31 characters long.
+        title = title[:27]
+        self._sheet_base_title = title
+        unique_title, counter = title, 2
+        while unique_title in self._sheet_titles:
+            unique_title = f"{title} ({counter})"
+            counter += 1
+        self._sheet_titles.add(unique_title)
+
+        self._sheet = self._workbook.create_sheet(unique_title)
+        self._sheet.append(EXCEL_HEADERS)
+        self._sheet_rows = 1
+
+    def append(self, row: list[str]) -> None:
+        """Write a row of output, styled according to whether it is a difference or a subheader."""
+        from openpyxl.cell import WriteOnlyCell
+
+        if self._sheet_per_group and row and row[0].startswith(("GROUP #", "SUMMARY")):
+            self._new_sheet(row[0].strip())
+        elif self._sheet_rows >= self._max_rows:
+            self._new_sheet(self._sheet_base_title)
+
+        if (len(row) > 3) and (row[3] == self._difference_marker):
+            # The case where there is a difference that we want to highlight.
+            #   The difference marker is redundant with the style applied to the row (unlike in the CSV).
+            style: str | None = DIFFERENCE_STYLE
+            row = row[:3]
+        elif (len(row) == 1) or ((len(row) == 3) and ((row[1] == "") and (row[2] == ""))):
+            # The case where there is a subheader and no information in the second and third columns.
+            style = SUBHEADER_STYLE
+        else:
+            style = None
+
+        if style is None:
+            self._sheet.append(row)
+        else:
+            cells = []
+            for value in row:
+                cell = WriteOnlyCell(self._sheet, value=value)
+                cell.style = style
+                cells.append(cell)
+            self._sheet.append(cells)
+        self._sheet_rows += 1
+
+    def close(self) -> None:
+        """Save the workbook, which can only be done once."""
+        if self._workbook is not None:
+            self._workbook.save(self.filename)
+            self._workbook = None
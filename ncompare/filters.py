@@ -0,0 +1,175 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Select which groups, variables, and attributes are compared, by their paths and names.
+
+Paths are absolute, e.g., "/gt1l/land_ice_segments/h_li" for a variable, or "/gt1l" for a group.
+A pattern is a glob (as in `fnmatch`, where "*" also matches "/"), or, when prefixed with "re:",
+a regular expression that must match the whole path. A glob that does not start with "/" or "*"
+matches at any depth, e.g., "ancillary_data" matches "/ancillary_data" and "/gt1l/ancillary_data".
+"""
+
+import fnmatch
+import re
+from collections.abc import Iterable
+
+REGEX_PREFIX = "re:"
+
+# Characters that end the literal (i.e., wildcard-free) beginning of a regular expression.
+_REGEX_SPECIAL_CHARACTERS = frozenset(".^$*+?{}[]\\|()")
+_REGEX_QUANTIFIERS = frozenset("*+?{")
+
+
+class PathPattern:
+    """A glob or regular expression, matched against the full path of a group or variable."""
+
+    __slots__ = ("pattern", "_regex", "literal_prefix", "_is_literal")
+
+    def __init__(self, pattern: str):  # noqa: D107
+        self.pattern = pattern
+        if pattern.startswith(REGEX_PREFIX):
+            expression = pattern[len(REGEX_PREFIX) :]
+            self._regex = re.compile(expression)
+            self.literal_prefix = _regex_literal_prefix(expression)
+            self._is_literal = self.literal_prefix == expression
+        else:
+            if not pattern.startswith(("/", "*")):
+                pattern = "*/" + pattern
+            self._regex = re.compile(fnmatch.translate(pattern))
+            self.literal_prefix = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+            self._is_literal = self.literal_prefix == pattern
+
+    def matches(self, path: str) -> bool:
+        """Whether the whole path matches the pattern."""
+        return self._regex.fullmatch(path) is not None
+
+    def may_match_below(self, group_path: str) -> bool:
+        """Whether the path of anything under a group could match the pattern.
+
+        This only looks at the literal beginning of the pattern, so it can be wrong (and is then
+        True) for a path that cannot match, but never for a path that can.
+        """
+        below = group_path.rstrip("/") + "/"
+        if self._is_literal:
+            return self.literal_prefix.startswith(below)
+        return below.startswith(self.literal_prefix) or self.literal_prefix.startswith(below)
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"PathPattern({self.pattern!r})"
+
+
+class PathFilter:
+    """Decide which groups and variables are compared, and which groups need not be visited at all.
+
+    Anything under an excluded group is excluded. When there are include patterns, a variable is
+    compared if its path, or the path of a group that contains it, matches one of them.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        max_depth: int | None = None,
+    ):
+        """Set up the filter.
+
+        Parameters
+        ----------
+        include
+            patterns of the paths to compare; if empty, everything (that is not excluded) is compared
+        exclude
+            patterns of the paths not to compare, along with anything under them
+        max_depth
+            how many levels of groups to go down from the root group (which is at depth 0);
+            if None, then there is no limit
+        """
+        self.include = [PathPattern(pattern) for pattern in include]
+        self.exclude = [PathPattern(pattern) for pattern in exclude]
+        if (max_depth is not None) and (max_depth < 0):
+            raise ValueError(f"The maximum depth must not be negative. Got <{max_depth}>.")
+        self.max_depth = max_depth
+
+    def __bool__(self) -> bool:
+        """Whether anything is filtered out at all."""
+        return bool(self.include or self.exclude or (self.max_depth is not None))
+
+    def selects(self, path: str) -> bool:
+        """Whether a variable (or group) is to be compared."""
+        lineage = _lineage(path)
+        if any(pattern.matches(item) for pattern in self.exclude for item in lineage):
+            return False
+        if not self.include:
+            return True
+        return any(pattern.matches(item) for pattern in self.include for item in lineage)
+
+    def prunes(self, group_path: str) -> bool:
+        """Whether nothing in (or under) a group is to be compared, so it need not be opened."""
+        if (self.max_depth is not None) and (_depth(group_path) > self.max_depth):
+            return True
+        lineage = _lineage(group_path)
+        if any(pattern.matches(item) for pattern in self.exclude for item in lineage):
+            return True
+        if not self.include:
+            return False
+        return not any(
+            pattern.may_match_below(group_path) or any(pattern.matches(item) for item in lineage)
+            for pattern in self.include
+        )
+
+
+def matches_any(name: str, patterns: Iterable[str]) -> bool:
+    """Whether a name (e.g., of an attribute) matches any of the given glob patterns."""
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _lineage(path: str) -> list[str]:
+    """Get the path of each group that contains an item, and then the item's own path.
+
+    For example, "/a/b/c" gives ["/a", "/a/b", "/a/b/c"].
+    """
+    parts = path.strip("/").split("/")
+    return ["/" + "/".join(parts[: index + 1]) for index in range(len(parts))] if parts[0] else []
+
+
+def _depth(group_path: str) -> int:
+    """Get the depth of a group below the root group, e.g., 0 for "/" and 2 for "/a/b"."""
+    stripped = group_path.strip("/")
+    return stripped.count("/") + 1 if stripped else 0
+
+
+def _regex_literal_prefix(expression: str) -> str:
+    """Get the text that every match of a regular expression must start with, if any."""
+    if "|" in expression:
+        # An alternative can start with anything.
+        return ""
+    prefix: list[str] = []
+    for character in expression.removeprefix("^"):
+        if character in _REGEX_SPECIAL_CHARACTERS:
+            if (character in _REGEX_QUANTIFIERS) and prefix:
+                # The last literal character is optional, or repeated.
+                prefix.pop()
+            break
+        prefix.append(character)
+    return "".join(prefix)
@@ -1,23 +1,30 @@
-import warnings
-from collections.abc import Iterable, Iterator
+import hashlib
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping
 
 import h5py
 import netCDF4
-import xarray as xr
+import numpy as np
 
 from ncompare.sequence_operations import common_elements
-from ncompare.utility_types import FileToCompare, VarProperties
+from ncompare.utility_types import FileToCompare, Manifest, ManifestGroup, VarProperties
+
+# Number of elements of an array-valued attribute that are shown; differences are still found
+#   at any position, by comparing digests of the full values (see `attribute_digest`).
+ATTRIBUTE_DISPLAY_LENGTH = 5
+_ATTRIBUTE_DIGEST_SIZE = 16
+# The NAME of an HDF5 dimension scale that netCDF-4 wrote only to define a dimension.
+_NETCDF_DIMENSION_ONLY = b"This is a netCDF dimension but not a netCDF variable."
 
 
 def get_and_check_variable_scale_factor(
     v_a: VarProperties, v_b: VarProperties
 ) -> None | tuple[str, str]:
     """Get a string representation of the scale factor for two variables."""
-    sf_a = getattr(v_a.variable, "scale_factor", " ")
-    sf_b = getattr(v_b.variable, "scale_factor", " ")
-
-    if (sf_a != " ") or (sf_b != " "):
-        return str(sf_a), str(sf_b)
+    if (v_a.scale_factor is not None) or (v_b.scale_factor is not None):
+        sf_a = v_a.scale_factor if v_a.scale_factor is not None else " "
+        sf_b = v_b.scale_factor if v_b.scale_factor is not None else " "
+        return sf_a, sf_b
     else:
         return None
 
@@ -41,39 +48,227 @@ def get_and_check_variable_attributes(
 
 
 def get_attribute_value_as_str(varprops: VarProperties, attribute_key: str) -> str:
-    """Get a string representation of the attribute value."""
+    """Get a string representation of the attribute value, for display.
+
+    Lists (and other iterables) are truncated here, so two attributes whose strings match can
+    still differ; use `get_attribute_digest` to compare attribute values in full.
+    """
     if attribute_key and (attribute_key in varprops.attributes):
         attr = varprops.attributes[attribute_key]
         if isinstance(attr, Iterable) and not isinstance(attr, (str, float)):
-            # TODO: by truncating a list (or other iterable) here,
-            #  we are preventing any subsequent difference checker from detecting
-            #  differences past the 5th element in the iterable.
-            #  So, we need to figure out a way to still check for other differences past the 5th element.
-            return "[" + ", ".join([str(x) for x in attr[:5]]) + ", ..." + "]"  # type:ignore[index]
+            shown = attr[:ATTRIBUTE_DISPLAY_LENGTH]  # type:ignore[index]
+            return "[" + ", ".join([str(x) for x in shown]) + ", ..." + "]"
 
         return str(attr)
 
     return ""
 
 
-def get_root_groups(file: FileToCompare) -> list:
-    """Get a list of groups from a netCDF."""
-    if file.type == "netcdf":
-        with netCDF4.Dataset(file.path) as dataset:
-            groups_list = list(dataset.groups.keys())
+def get_attribute_digest(varprops: VarProperties, attribute_key: str) -> str | None:
+    """Get the digest of an array-valued attribute, or None if it has none (or was not digested)."""
+    if attribute_key and varprops.attribute_digests:
+        return varprops.attribute_digests.get(attribute_key)
+    return None
+
+
+def attribute_digest(value) -> str | None:
+    """Compute a digest of the full content of an array-valued attribute, including its dtype.
+
+    Returns
+    -------
+    str or None
+        a hexadecimal digest, or None if the attribute is not array-valued (e.g., a string or
+        a scalar, which is shown, and so compared, in full)
+    """
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        return None
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        # e.g., a ragged sequence
+        array = np.asarray(value, dtype=object)
+
+    digest = hashlib.blake2b(
+        f"{array.dtype.str}{array.shape}".encode(), digest_size=_ATTRIBUTE_DIGEST_SIZE
+    )
+    if array.dtype.hasobject:
+        # Objects (e.g., variable-length strings) are hashed by value, not by their addresses.
+        for element in array.flat:
+            digest.update(str(element).encode("utf-8", "surrogateescape"))
+            digest.update(b"\0")
+    else:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _attribute_digests(attributes: dict) -> dict[str, str]:
+    """Compute the digest of each array-valued attribute, keyed by attribute name."""
+    digests = {}
+    for name, value in attributes.items():
+        digest = attribute_digest(value)
+        if digest is not None:
+            digests[name] = digest
+    return digests
+
+
+def open_dataset(file: FileToCompare) -> netCDF4.Dataset | h5py.File | Manifest:
+    """Open a netCDF or HDF5 file (or load a structural manifest) for reading.
+
+    Note
+    ----
+    The returned handle is meant to be opened once per comparison and then shared
+    across every step (root dimensions, root groups, and the group/variable traversal).
+    It can be used as a context manager, which closes the file on exit.
+    """
+    if file.manifest is not None:
+        return file.manifest
+    elif file.type == "manifest":
+        from ncompare.manifest import load_manifest
+
+        return load_manifest(file.path)
     elif file.type == "hdf5":
-        with h5py.File(file.path) as dataset:
-            groups_list = list(dataset.keys())
-    return groups_list
+        return h5py.File(file.path, mode="r")
+    else:  # should be "netcdf"
+        return netCDF4.Dataset(file.path, mode="r")
+
+
+def get_root_groups(dataset: netCDF4.Dataset | h5py.File | Manifest, file_type: str) -> list:
+    """Get a list of groups from the root of an open netCDF or HDF5 file."""
+    if isinstance(dataset, Manifest):
+        return list(dataset.root_groups)
+    elif file_type == "hdf5":
+        return list(dataset.keys())
+    else:  # should be "netcdf"
+        return list(dataset.groups.keys())
+
+
+def walk_hdf5_hierarchy(node: h5py.Group) -> dict[str, tuple[list[str], list[str]]]:
+    """Map every group in an HDF5 hierarchy to its subgroups and variables.
+
+    Note
+    ----
+    Each group is listed as by `LazyHdf5Hierarchy`, so a whole-file walk and a partial one
+    report the same children.
+
+    Parameters
+    ----------
+    node
+        the HDF5 file or group from which to start
+
+    Returns
+    -------
+    dict
+        keys are absolute group paths (e.g., "/", "/gt1l/land_ice_segments"),
+        values are a tuple of (subgroup names, variable names) directly under that group
+    """
+    hierarchy = LazyHdf5Hierarchy(node)
+    stack = [node.name]
+    while stack:
+        path = stack.pop()
+        subgroups, _ = hierarchy[path]
+        stack.extend(f"{path.rstrip('/')}/{name}" for name in subgroups)
+    return dict(hierarchy)
+
+
+class LazyHdf5Hierarchy(Mapping):
+    """Map HDF5 group paths to their (subgroup names, variable names), listing each group on lookup.
+
+    This avoids walking a whole file when only part of it is compared (e.g., when failing fast).
+
+    Note
+    ----
+    Children are found by iterating over the links of each group, and their types are read
+    from the object headers, so no child object is opened just to determine whether it is a group
+    or a dataset. As with `h5py.Group.keys`, hard links, soft links, and external links are all
+    listed, and an object that is linked from several places is listed under each of them.
+    Links that cannot be resolved (e.g., dangling soft links) are skipped, and so is a link
+    back to one of a group's own ancestors, which would make the hierarchy infinite.
+    """
+
+    def __init__(self, node: h5py.Group):  # noqa: D107
+        self._node = node
+        self._listed: dict[str, tuple[list[str], list[str]]] = {}
+        # The parent path and object identity of each group that has been found, by path.
+        info = h5py.h5o.get_info(node.id)
+        self._found: dict[str, tuple[str | None, tuple[int, int]]] = {
+            node.name: (None, (info.fileno, info.addr))
+        }
+
+    def __getitem__(self, path: str) -> tuple[list[str], list[str]]:
+        if path not in self._listed:
+            # Groups are only reachable through their parents, which are listed first.
+            unlisted = []
+            ancestor = path
+            while ancestor not in self._found:
+                parent, _, name = ancestor.rpartition("/")
+                if not name:
+                    raise KeyError(path)
+                unlisted.append(ancestor)
+                ancestor = parent or "/"
+            for group_path in [ancestor, *reversed(unlisted)]:
+                if group_path not in self._found:
+                    raise KeyError(path)
+                if group_path not in self._listed:
+                    self._listed[group_path] = self._list_group(group_path)
+        return self._listed[path]
+
+    def _list_group(self, path: str) -> tuple[list[str], list[str]]:
+        group_id = h5py.h5g.open(self._node.id, path.encode("utf-8"))
+        prefix = path.rstrip("/")
+        subgroups: list[str] = []
+        variables: list[str] = []
+
+        def _visitor(name: bytes, link_info) -> None:
+            try:
+                info = h5py.h5o.get_info(group_id, name)
+            except (KeyError, OSError, RuntimeError):
+                return
+            if info.type == h5py.h5o.TYPE_GROUP:
+                identity = (info.fileno, info.addr)
+                # Only a soft/external link, or a group with several hard links, can form a cycle.
+                if (link_info.type != h5py.h5l.TYPE_HARD or info.rc > 1) and self._has_ancestor(
+                    path, identity
+                ):
+                    return
+                child = name.decode("utf-8")
+                self._found[f"{prefix}/{child}"] = (path, identity)
+                subgroups.append(child)
+            elif info.type == h5py.h5o.TYPE_DATASET:
+                variables.append(name.decode("utf-8"))
+
+        group_id.links.iterate(_visitor, info=True)
+        return subgroups, variables
 
+    def _has_ancestor(self, path: str | None, identity: tuple[int, int]) -> bool:
+        while path is not None:
+            path, path_identity = self._found[path]
+            if path_identity == identity:
+                return True
+        return False
 
-def get_subgroups(node: netCDF4.Dataset | netCDF4.Group | h5py.Group, file_type: str) -> list:
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._listed)
+
+    def __len__(self) -> int:
+        return len(self._listed)
+
+    def __bool__(self) -> bool:
+        return True
+
+
+def get_subgroups(
+    node: netCDF4.Dataset | netCDF4.Group | h5py.Group | ManifestGroup,
+    file_type: str,
+    hdf5_hierarchy: Mapping[str, tuple[list[str], list[str]]] | None = None,
+) -> list:
     """Get a list of subgroups from a netCDF or HDF5 group.
 
     Parameters
     ----------
     node
     file_type
+    hdf5_hierarchy
+        optional result of `walk_hdf5_hierarchy`, used to avoid opening each child of an HDF5 group
 
     Returns
     -------
@@ -82,42 +277,248 @@ def get_subgroups(node: netCDF4.Dataset | netCDF4.Group | h5py.Group, file_type:
     """
     if node is None:
         return []
+    elif isinstance(node, ManifestGroup):
+        return list(node.groups)
     elif file_type == "hdf5":
+        if hdf5_hierarchy and (node.name in hdf5_hierarchy):
+            return list(hdf5_hierarchy[node.name][0])
         return [key for key in node.keys() if isinstance(node[key], h5py.Group)]
     else:  # should be "netcdf"
         return list(node.groups)
 
 
-def get_variables(node: netCDF4.Dataset | netCDF4.Group | h5py.Group, file_type: str) -> list:
+def get_variables(
+    node: netCDF4.Dataset | netCDF4.Group | h5py.Group | ManifestGroup,
+    file_type: str,
+    hdf5_hierarchy: Mapping[str, tuple[list[str], list[str]]] | None = None,
+) -> list:
     """Get a sorted list of variables from a netCDF or HDF5 group."""
-    if file_type == "hdf5":
+    if isinstance(node, ManifestGroup):
+        return list(node.variables)
+    elif file_type == "hdf5":
+        if hdf5_hierarchy and (node.name in hdf5_hierarchy):
+            return list(hdf5_hierarchy[node.name][1])
         return [key for key in node.keys() if isinstance(node[key], h5py.Dataset)]
     else:  # should be "netcdf"
         return sorted(node.variables)
 
 
-def get_root_dims(file: FileToCompare) -> list:
-    """Get a list of dimensions from a netCDF or HDF5."""
+def get_root_dims(dataset: netCDF4.Dataset | h5py.File | Manifest, file_type: str) -> list:
+    """Get a list of (name, size) dimension pairs from the root of an open netCDF or HDF5 file.
+
+    Note
+    ----
+    Dimensions are read from the file's own metadata -- netCDF4 `dimensions` or HDF5
+    dimension scales -- so no coordinate values are loaded and no decoding is performed.
+    For either type of file, only the dimensions used by root-level variables are reported,
+    in the order they are first used, as xarray reported them. The axes of HDF5 datasets
+    without dimension scales are given the "phony_dim_N" names that xarray (via h5netcdf) gives them.
+    """
+    if isinstance(dataset, Manifest):
+        return list(dataset.root_dims)
+    elif file_type == "hdf5":
+        return _get_hdf5_root_dims(dataset)
+    else:  # should be "netcdf"
+        dims: dict[str, int] = {}
+        for var in dataset.variables.values():
+            for name in var.dimensions:
+                dims.setdefault(name, dataset.dimensions[name].size)
+        return list(dims.items())
+
+
+def _get_hdf5_root_dims(dataset: h5py.File) -> list:
+    """Get the (name, size) pairs of the dimensions used by the datasets in the root of an HDF5 file."""
+    scales: dict[str, int] = {}
+    variables = []
+    for key in dataset.keys():
+        # Groups are skipped by their object type, without being opened.
+        try:
+            object_type = h5py.h5o.get_info(dataset.id, key.encode("utf-8")).type
+        except (KeyError, OSError, RuntimeError):
+            continue  # e.g., a dangling soft link
+        if object_type != h5py.h5o.TYPE_DATASET:
+            continue
+        obj = dataset[key]
+        if h5py.h5ds.is_scale(obj.id):
+            scales[key] = obj.shape[0] if obj.shape else 0
+            if _NETCDF_DIMENSION_ONLY in obj.attrs.get("NAME", b""):
+                continue
+        if obj.shape is not None:
+            variables.append((key, obj))
+
+    # Phony dimensions cover the unscaled axes of each size, after the scales of that size.
+    unscaled_sizes: Counter = Counter()
+    for key, obj in variables:
+        if key not in scales:
+            unscaled_sizes |= Counter(
+                size for axis, size in enumerate(obj.shape) if not obj.dims[axis]
+            )
+    available = dict(scales)
+    scale_sizes = Counter(scales.values())
+    for size, count in unscaled_sizes.items():
+        for _ in range(scale_sizes[size], count):
+            available[f"phony_dim_{len(available) - len(scales)}"] = size
+
+    dims: dict[str, int] = {}
+    for key, obj in variables:
+        if key in scales:
+            dims.setdefault(key, scales[key])
+            continue
+        num_unscaled: Counter = Counter()
+        for axis, size in enumerate(obj.shape):
+            if obj.dims[axis]:
+                name = obj.dims[axis][0].name.split("/")[-1]
+            else:
+                name = [name for name, dim_size in available.items() if dim_size == size][
+                    num_unscaled[size]
+                ]
+                num_unscaled[size] += 1
+            dims.setdefault(name, size)
+    return list(dims.items())
+
+
+def get_var_properties(
+    group: netCDF4.Dataset | netCDF4.Group | h5py.Group | ManifestGroup,
+    varname: str,
+    file_type: str,
+    original_dataset=None,
+) -> VarProperties:
+    """Get the properties of a variable.
+
+    Parameters
+    ----------
+    group
+        a dataset or group of variables
+    varname
+        the name of the variable; if empty, then blank properties are returned
+    file_type
+        "netcdf", "hdf5", or "manifest"
+    original_dataset
+        the HDF5 file that contains the group, used to resolve object references in attributes;
+        by default, references are resolved against the variable's own file
+
+    Returns
+    -------
+    VarProperties
+    """
+    if not varname:
+        return VarProperties(varname, None, "", "", "", "", None, None)
+
+    if isinstance(group, ManifestGroup):
+        return group.variables[varname]
+
+    if file_type == "hdf5":
+        return _get_hdf5_var_properties(group, varname, original_dataset)
+
+    the_variable = group.variables[varname]
 
-    def __get_dim_list(decode_times=True):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            if file.type == "netcdf":
-                xarray_engine = "netcdf4"
-            elif file.type == "hdf5":
-                xarray_engine = "h5netcdf"
+    v_attributes = {}
+    for name in the_variable.ncattrs():
+        try:
+            retrieved_value = the_variable.getncattr(name)
+        except KeyError as key_err:
+            # Added this check because of "unsupported datatype" error that prevented
+            # fully running comparisons on S5P_OFFL_L1B_IR_UVN collections.
+            retrieved_value = f"netCDF error: {str(key_err)}"
 
-            with xr.open_dataset(
-                file.path, decode_times=decode_times, engine=xarray_engine
-            ) as dataset:
-                return list(dataset.sizes.items())
+        v_attributes[name] = retrieved_value
+
+    # Only netCDF variables expose a scale factor (HDF5 datasets do not have this attribute).
+    scale_factor = getattr(the_variable, "scale_factor", None)
+
+    return VarProperties(
+        varname,
+        the_variable,
+        str(the_variable.dtype),
+        str(the_variable.dimensions),
+        str(the_variable.shape).strip(),
+        str(the_variable.chunking()).strip(),
+        v_attributes,
+        str(scale_factor) if scale_factor is not None else None,
+        attribute_digests=_attribute_digests(v_attributes),
+    )
+
+
+def _get_hdf5_var_properties(
+    group: h5py.Group, varname: str, original_dataset: h5py.File | None
+) -> VarProperties:
+    """Get the properties of an HDF5 dataset, reading its metadata through the low-level API.
+
+    The dataset is opened once, by name, and its dtype, shape, chunking, and dimension labels
+    are read from that one identifier, which skips the object-type and file-mode lookups
+    (and the proxy objects) that the high-level `h5py.Group` and `h5py.Dataset` API go through.
+    """
+    dataset_id = h5py.h5d.open(group.id, varname.encode("utf-8"))
+    the_variable = h5py.Dataset(dataset_id, readonly=True)
 
+    dim_list: list[str] = []
+    for index in range(dataset_id.rank):
+        try:
+            dim_list.append(h5py.h5ds.get_label(dataset_id, index).decode("utf-8", "replace"))
+        except RuntimeError:
+            dim_list.append("none")
+
+    create_plist = dataset_id.get_create_plist()
+    chunks = create_plist.get_chunk() if create_plist.get_layout() == h5py.h5d.CHUNKED else None
+
+    def __name_from_h5_ref(ref):
+        # References are resolved against the file that holds them, never against the other file.
+        dataset = original_dataset if original_dataset is not None else the_variable.file
+        return dataset[ref].name
+
+    raw_attributes = dict(the_variable.attrs.items())
+    v_attributes = {
+        name: _hdf5_attribute_as_str(attribute_value, __name_from_h5_ref)
+        for name, attribute_value in raw_attributes.items()
+    }
+
+    return VarProperties(
+        varname,
+        the_variable,
+        str(dataset_id.dtype),
+        str(dim_list),
+        str(dataset_id.shape).strip(),
+        str(chunks),
+        v_attributes,
+        None,
+        attribute_digests=_attribute_digests(raw_attributes),
+    )
+
+
+def _hdf5_attribute_as_str(value, name_from_ref: Callable[[h5py.Reference], str]) -> str:
+    """Get a string representation of an HDF5 attribute, showing object references by name."""
+    if isinstance(value, h5py.Reference):
+        return name_from_ref(value)
+    if not isinstance(value, np.ndarray):
+        return str(value)
+
+    # Only actual references are resolved; e.g., a string array (such as dimension labels)
+    #   also has an object dtype, which compares equal to `h5py.ref_dtype`.
     try:
-        dims_list = __get_dim_list()
-    except ValueError as err:
-        if "decode_times" in str(err):  # then try again without decoding the times
-            dims_list = __get_dim_list(decode_times=False)
+        if value.dtype == h5py.ref_dtype:
+            first = value[0][0]
+            if isinstance(first, h5py.Reference):
+                return name_from_ref(first)
         else:
-            raise err from None  # "from None" prevents additional trace (see https://stackoverflow.com/a/18188660)
+            references = [element[0] for element in value]
+            if references and all(isinstance(ref, h5py.Reference) for ref in references):
+                return str([name_from_ref(ref) for ref in references])
+    except (IndexError, TypeError):
+        pass
+
+    return str(value)
+
 
-    return dims_list
+def detach_var_properties(properties: VarProperties) -> VarProperties:
+    """Drop the reference to the open variable, and convert attribute values to strings.
+
+    The result holds no live netCDF4/HDF5 handle, so it can outlive the file it was read from.
+    """
+    if properties.attributes is None:
+        return properties._replace(variable=None)
+    return properties._replace(
+        variable=None,
+        attributes={
+            key: get_attribute_value_as_str(properties, key) for key in properties.attributes
+        },
+    )
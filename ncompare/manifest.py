@@ -0,0 +1,234 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Save the structure of a netCDF or HDF file as a compact manifest, and load it back.
+
+A manifest records everything that a comparison looks at -- groups, variables, dtypes, dimensions,
+shapes, chunking, attributes, scale factors, and optionally digests and statistics of the data --
+so that it can be compared against, in place of the file it was made from, without reopening it.
+"""
+
+import json
+from pathlib import Path
+
+import h5py
+import netCDF4
+
+from ncompare.digests import with_digests
+from ncompare.getters import (
+    detach_var_properties,
+    get_root_dims,
+    get_root_groups,
+    get_subgroups,
+    get_var_properties,
+    get_variables,
+    open_dataset,
+    walk_hdf5_hierarchy,
+)
+from ncompare.path_and_string_operations import (
+    ensure_valid_path_exists,
+    ensure_valid_path_with_suffix,
+    validate_file_type,
+)
+from ncompare.stats import with_statistics
+from ncompare.utility_types import Manifest, ManifestGroup, VariableStatistics, VarProperties
+
+MANIFEST_FORMAT = "ncompare-manifest"
+MANIFEST_VERSION = 2
+
+# The variable properties that are stored for each variable in a manifest.
+_RECORD_FIELDS = (
+    "dtype",
+    "dimensions",
+    "shape",
+    "chunking",
+    "attributes",
+    "scale_factor",
+    "data_digest",
+    "raw_digest",
+    "statistics",
+    "attribute_digests",
+)
+
+
+def extract_manifest(
+    dataset: netCDF4.Dataset | h5py.File | Manifest,
+    file_type: str,
+    source: str = "",
+    digests: bool = False,
+    statistics: bool = False,
+) -> Manifest:
+    """Walk an open netCDF or HDF5 file, and collect its structure into a manifest.
+
+    Parameters
+    ----------
+    dataset
+        an open file, as returned by `getters.open_dataset`
+    file_type
+        "netcdf" or "hdf5" (or "manifest", in which case the dataset is returned as is)
+    source
+        a description of where the file came from, e.g., its path
+    digests
+        whether to also record digests of the data of each variable, which requires reading the data
+    statistics
+        whether to also record summary statistics of each variable, which requires reading the data
+
+    Returns
+    -------
+    Manifest
+    """
+    if isinstance(dataset, Manifest):
+        return dataset
+
+    hdf5_hierarchy = walk_hdf5_hierarchy(dataset) if file_type == "hdf5" else None
+
+    manifest = Manifest(
+        source=source,
+        source_type=file_type,
+        root_dims=get_root_dims(dataset, file_type),
+        root_groups=get_root_groups(dataset, file_type),
+        digests=digests,
+        statistics=statistics,
+    )
+
+    # Go through the hierarchy with an explicit stack of (open group, manifest group) pairs.
+    stack: list[tuple] = [(dataset, manifest)]
+    while stack:
+        node, manifest_group = stack.pop()
+        for varname in get_variables(node, file_type, hdf5_hierarchy):
+            properties = get_var_properties(node, varname, file_type, original_dataset=dataset)
+            if digests:
+                properties = with_digests(properties)
+            if statistics:
+                properties = with_statistics(properties)
+            manifest_group.variables[varname] = detach_var_properties(properties)
+        for group_name in get_subgroups(node, file_type, hdf5_hierarchy):
+            subnode = node[group_name]
+            subgroup = ManifestGroup(name=f"{manifest_group.name.rstrip('/')}/{group_name}")
+            manifest_group.groups[group_name] = subgroup
+            stack.append((subnode, subgroup))
+
+    return manifest
+
+
+def manifest_to_dict(manifest: Manifest) -> dict:
+    """Convert a manifest to a dictionary of JSON-serializable types."""
+
+    def _group_to_dict(group: ManifestGroup) -> dict:
+        return {
+            "variables": {
+                varname: {field: getattr(properties, field) for field in _RECORD_FIELDS}
+                for varname, properties in group.variables.items()
+            },
+            "groups": {name: _group_to_dict(subgroup) for name, subgroup in group.groups.items()},
+        }
+
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "source": manifest.source,
+        "type": manifest.source_type,
+        "root_dims": [list(dim) for dim in manifest.root_dims],
+        "root_groups": list(manifest.root_groups),
+        "digests": manifest.digests,
+        "statistics": manifest.statistics,
+        "root": _group_to_dict(manifest),
+    }
+
+
+def manifest_from_dict(content: dict) -> Manifest:
+    """Create a manifest from its dictionary representation (see `manifest_to_dict`)."""
+    if content.get("format") != MANIFEST_FORMAT:
+        raise ValueError("Not an ncompare manifest.")
+    if content.get("version") != MANIFEST_VERSION:
+        raise ValueError(
+            f"Unsupported manifest version <{content.get('version')}>. "
+            f"Expected version <{MANIFEST_VERSION}>."
+        )
+
+    def _fill_group(group: ManifestGroup, group_content: dict) -> None:
+        for varname, record in group_content["variables"].items():
+            if record.get("statistics") is not None:
+                record["statistics"] = VariableStatistics(*record["statistics"])
+            group.variables[varname] = VarProperties(varname=varname, variable=None, **record)
+        for name, subgroup_content in group_content["groups"].items():
+            subgroup = ManifestGroup(name=f"{group.name.rstrip('/')}/{name}")
+            group.groups[name] = subgroup
+            _fill_group(subgroup, subgroup_content)
+
+    manifest = Manifest(
+        source=content["source"],
+        source_type=content["type"],
+        root_dims=[(name, size) for name, size in content["root_dims"]],
+        root_groups=content["root_groups"],
+        digests=content.get("digests", False),
+        statistics=content.get("statistics", False),
+    )
+    _fill_group(manifest, content["root"])
+
+    return manifest
+
+
+def save_manifest(manifest: Manifest, destination: str | Path) -> Path:
+    """Save a manifest to a JSON file."""
+    destination = ensure_valid_path_with_suffix(destination, ".json")
+    with open(destination, "w", encoding="utf-8") as target:
+        json.dump(manifest_to_dict(manifest), target, separators=(",", ":"))
+    return destination
+
+
+def load_manifest(path: str | Path) -> Manifest:
+    """Load a manifest from a JSON file."""
+    with open(path, encoding="utf-8") as source:
+        return manifest_from_dict(json.load(source))
+
+
+def write_manifest(
+    path: str | Path, destination: str | Path, digests: bool = False, statistics: bool = False
+) -> Path:
+    """Save the structure of a netCDF or HDF file as a manifest, for use in later comparisons.
+
+    Parameters
+    ----------
+    path
+        filepath to the netCDF or HDF file
+    destination
+        filepath destination to save the manifest as a JSON file
+    digests
+        whether to also record digests of the data of each variable
+    statistics
+        whether to also record summary statistics of the data of each variable
+
+    Returns
+    -------
+    Path
+        filepath of the saved manifest
+    """
+    file = validate_file_type(ensure_valid_path_exists(path))
+    with open_dataset(file) as dataset:
+        manifest = extract_manifest(
+            dataset, file.type, source=str(file.path), digests=digests, statistics=statistics
+        )
+    return save_manifest(manifest, destination)
@@ -0,0 +1,120 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Pair variables that were moved to another group, or renamed, between two files.
+
+Without this, such a variable is only found in one place of each file, i.e., it shows up as
+two differences: one only in File A, and one only in File B. Variables that are only in one file
+are indexed by a structural signature, which a moved or renamed variable keeps, so that
+likely pairs are found in (roughly) linear time, rather than by comparing every pair.
+"""
+
+from collections import defaultdict
+from typing import Any, NamedTuple
+
+from ncompare.utility_types import VarProperties
+
+
+class UnmatchedVariable(NamedTuple):
+    """A variable that has no counterpart of the same name, in the same group, of the other file."""
+
+    path: str
+    signature: tuple
+    # Anything that should be carried along with the variable, e.g., its `VariableDiff`.
+    payload: Any = None
+
+    @property
+    def group_path(self) -> str:
+        """The path of the group that contains the variable, e.g., "/gt1l"; "/" for the root."""
+        return self.path.rpartition("/")[0] or "/"
+
+    @property
+    def name(self) -> str:
+        """The name of the variable, without its group."""
+        return self.path.rpartition("/")[2]
+
+
+def variable_signature(properties: VarProperties) -> tuple:
+    """Get the structural signature of a variable: its dtype, shape, dimensions, and attributes.
+
+    Attributes are included with their values (and digests, for array-valued attributes),
+    so that variables which merely have the same type and shape are not mistaken for each other.
+    """
+    attributes = properties.attributes or {}
+    digests = properties.attribute_digests or {}
+    return (
+        properties.dtype,
+        properties.shape,
+        properties.dimensions,
+        frozenset((name, str(value), digests.get(name)) for name, value in attributes.items()),
+    )
+
+
+def pair_moved_variables(
+    only_a: list[UnmatchedVariable], only_b: list[UnmatchedVariable]
+) -> list[tuple[UnmatchedVariable, UnmatchedVariable]]:
+    """Pair the variables only in File A with those only in File B that have the same signature.
+
+    A pair is only made when it is unambiguous. For each variable in File A, among the unpaired
+    variables in File B with the same signature, the one that has the same name (i.e., was moved),
+    or else the one in the same group (i.e., was renamed), is chosen, if there is exactly one.
+    Otherwise, the variables are paired (as moved and renamed) only if each is the only one with
+    that signature in its file.
+
+    Returns
+    -------
+    list
+        (variable in File A, variable in File B) pairs, in the order of the variables in File A
+    """
+    index_b: dict[tuple, list[UnmatchedVariable]] = defaultdict(list)
+    for variable in only_b:
+        index_b[variable.signature].append(variable)
+    signature_counts_a: dict[tuple, int] = defaultdict(int)
+    for variable in only_a:
+        signature_counts_a[variable.signature] += 1
+
+    pairs = []
+    for variable_a in only_a:
+        candidates = index_b.get(variable_a.signature)
+        if not candidates:
+            continue
+
+        chosen = _only_one([c for c in candidates if c.name == variable_a.name])
+        if chosen is None:
+            chosen = _only_one([c for c in candidates if c.group_path == variable_a.group_path])
+        if (chosen is None) and (len(candidates) == 1):
+            if signature_counts_a[variable_a.signature] == 1:
+                chosen = candidates[0]
+        if chosen is None:
+            continue
+
+        candidates.remove(chosen)
+        pairs.append((variable_a, chosen))
+
+    return pairs
+
+
+def _only_one(candidates: list[UnmatchedVariable]) -> UnmatchedVariable | None:
+    return candidates[0] if len(candidates) == 1 else None
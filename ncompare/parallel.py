@@ -0,0 +1,148 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Run work on a pool of processes, sized to the CPUs that are actually available."""
+
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def available_cpu_count() -> int:
+    """Get the number of CPUs that this process may use.
+
+    Note
+    ----
+    This respects the process's CPU affinity and, on Linux, any cgroup (v1 or v2) CPU quota
+    of its own cgroup or its ancestors, such as the limits applied to containers, systemd units,
+    or batch-scheduler jobs.
+    """
+    if hasattr(os, "process_cpu_count"):  # Python 3.13+
+        count = os.process_cpu_count() or 1
+    elif hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        count = min(count, max(1, int(quota)))
+
+    return max(1, count)
+
+
+def _cgroup_cpu_quota(
+    cgroup_root: Path = Path("/sys/fs/cgroup"), proc_cgroup: Path = Path("/proc/self/cgroup")
+) -> float | None:
+    """Get the cgroup CPU quota, as a number of CPUs, or None if no quota is set.
+
+    The quota of this process's own cgroup (as listed in `proc_cgroup`) and of each of its
+    ancestors is read, and the smallest applies; e.g., in a systemd slice, or a container without
+    a cgroup namespace, the root cgroup has no quota.
+    """
+    v2_path, v1_path = _own_cgroup_paths(proc_cgroup)
+    quotas = [
+        quota
+        for directory in _cgroup_and_ancestors(cgroup_root, v2_path)
+        if (quota := _cgroup_v2_quota(directory)) is not None
+    ]
+    if not quotas:
+        quotas = [
+            quota
+            for directory in _cgroup_and_ancestors(cgroup_root / "cpu", v1_path)
+            if (quota := _cgroup_v1_quota(directory)) is not None
+        ]
+    return min(quotas) if quotas else None
+
+
+def _own_cgroup_paths(proc_cgroup: Path) -> tuple[str, str]:
+    """Get the path of this process's cgroup v2, and cgroup v1 "cpu" controller, cgroups."""
+    v2_path = v1_path = "/"
+    try:
+        lines = proc_cgroup.read_text().splitlines()
+    except OSError:
+        return v2_path, v1_path
+    for line in lines:
+        # Each line is "hierarchy-ID:controllers:path", where cgroup v2 is "0::path".
+        hierarchy, _, rest = line.partition(":")
+        controllers, _, path = rest.partition(":")
+        if hierarchy == "0" and not controllers:
+            v2_path = path
+        elif "cpu" in controllers.split(","):
+            v1_path = path
+    return v2_path, v1_path
+
+
+def _cgroup_and_ancestors(mount: Path, path: str) -> list[Path]:
+    """Get the directory of a cgroup under its mount, followed by those of its ancestors."""
+    parts = [part for part in path.split("/") if part not in ("", ".", "..")]
+    return [mount.joinpath(*parts[:depth]) for depth in range(len(parts), -1, -1)]
+
+
+def _cgroup_v2_quota(directory: Path) -> float | None:
+    try:
+        quota, period = (directory / "cpu.max").read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _cgroup_v1_quota(directory: Path) -> float | None:
+    try:
+        quota_us = int((directory / "cpu.cfs_quota_us").read_text())
+        period_us = int((directory / "cpu.cfs_period_us").read_text())
+        if quota_us > 0 and period_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def run_pool(
+    function: Callable,
+    tasks: Iterable,
+    jobs: int | None = None,
+    initializer: Callable | None = None,
+    initargs: tuple = (),
+) -> list:
+    """Apply a function to each task on a pool of processes, and return the results in task order.
+
+    With a single job (or a single task), the tasks are run in this process, without a pool.
+    The optional initializer is called, with initargs, once in each worker process; as it sets up
+    state that belongs to a worker (e.g., module globals), it is never called in this process,
+    so a pool of one worker is used instead.
+    """
+    tasks = list(tasks)
+    jobs = min(jobs or available_cpu_count(), max(1, len(tasks)))
+    if jobs == 1 and initializer is None:
+        return list(map(function, tasks))
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    ) as executor:
+        return list(executor.map(function, tasks))
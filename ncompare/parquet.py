@@ -0,0 +1,243 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Write the rows of comparison results to Parquet, a typed columnar format for analytics.
+
+Each comparison can be written to its own Parquet file, and the files of many comparisons
+(e.g., from `ncompare.batch`) put together in one directory, which is read as a single dataset,
+e.g., with `pyarrow.dataset.dataset(directory)`.
+"""
+
+from pathlib import Path
+from typing import Any
+
+from ncompare.rendering import Renderer
+from ncompare.results import ComparisonResult, GroupDiff
+from ncompare.stats import STATISTICS_LABELS
+from ncompare.utility_types import ValueComparison
+
+# The columns of each row, which is a property (or the data values) of a variable, in a pair of files.
+PARQUET_COLUMNS = (
+    "file_a",
+    "file_b",
+    "group_a",
+    "group_b",
+    "variable_a",
+    "variable_b",
+    "property",
+    "value_a",
+    "value_b",
+    "status",
+    # The numeric value of a summary statistic (e.g., "mean") in each file.
+    "number_a",
+    "number_b",
+    # The comparison of the data values of a variable, in its "values" row.
+    "num_compared",
+    "num_mismatches",
+    "differing_fraction",
+    "max_abs_diff",
+    "max_rel_diff",
+    "coverage",
+    "differing_chunks_bound",
+)
+
+# The type of each column that does not hold strings; these columns are null where not applicable.
+PARQUET_COLUMN_TYPES = {
+    "status": "dictionary",
+    "number_a": "float64",
+    "number_b": "float64",
+    "num_compared": "int64",
+    "num_mismatches": "int64",
+    "differing_fraction": "float64",
+    "max_abs_diff": "float64",
+    "max_rel_diff": "float64",
+    "coverage": "float64",
+    "differing_chunks_bound": "float64",
+}
+
+# Rows are buffered, and written as a row group when this many have been collected.
+DEFAULT_ROW_GROUP_SIZE = 65_536
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError(
+            "Writing Parquet files requires the `pyarrow` package, "
+            "e.g., installed with `pip install ncompare[parquet]`."
+        ) from err
+    return pyarrow
+
+
+def _parquet_schema(pyarrow):
+    """Get the schema of the Parquet files, in which "status" is a dictionary-encoded string."""
+    types = {
+        "string": pyarrow.string(),
+        "dictionary": pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+    }
+    return pyarrow.schema(
+        [(name, types[PARQUET_COLUMN_TYPES.get(name, "string")]) for name in PARQUET_COLUMNS]
+    )
+
+
+def _statistic_number(value: str) -> float | None:
+    """Get the number of a formatted summary statistic, or None if it is blank."""
+    return float(value) if value else None
+
+
+class ParquetRenderer(Renderer):
+    """Write a row for each property of each variable in a `ComparisonResult` to a Parquet file.
+
+    The values of each property are strings, and "status" is one of "shared", "left" (only in
+    File A), "right" (only in File B), or "both" (different in each file);
+    or "moved", for a variable that was likely moved or renamed, whose "path" is in the values.
+    Summary statistics are also stored as numbers, and the "values" row of a variable whose data
+    values were compared has the counts (int64) and differences (float64) of that comparison.
+    """
+
+    def __init__(
+        self,
+        filename: str | Path,
+        file_a: str,
+        file_b: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ):
+        """Set up the Parquet file.
+
+        Parameters
+        ----------
+        filename
+            filepath destination of the Parquet file
+        file_a
+            name of the first file, which is stored in every row
+        file_b
+            name of the second file, which is stored in every row
+        row_group_size
+            number of rows that are buffered in memory before they are written
+        """
+        pyarrow = _import_pyarrow()
+        self._pyarrow = pyarrow
+        self._schema = _parquet_schema(pyarrow)
+        self._writer: Any = pyarrow.parquet.ParquetWriter(
+            str(filename), self._schema, compression="zstd"
+        )
+        self._file_pair = (file_a, file_b)
+        self._row_group_size = row_group_size
+        self._columns: dict[str, list[Any]] = {name: [] for name in PARQUET_COLUMNS}
+
+    def __enter__(self):  # noqa: D105
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):  # noqa: D105
+        self.close()
+
+    def _append(self, *row: str, **numbers: Any) -> None:
+        """Buffer a row of the string columns, in order, and of any of the numeric columns."""
+        strings = dict(zip(PARQUET_COLUMNS, self._file_pair + row))
+        for name in PARQUET_COLUMNS:
+            self._columns[name].append(strings[name] if name in strings else numbers.get(name))
+
+    def _write_buffered_rows(self) -> None:
+        if self._columns["file_a"]:
+            self._writer.write_batch(
+                self._pyarrow.record_batch(
+                    [
+                        self._pyarrow.array(self._columns[name], type=field.type)
+                        for name, field in zip(PARQUET_COLUMNS, self._schema)
+                    ],
+                    schema=self._schema,
+                )
+            )
+            for column in self._columns.values():
+                column.clear()
+
+    def group(self, group: GroupDiff) -> None:  # noqa: D102
+        for variable in group.variables:
+            names = (group.name_a, group.name_b, variable.name_a, variable.name_b)
+            for prop in variable.properties:
+                numbers = (
+                    {
+                        "number_a": _statistic_number(prop.value_a),
+                        "number_b": _statistic_number(prop.value_b),
+                    }
+                    if prop.name in STATISTICS_LABELS
+                    else {}
+                )
+                self._append(*names, prop.name, prop.value_a, prop.value_b, prop.status, **numbers)
+            if isinstance(variable.values, ValueComparison):
+                values = variable.values
+                summary = (
+                    f"{values.num_mismatches} of {values.num_compared} differ"
+                    if values.num_mismatches
+                    else f"equal ({values.num_compared} compared)"
+                )
+                status = "both" if values.num_mismatches else "shared"
+                self._append(
+                    *names,
+                    "values",
+                    summary,
+                    summary,
+                    status,
+                    num_compared=int(values.num_compared),
+                    num_mismatches=int(values.num_mismatches),
+                    differing_fraction=(
+                        values.num_mismatches / values.num_compared if values.num_compared else 0.0
+                    ),
+                    max_abs_diff=float(values.max_abs_diff),
+                    max_rel_diff=float(values.max_rel_diff),
+                    coverage=float(values.coverage),
+                    differing_chunks_bound=values.differing_chunks_bound,
+                )
+
+        if len(self._columns["file_a"]) >= self._row_group_size:
+            self._write_buffered_rows()
+
+    def summary(self, result: ComparisonResult) -> None:  # noqa: D102
+        # A moved (or renamed) variable gets one row, whose values are its path in each file.
+        for moved in result.moved_variables:
+            group_a, _, variable_a = moved.path_a.rpartition("/")
+            group_b, _, variable_b = moved.path_b.rpartition("/")
+            self._append(
+                group_a or "/",
+                group_b or "/",
+                variable_a,
+                variable_b,
+                "path",
+                moved.path_a,
+                moved.path_b,
+                "moved",
+            )
+        self._write_buffered_rows()
+
+    def close(self) -> None:
+        """Write any remaining rows, and finish the file, which can only be done once."""
+        if self._writer is not None:
+            self._write_buffered_rows()
+            self._writer.close()
+            self._writer = None
@@ -38,11 +38,20 @@ def ensure_valid_path_exists(should_be_path: str | Path) -> Path:
     raise FileNotFoundError(f"Expected file does not exist: {should_be_path}")
 
 
-def ensure_valid_path_with_suffix(should_be_path: str | Path, suffix: str) -> Path:
-    """Coerce input to a pathlib.Path with given suffix."""
+def ensure_valid_path_with_suffix(
+    should_be_path: str | Path, suffix: str, compression_suffixes: tuple[str, ...] = ()
+) -> Path:
+    """Coerce input to a pathlib.Path with given suffix.
+
+    A path that ends with one of the given compression suffixes (e.g., ".gz") keeps it,
+    and the suffix is ensured before it instead (e.g., "report.csv.gz").
+    """
     if not suffix.startswith("."):
         raise ValueError(f"Invalid suffix: {suffix}. It must start with '.'")
-    return Path(should_be_path).with_suffix(suffix)
+    path = Path(should_be_path)
+    if path.suffix.lower() in compression_suffixes:
+        return path.with_suffix("").with_suffix(suffix + path.suffix)
+    return path.with_suffix(suffix)
 
 
 def coerce_to_str(some_object: str | int | tuple) -> str:
@@ -58,11 +67,13 @@ def validate_file_type(file_path: Path) -> FileToCompare:
         file_type: valid_file_type_ids = "hdf5"
     elif file_path.suffix.lower() in (".nc", ".nc4", ".nc3"):
         file_type = "netcdf"
+    elif file_path.suffix.lower() == ".json":
+        file_type = "manifest"
     else:
         raise TypeError(
             f"{file_path.suffix} is not a valid file type. "
-            f"Expected a netcdf ('.nc', '.nc4', '.nc3') or "
-            f"hdf5 ('.h5', '.hdf5', '.he5)."
+            f"Expected a netcdf ('.nc', '.nc4', '.nc3'), "
+            f"hdf5 ('.h5', '.hdf5', '.he5), or manifest ('.json')."
         )
 
     return FileToCompare(path=file_path, type=file_type)
@@ -27,21 +27,27 @@
 """Utility functions for printing to the console or a text file."""
 
 import csv
+import gzip
 import re
+import sys
 import warnings
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TextIO
 
 import colorama
-import openpyxl
 from colorama import Fore, Style
-from openpyxl.cell import Cell
-from openpyxl.styles import Font
 
+from ncompare.excel import ExcelWriter
+from ncompare.results import difference_status
 from ncompare.sequence_operations import common_elements, count_diffs
 from ncompare.utility_types import SummaryDifferenceKeys
 
+# Suffixes of output files that are compressed as they are written.
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+CSV_HEADERS = ["Info", "File A", "File B", "Other marks"]
+
 # Set up regex remover of ANSI color escape sequences
 #   From <https://stackoverflow.com/a/14693789>
 ansi_escape = re.compile(
@@ -59,6 +65,14 @@ ansi_escape = re.compile(
     re.VERBOSE,
 )
 
+# Console and text-file output is collected, and written in blocks of about this many characters.
+_OUTPUT_BUFFER_CHARS = 64 * 1024
+
+
+def _strip_ansi(string: str) -> str:
+    """Remove ANSI escape sequences, without running the regex on the (usual) text that has none."""
+    return ansi_escape.sub("", string) if "\x1b" in string else string
+
 
 class Outputter:
     """Handler for print statements and saving to text and/or csv files."""
@@ -72,6 +86,10 @@ class Outputter:
         no_color: bool = False,
         text_file: str | Path | None = None,
         column_widths: tuple[int | str, int | str, int | str] | None = None,
+        csv_file: str | Path | None = None,
+        xlsx_file: str | Path | None = None,
+        xlsx_sheet_per_group: bool = False,
+        console: bool = True,
     ):
         """Set up the handling of printing and saving destinations.
 
@@ -87,7 +105,22 @@ class Outputter:
             optional path to a text file to write output to
         column_widths
             optional tuple of column widths to use for printing
+        csv_file
+            optional path to a CSV file, to which each row is written as it is produced;
+            the file is compressed if its name ends with ".gz" or ".zst"
+        xlsx_file
+            optional path to an Excel file, to which each row is written as it is produced
+        xlsx_sheet_per_group
+            whether to start a new sheet of the Excel file for each group
+        console
+            whether to print to the console (stdout); if False, output is only saved to files
         """
+        self._console = console
+        # Lines that are waiting to be written to the console and to the text file (see `flush`).
+        self._console_lines: list[str] = []
+        self._text_lines: list[str] = []
+        self._buffered_chars = 0
+
         # Parse the print history option.
         self._keep_print_history = keep_print_history
         self._line_history: list[list[str]] = []
@@ -119,7 +152,7 @@ class Outputter:
                 Fore.__dict__[k] = ""
             for k, _ in Style.__dict__.items():
                 Style.__dict__[k] = ""
-        else:
+        elif console:
             colorama.init(autoreset=True)
 
         # Open a file
@@ -132,12 +165,71 @@ class Outputter:
         else:
             self._text_file_obj = None
 
+        # Open a CSV file, and write its header, so that rows can be written as they are produced.
+        if csv_file:
+            self._csv_file_obj: TextIO | None = open_text_for_writing(csv_file)
+            self._csv_writer = csv.writer(self._csv_file_obj)
+            self._csv_writer.writerow(CSV_HEADERS)
+        else:
+            self._csv_file_obj = None
+
+        # Set up an Excel workbook, which is also written row by row, and saved on exit.
+        if xlsx_file:
+            self._excel_writer: ExcelWriter | None = ExcelWriter(
+                xlsx_file,
+                difference_marker=self._difference_marker,
+                sheet_per_group=xlsx_sheet_per_group,
+            )
+        else:
+            self._excel_writer = None
+
     def __enter__(self):  # noqa: D105
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):  # noqa: D105
+        self.flush()
         if self._text_file_obj:
             self._text_file_obj.close()
+        if self._csv_file_obj:
+            self._csv_file_obj.close()
+        if self._excel_writer:
+            self._excel_writer.close()
+
+    def flush(self) -> None:
+        """Write the buffered lines to the console and the text file."""
+        if self._console_lines:
+            sys.stdout.write("".join(self._console_lines))
+            sys.stdout.flush()
+            self._console_lines.clear()
+        if self._text_lines and self._text_file_obj:
+            self._text_file_obj.writelines(self._text_lines)
+            self._text_lines.clear()
+        self._buffered_chars = 0
+
+    def _write_line(self, console_line: str, plain_line: str | None = None) -> None:
+        """Buffer a line for the console and, without ANSI escape sequences, for the text file.
+
+        Parameters
+        ----------
+        console_line
+            the line, as shown in the console (possibly colored)
+        plain_line
+            the same line without ANSI escape sequences, if already known
+        """
+        if self._console:
+            if "\x1b" in console_line:
+                # Reset the style at the end of each colored line, as it is not printed on its own.
+                self._console_lines.append(console_line + Style.RESET_ALL + "\n")
+            else:
+                self._console_lines.append(console_line + "\n")
+        if self._text_file_obj:
+            if plain_line is None:
+                plain_line = _strip_ansi(console_line)
+            self._text_lines.append(plain_line + "\n")
+
+        self._buffered_chars += len(console_line)
+        if self._buffered_chars >= _OUTPUT_BUFFER_CHARS:
+            self.flush()
 
     def print(
         self,
@@ -148,6 +240,8 @@ class Outputter:
     ) -> None:
         """Print text using custom options.
 
+        Output is buffered, and written in blocks (see `flush`).
+
         Parameters
         ----------
         string
@@ -157,31 +251,36 @@ class Outputter:
         print_args
             Additional keyword arguments that are passed to the standard Python print() function.
         """
+        string = str(string)
+        # Only the colors within the given string need to be removed for the uncolored text.
+        plain = _strip_ansi(string) if (self._text_file_obj or add_to_history) else None
+
         # Decide if colors are to be used or not.
         if colors is False:
             text_to_print = self._make_normal(string)
         else:
             text_to_print = string
 
-        # Execute the print command.
-        print(text_to_print, **print_args)
-
-        # Optional - write text to file
-        if self._text_file_obj:
-            # Remove ANSI escape sequences.
-            result = ansi_escape.sub("", text_to_print)
-            self._text_file_obj.write(result + "\n")
+        if print_args:
+            # Custom print options bypass the buffer, so the buffer is written first to keep the order.
+            self.flush()
+            if self._console:
+                print(text_to_print, **print_args)
+            if self._text_file_obj:
+                self._text_file_obj.write(f"{plain}\n")
+        else:
+            self._write_line(text_to_print, plain)
 
         # Optional - save text to a history list
         if add_to_history:
-            self._add_to_history(text_to_print)
+            self._save_row([plain.strip("\n")])  # type: ignore[union-attr]
 
     def _add_to_history(self, *args):
         """Convert a list of items to a comma-separated string that is added to the csv history."""
 
         def _parse_single_str(s):  # pylint: disable=invalid-name
             # Remove ANSI escape sequences before adding to a parsed string list.
-            result = ansi_escape.sub("", s)
+            result = _strip_ansi(s)
             # Remove any leading or trailing newlines.
             return result.strip("\n")
 
@@ -204,8 +303,16 @@ class Outputter:
         else:
             raise TypeError(f"Invalid type <{type(args)}>. Expected a `str` or `list`.")
 
+        self._save_row(parsed_strings)
+
+    def _save_row(self, row: list[str]) -> None:
+        """Write a row of uncolored strings to the CSV and Excel files, and/or keep it in the history."""
+        if self._csv_file_obj:
+            self._csv_writer.writerow(row)
+        if self._excel_writer:
+            self._excel_writer.append(row)
         if self._keep_print_history:
-            self._line_history.append(parsed_strings)
+            self._line_history.append(row)
 
     @staticmethod
     def _make_normal(string):
@@ -242,7 +349,8 @@ class Outputter:
             "right" if str_b is empty, and
             "both" if they are different from each other.
         """
-        are_different = str_b != str_c
+        status = difference_status(str_b, str_c)
+        are_different = status != "shared"
         if (
             (force_display_even_if_same is False)
             and (are_different is False)
@@ -253,46 +361,37 @@ class Outputter:
         # If the 'b' and 'c' strings are different (or force_color is set),
         #   then change the font of 'a' to the color red.
         if (highlight_diff and are_different) or (force_color is not None):
-            default_color = Fore.RED
-            if force_color is not None:
-                str_a = force_color + str_a
-            else:
-                str_a = default_color + str_a
-            colors = False
-            extra_style_space = " " * len(default_color)
+            color = force_color if force_color is not None else Fore.RED
+            # The extra space makes up for the width of the escape sequence, to keep columns aligned.
+            extra_style_space = " " * len(Fore.RED)
             str_marker = self._difference_marker
         else:
-            colors = True
+            color = ""
             extra_style_space = ""
             str_marker = ""
 
-        if dash_line:
-            self.print(
-                f" {extra_style_space}"
-                f"{str_a:>{self._column_widths[0]}} "
-                f"{str_b:->{self._column_widths[1]}} "
-                f"{str_c:->{self._column_widths[2]}}",
-                colors=colors,
+        str_a, str_b, str_c = str(str_a), str(str_b), str(str_c)
+        fill = "-" if dash_line else " "
+        width_a, width_b, width_c = self._column_widths
+        columns_bc = f"{str_b:{fill}>{width_b}} {str_c:{fill}>{width_c}}"
+        if color:
+            console_line = self._make_normal(
+                f" {extra_style_space}{color + str_a:>{width_a}} {columns_bc}"
             )
-        else:
-            self.print(
-                f" {extra_style_space}"
-                f"{str_a:>{self._column_widths[0]}} "
-                f"{str_b:>{self._column_widths[1]}} "
-                f"{str_c:>{self._column_widths[2]}}",
-                colors=colors,
+            # The uncolored line is formatted directly, rather than by removing the escape sequence.
+            plain_line = (
+                f" {extra_style_space}{str_a:>{max(width_a - len(color), 0)}} {columns_bc}"
+                if self._text_file_obj
+                else None
             )
+        else:
+            console_line = f" {str_a:>{width_a}} {columns_bc}"
+            plain_line = None
+        self._write_line(console_line, plain_line)
 
-        self._add_to_history(str_a, str_b, str_c, str_marker)
+        self._save_row([_strip_ansi(s).strip("\n") for s in (str_a, str_b, str_c)] + [str_marker])
 
-        if not are_different:
-            return "shared"
-        elif str_b and (not str_c):
-            return "left"  # there is only a non-empty string on the left side.
-        elif str_c and (not str_b):
-            return "right"  # there is only a non-empty string on the right side.
-        else:
-            return "both"  # there are non-empty strings on both sides, and they are not equal.
+        return status
 
     def side_by_side_list_diff(self, list_a: list, list_b: list, counter_prefix="") -> None:
         """Print the items from two lists vertically (i.e., side by side), with customized formatting.
@@ -378,35 +477,43 @@ class Outputter:
 
     def write_history_to_csv(self, filename: str | Path = "test.csv") -> None:
         """Save the line history that's been stored to a CSV file."""
-        headers = ["Info", "File A", "File B", "Other marks"]
-        with open(filename, "w", encoding="utf-8") as target:
+        with open_text_for_writing(filename) as target:
             writer = csv.writer(target)
-            writer.writerow(headers)
+            writer.writerow(CSV_HEADERS)
             writer.writerows(self._line_history)
 
     def write_history_to_excel(self, filename: str | Path = "test.xlsx") -> None:
         """Save the line history that's been stored to an Excel file."""
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-
-        # Add a header row
-        sheet.append(["Info", "File A", "File B"])
-
-        # Add rows and apply styles
-        for row in self._line_history:
-            if (len(row) > 3) and (row[3] == self._difference_marker):
-                # The case where there is a difference that we want to highlight
-                #   First, remove difference marker that is redundant with styles applied to the row (unlike in the CSV)
-                del row[3]
-                sheet.append(_excel_red_cells(row, sheet))
-            elif (len(row) == 1) or ((len(row) == 3) and ((row[1] == "") and (row[2] == ""))):
-                # The case where there is a subheader and no information in the second and third columns.
-                sheet.append(_excel_bold_underline_cells(row, sheet))
-            else:
-                sheet.append(row)
-
-        # Wrap up
-        workbook.save(filename)
+        with ExcelWriter(filename, difference_marker=self._difference_marker) as writer:
+            for row in self._line_history:
+                writer.append(row)
+
+
+def open_text_for_writing(filename: str | Path) -> TextIO:
+    """Open a text file for writing, which is compressed if its name ends with ".gz" or ".zst".
+
+    Zstandard compression uses the standard library (Python 3.14+) or the optional `zstandard` package.
+    """
+    filepath = Path(filename)
+    suffix = filepath.suffix.lower()
+    if suffix == ".gz":
+        return gzip.open(filepath, "wt", encoding="utf-8")
+    if suffix == ".zst":
+        try:
+            from compression import zstd  # type: ignore[import-not-found]
+
+            return zstd.open(filepath, "wt", encoding="utf-8")
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError as err:
+            raise ImportError(
+                "Writing a '.zst' file requires Python 3.14+ or the `zstandard` package, "
+                "e.g., installed with `pip install ncompare[zstd]`."
+            ) from err
+        return zstandard.open(filepath, "wt", encoding="utf-8")
+    return open(filepath, "w", encoding="utf-8")  # pylint: disable=consider-using-with
 
 
 def _item_is_or_are(count) -> str:
@@ -414,19 +521,3 @@ def _item_is_or_are(count) -> str:
         return f"{count} item is"
 
     return f"{count} items are"
-
-
-def _excel_red_cells(data, sheet) -> Iterator:
-    """Stylize cells in Excel with a red font."""
-    for cell in data:
-        cell = Cell(sheet, column="A", row=1, value=cell)
-        cell.font = Font(bold=True, color="FFFF0000")
-        yield cell
-
-
-def _excel_bold_underline_cells(data, sheet) -> Iterator:
-    """Stylize cells in Excel with a bold and underlined font."""
-    for cell in data:
-        cell = Cell(sheet, column="A", row=1, value=cell)
-        cell.font = Font(bold=True, underline="single")
-        yield cell
@@ -0,0 +1,384 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Write a comparison result: side by side on the console and in text, CSV, and Excel files;
+or as newline-delimited JSON records.
+"""
+
+import json
+from typing import TextIO
+
+from colorama import Fore
+
+from ncompare.printing import Outputter
+from ncompare.results import (
+    ComparisonResult,
+    GroupDiff,
+    ListDiff,
+    VariableDiff,
+    difference_status,
+)
+from ncompare.utility_types import SummaryDifferenceKeys, SummaryDifferencesDict, ValueComparison
+
+
+class Renderer:
+    """Base class for writing each part of a `ComparisonResult`, as soon as it is available.
+
+    The parts are given in order -- root dimensions, root groups, each group, and the summary --
+    so that output can be written while a comparison is still running.
+    """
+
+    def render(self, result: ComparisonResult) -> None:
+        """Write a complete result."""
+        self.root_dimensions(result.root_dimensions)
+        self.root_groups(result.root_groups)
+        for group in result.groups:
+            self.group(group)
+        self.summary(result)
+
+    def root_dimensions(self, dimensions: ListDiff) -> None:
+        """Write the root-level dimensions of each file."""
+
+    def root_groups(self, groups: ListDiff) -> None:
+        """Write the groups in the root of each file."""
+
+    def group(self, group: GroupDiff) -> None:
+        """Write a group, and each of its variables."""
+
+    def summary(self, result: ComparisonResult) -> None:
+        """Write the summary counts of similarities and differences."""
+
+
+class ResultRenderer(Renderer):
+    """Write a `ComparisonResult` side by side, to an `Outputter`."""
+
+    def __init__(self, out: Outputter):
+        """Set up the destination of the output.
+
+        Parameters
+        ----------
+        out
+            handles printing to the console and saving to text, CSV, and/or Excel files
+        """
+        self.out = out
+
+    def root_dimensions(self, dimensions: ListDiff) -> None:
+        """Show the root-level dimensions of each file and evaluate differences."""
+        self.out.print(Fore.LIGHTBLUE_EX + "\nRoot-level Dimensions:", add_to_history=True)
+        self.out.lists_diff(dimensions.items_a, dimensions.items_b)
+
+    def root_groups(self, groups: ListDiff) -> None:
+        """Show the groups in the root of each file and evaluate differences."""
+        self.out.print(Fore.LIGHTBLUE_EX + "\nRoot-level Groups:", add_to_history=True)
+        self.out.lists_diff(groups.items_a, groups.items_b)
+
+    def group(self, group: GroupDiff) -> None:
+        """Align and display group details, and each of its variables, side by side."""
+        if group.index == 0:
+            # The first (i.e., root) group is preceded by the header of all variables.
+            self.out.print(Fore.LIGHTBLUE_EX + "\nAll variables:", add_to_history=True)
+            self.out.side_by_side(" ", "File A", "File B", force_display_even_if_same=True)
+            self.out.side_by_side(
+                "All Variables", " ", " ", dash_line=False, force_display_even_if_same=True
+            )
+            self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
+
+        self.out.side_by_side(
+            " ", " ", " ", dash_line=False, highlight_diff=False, force_display_even_if_same=True
+        )
+        self.out.side_by_side(
+            f"GROUP #{group.index:02}",
+            group.name_a.strip(),
+            group.name_b.strip(),
+            dash_line=True,
+            highlight_diff=False,
+            force_display_even_if_same=True,
+        )
+        self.out.side_by_side(
+            "num variables in group:",
+            group.num_variables_a,
+            group.num_variables_b,
+            highlight_diff=True,
+            force_display_even_if_same=True,
+        )
+        self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
+
+        for variable in group.variables:
+            self.variable(variable)
+
+    def variable(self, variable: VariableDiff) -> None:
+        """Align and display variable properties side by side."""
+        # If all properties are the same, and keep-only-diffs is set -> DON'T print the header
+        # If all properties are the same, and keep-only-diffs is NOT set -> print
+        # If some properties are different -> print no matter else
+        if variable.has_differences or (not self.out.keep_only_diffs):
+            self.out.side_by_side(
+                "-----VARIABLE-----:",
+                variable.name_a[:47],
+                variable.name_b[:47],
+                highlight_diff=False,
+                force_display_even_if_same=True,
+            )
+
+        for prop in variable.properties:
+            self.out.side_by_side(f"{prop.name}:", prop.value_a, prop.value_b, highlight_diff=True)
+
+        if variable.values is not None:
+            self.values(variable.values)
+
+    def values(self, values: ValueComparison | str) -> None:
+        """Display the result of comparing the data values of a variable, in both columns."""
+        if isinstance(values, str):
+            self.out.side_by_side("values:", values, values)
+            return
+
+        # For a sample of chunks, state how much was compared, and how much could still differ.
+        sample_rows = []
+        if values.differing_chunks_bound is not None:
+            sample_rows = [
+                ("sampled coverage:", f"{values.coverage:.2%} of values"),
+                ("95% bound, differing chunks:", f"< {values.differing_chunks_bound:.2%}"),
+            ]
+
+        if not values.num_mismatches:
+            result = f"equal ({values.num_compared} compared)"
+            self.out.side_by_side("values:", result, result)
+            for label, result in sample_rows:
+                self.out.side_by_side(label, result, result)
+            return
+
+        rows = [
+            ("value mismatches:", f"{values.num_mismatches} of {values.num_compared}"),
+            ("max absolute difference:", f"{values.max_abs_diff:.6g}"),
+            ("max relative difference:", f"{values.max_rel_diff:.6g}"),
+            ("first difference at index:", str(values.first_diff_index)),
+        ]
+        for label, result in rows + sample_rows:
+            self.out.side_by_side(
+                label, result, result, force_display_even_if_same=True, force_color=Fore.RED
+            )
+
+    def summary(self, result: ComparisonResult) -> None:
+        """Print summary counts of similarities and differences."""
+        self.out.side_by_side("-", "-", "-", dash_line=True, force_display_even_if_same=True)
+        self.out.side_by_side("SUMMARY", "-", "-", dash_line=True, force_display_even_if_same=True)
+
+        self._summary_counts("variable", result.variable_counts)
+        self._summary_counts("group", result.group_counts)
+        self._summary_counts("attribute", result.attribute_counts)
+        if result.compared_values:
+            self.out.side_by_side(
+                "Total # of vars w/ equal values:",
+                str(result.value_counts["shared"]),
+                str(result.value_counts["shared"]),
+                force_display_even_if_same=True,
+            )
+            self.out.side_by_side(
+                "Total # of vars w/ diff. values:",
+                str(result.value_counts["both"]),
+                str(result.value_counts["both"]),
+                force_display_even_if_same=True,
+            )
+        if result.detected_moves:
+            num_moved = str(len(result.moved_variables))
+            self.out.side_by_side(
+                "Total # of moved/renamed vars:",
+                num_moved,
+                num_moved,
+                force_display_even_if_same=True,
+            )
+
+        if not result.complete:
+            self.out.print(
+                Fore.LIGHTBLUE_EX
+                + "\nStopped at the first difference; not all items were compared.",
+                add_to_history=True,
+            )
+
+        if result.attribute_counts["difference_types"]:
+            self.out.print(
+                Fore.LIGHTBLUE_EX + "\nDifferences were found in these attributes:",
+                add_to_history=True,
+            )
+            self.out.print(
+                Fore.LIGHTBLUE_EX + f"\n{sorted(result.attribute_counts['difference_types'])}",
+                add_to_history=True,
+            )
+
+        if result.moved_variables:
+            self.out.print(
+                Fore.LIGHTBLUE_EX + "\nThese variables were likely moved or renamed:",
+                add_to_history=True,
+            )
+            for moved in result.moved_variables:
+                self.out.side_by_side(
+                    f"{moved.kind}:",
+                    moved.path_a,
+                    moved.path_b,
+                    highlight_diff=True,
+                    force_display_even_if_same=True,
+                )
+
+    def _summary_counts(self, item_type: str, counts: SummaryDifferencesDict) -> None:
+        # Items with non-empty entries on both the left and right sides count for each side.
+        self.out.side_by_side(
+            f"Total # of shared {item_type}s:",
+            str(counts["shared"]),
+            str(counts["shared"]),
+            force_display_even_if_same=True,
+        )
+        self.out.side_by_side(
+            f"Total # of non-shared {item_type}s:",
+            str(counts["left"] + counts["both"]),
+            str(counts["right"] + counts["both"]),
+            force_display_even_if_same=True,
+        )
+
+
+class NdjsonRenderer(Renderer):
+    """Write a `ComparisonResult` as newline-delimited JSON, with one record per line.
+
+    Each record has a "type" -- one of "root_dimensions", "root_groups", "group", "variable",
+    "property", "values", "moved", or "summary" -- and, where applicable, a "status" that
+    classifies it as "shared", only on the "left" (File A), only on the "right" (File B),
+    or differing on "both". A variable's status is "both" if any of its properties or data values
+    differ, and the status of data values that could not be compared is "not compared".
+    A "moved" record pairs a variable only in File A with one only in File B, at another path.
+    """
+
+    def __init__(self, target: TextIO, only_diffs: bool = False):
+        """Set up the destination of the records.
+
+        Parameters
+        ----------
+        target
+            an open text file (or stream), to which records are written
+        only_diffs
+            whether to leave out the records of variables and properties that are the same
+        """
+        self.target = target
+        self.only_diffs = only_diffs
+
+    def _write(self, record: dict) -> None:
+        self.target.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _list_diff(self, record_type: str, items: ListDiff) -> None:
+        self._write(
+            {
+                "type": record_type,
+                "items_a": items.items_a,
+                "items_b": items.items_b,
+                "left": items.left,
+                "right": items.right,
+                "shared": items.shared,
+            }
+        )
+
+    def root_dimensions(self, dimensions: ListDiff) -> None:  # noqa: D102
+        self._list_diff("root_dimensions", dimensions)
+
+    def root_groups(self, groups: ListDiff) -> None:  # noqa: D102
+        self._list_diff("root_groups", groups)
+
+    def group(self, group: GroupDiff) -> None:  # noqa: D102
+        names = {"group_a": group.name_a, "group_b": group.name_b}
+        self._write(
+            {
+                "type": "group",
+                **names,
+                "status": difference_status(group.name_a, group.name_b),
+                "num_variables_a": group.num_variables_a,
+                "num_variables_b": group.num_variables_b,
+            }
+        )
+
+        for variable in group.variables:
+            has_differences = variable.has_differences
+            if self.only_diffs and not has_differences:
+                continue
+            names["variable_a"] = variable.name_a
+            names["variable_b"] = variable.name_b
+            status: SummaryDifferenceKeys = difference_status(variable.name_a, variable.name_b)
+            if (status == "shared") and has_differences:
+                status = "both"
+            self._write({"type": "variable", **names, "status": status})
+
+            for prop in variable.properties:
+                if self.only_diffs and (prop.status == "shared"):
+                    continue
+                self._write(
+                    {
+                        "type": "property",
+                        **names,
+                        "property": prop.name,
+                        "value_a": prop.value_a,
+                        "value_b": prop.value_b,
+                        "status": prop.status,
+                    }
+                )
+
+            if variable.values is not None:
+                self._write({"type": "values", **names, **_values_fields(variable.values)})
+
+    def summary(self, result: ComparisonResult) -> None:  # noqa: D102
+        for moved in result.moved_variables:
+            self._write(
+                {
+                    "type": "moved",
+                    "path_a": moved.path_a,
+                    "path_b": moved.path_b,
+                    "kind": moved.kind,
+                }
+            )
+
+        record: dict = {"type": "summary"}
+        for item_type, counts in (
+            ("variables", result.variable_counts),
+            ("groups", result.group_counts),
+            ("attributes", result.attribute_counts),
+        ):
+            record[item_type] = {key: counts[key] for key in ("shared", "left", "right", "both")}  # type: ignore[literal-required]
+        if result.compared_values:
+            record["values"] = {
+                "equal": result.value_counts["shared"],
+                "different": result.value_counts["both"],
+            }
+        if result.detected_moves:
+            record["moved_variables"] = len(result.moved_variables)
+        record["attribute_difference_types"] = sorted(result.attribute_counts["difference_types"])
+        record["total_diff_count"] = result.total_diff_count
+        record["complete"] = result.complete
+        self._write(record)
+        self.target.flush()
+
+
+def _values_fields(values: ValueComparison | str) -> dict:
+    """Get the fields of a record of a value comparison, or of the reason it was not done."""
+    if isinstance(values, str):
+        return {"status": "not compared", "reason": values}
+    fields = values._asdict()
+    if fields["first_diff_index"] is not None:
+        fields["first_diff_index"] = [int(index) for index in fields["first_diff_index"]]
+    return {"status": "both" if values.num_mismatches else "shared", **fields}
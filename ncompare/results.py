@@ -0,0 +1,217 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""A typed tree of the differences between two files, which is independent of how it is displayed.
+
+A comparison produces a `ComparisonResult`, which holds a `GroupDiff` for each (pair of) groups,
+which hold a `VariableDiff` for each (pair of) variables, which hold a `PropertyDiff`
+for each compared property. See `ncompare.rendering` for writing a result as text, CSV, or Excel.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ncompare.sequence_operations import count_diffs
+from ncompare.utility_types import SummaryDifferenceKeys, SummaryDifferencesDict, ValueComparison
+
+
+def blank_difference_counts() -> SummaryDifferencesDict:
+    """Create a new tally of shared and non-shared items."""
+    return {"shared": 0, "left": 0, "right": 0, "both": 0, "difference_types": set()}
+
+
+def difference_status(value_a, value_b) -> SummaryDifferenceKeys:
+    """Classify a pair of values as "shared", or present only on the "left" or "right", or "both".
+
+    Returns
+    -------
+    str
+        "shared" if the values are equal,
+        "left" if only value_b is empty,
+        "right" if only value_a is empty, and
+        "both" if they are different from each other.
+    """
+    if value_a == value_b:
+        return "shared"
+    if value_a and (not value_b):
+        return "left"
+    if value_b and (not value_a):
+        return "right"
+    return "both"
+
+
+@dataclass(slots=True)
+class PropertyDiff:
+    """A property (e.g., dtype, shape, or an attribute) of a variable, as found in each file."""
+
+    name: str
+    value_a: str
+    value_b: str
+    status: SummaryDifferenceKeys
+
+
+@dataclass(slots=True)
+class VariableDiff:
+    """The compared properties, and optionally data values, of a variable in each file.
+
+    The name on either side is empty if the variable is only in the other file.
+    """
+
+    name_a: str
+    name_b: str
+    properties: list[PropertyDiff] = field(default_factory=list)
+    # The result of comparing data values, or a reason why they were not compared, or None.
+    values: ValueComparison | str | None = None
+
+    @property
+    def has_differences(self) -> bool:
+        """Whether any property, or any data value, differs between the files."""
+        if isinstance(self.values, ValueComparison) and self.values.num_mismatches > 0:
+            return True
+        return any(prop.status != "shared" for prop in self.properties)
+
+
+@dataclass(slots=True)
+class GroupDiff:
+    """The variables of a group in each file, where a name is empty if the group is only in one."""
+
+    index: int
+    name_a: str
+    name_b: str
+    num_variables_a: int
+    num_variables_b: int
+    variables: list[VariableDiff] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ListDiff:
+    """Two lists of items, e.g., the root-level dimensions of each file, and how they overlap."""
+
+    items_a: list
+    items_b: list
+    left: int = field(init=False)
+    right: int = field(init=False)
+    shared: int = field(init=False)
+
+    def __post_init__(self):  # noqa: D105
+        self.left, self.right, self.shared = count_diffs(self.items_a, self.items_b)
+
+
+@dataclass(slots=True)
+class MovedVariable:
+    """A variable in File A that is likely the same as one in another place, or name, in File B."""
+
+    path_a: str
+    path_b: str
+
+    @property
+    def kind(self) -> str:
+        """Whether the variable was "moved" (to another group), "renamed", or "moved and renamed"."""
+        group_a, _, name_a = self.path_a.rpartition("/")
+        group_b, _, name_b = self.path_b.rpartition("/")
+        if name_a == name_b:
+            return "moved"
+        if group_a == group_b:
+            return "renamed"
+        return "moved and renamed"
+
+
+@dataclass(slots=True)
+class ComparisonResult:
+    """All the differences found between two files, along with tallies of them."""
+
+    file_a: str
+    file_b: str
+    root_dimensions: ListDiff
+    root_groups: ListDiff
+    groups: list[GroupDiff] = field(default_factory=list)
+    group_counts: SummaryDifferencesDict = field(default_factory=blank_difference_counts)
+    variable_counts: SummaryDifferencesDict = field(default_factory=blank_difference_counts)
+    attribute_counts: SummaryDifferencesDict = field(default_factory=blank_difference_counts)
+    # Variables whose values are equal ("shared") or differ ("both") between the files.
+    value_counts: SummaryDifferencesDict = field(default_factory=blank_difference_counts)
+    compared_values: bool = False
+    # False if the comparison stopped at the first difference, i.e., not all items were compared.
+    complete: bool = True
+    # Whether moved and renamed variables were looked for, and those that were found.
+    detected_moves: bool = False
+    moved_variables: list[MovedVariable] = field(default_factory=list)
+
+    @property
+    def total_diff_count(self) -> int:
+        """Total number of differences found (across variables, groups, attributes, and values).
+
+        Items that differ on both sides count once for each side, and a moved (or renamed)
+        variable counts once. If the comparison is not complete,
+        this only counts the differences found before it stopped.
+        """
+        return (
+            sum(
+                counts["left"] + counts["right"] + 2 * counts["both"]
+                for counts in (self.variable_counts, self.group_counts, self.attribute_counts)
+            )
+            + self.value_counts["both"]
+            + len(self.moved_variables)
+        )
+
+    def add_moved_variables(
+        self, pairs: Iterable[tuple[str, VariableDiff, str, VariableDiff]]
+    ) -> None:
+        """Record pairs of a variable only in File A and one only in File B that are likely the same.
+
+        They are then no longer tallied as a variable (and properties) only in each file,
+        and the attributes in which differences were found are recounted without them.
+
+        Parameters
+        ----------
+        pairs
+            the path and variable in File A, and the path and variable in File B, of each pair
+        """
+        num_moved = len(self.moved_variables)
+        for path_a, variable_a, path_b, variable_b in pairs:
+            self.moved_variables.append(MovedVariable(path_a, path_b))
+            self.variable_counts["left"] -= 1
+            self.variable_counts["right"] -= 1
+            for variable in (variable_a, variable_b):
+                for prop in variable.properties:
+                    self.attribute_counts[prop.status] -= 1
+        if len(self.moved_variables) == num_moved:
+            return
+
+        moved_a = {moved.path_a for moved in self.moved_variables}
+        moved_b = {moved.path_b for moved in self.moved_variables}
+        difference_types: set[str] = set()
+        for group in self.groups:
+            for variable in group.variables:
+                if variable.name_a and not variable.name_b:
+                    if f"{group.name_a.rstrip('/')}/{variable.name_a}" in moved_a:
+                        continue
+                elif variable.name_b and not variable.name_a:
+                    if f"{group.name_b.rstrip('/')}/{variable.name_b}" in moved_b:
+                        continue
+                difference_types.update(
+                    prop.name for prop in variable.properties if prop.status != "shared"
+                )
+        self.attribute_counts["difference_types"] = difference_types
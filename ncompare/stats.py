@@ -0,0 +1,154 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Compute summary statistics of the data of variables, in a single chunked pass."""
+
+import math
+
+import h5py
+import netCDF4
+import numpy as np
+
+from ncompare.utility_types import VariableStatistics, VarProperties
+from ncompare.values import (
+    DEFAULT_BLOCK_BYTES,
+    block_shape,
+    element_size,
+    iter_blocks,
+    native_chunks,
+)
+
+# The label of each statistic, in the order of the fields of `VariableStatistics`.
+STATISTICS_LABELS = ("min", "max", "mean", "std", "NaN count", "fill count")
+
+
+class RunningStatistics:
+    """Running aggregates of a stream of values, which are updated one block at a time.
+
+    The mean and variance are combined across blocks with the numerically stable,
+    pairwise update of Chan et al., so that memory use is independent of the number of values.
+    """
+
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum", "nan_count", "fill_count")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.minimum = math.nan
+        self.maximum = math.nan
+        self.nan_count = 0
+        self.fill_count = 0
+
+    def update(self, values, fill_value=None) -> None:
+        """Add a block of values, skipping masked values, fill values, and NaNs."""
+        data = np.ma.getdata(values)
+        fill = np.ma.getmaskarray(values)
+        if fill_value is not None:
+            fill = fill | (data == fill_value)
+        self.fill_count += int(np.count_nonzero(fill))
+
+        valid = np.asarray(data[~fill], dtype=np.float64)
+        nans = np.isnan(valid)
+        self.nan_count += int(np.count_nonzero(nans))
+        valid = valid[~nans]
+        if not valid.size:
+            return
+
+        block_count = valid.size
+        block_mean = float(valid.mean())
+        block_m2 = float(np.square(valid - block_mean).sum())
+        total = self.count + block_count
+        delta = block_mean - self.mean
+        self.mean += delta * block_count / total
+        self.m2 += block_m2 + delta * delta * self.count * block_count / total
+        self.count = total
+
+        self.minimum = float(np.fmin(self.minimum, valid.min()))
+        self.maximum = float(np.fmax(self.maximum, valid.max()))
+
+    def result(self) -> VariableStatistics:
+        """Get the statistics of all values so far; the std is that of the population."""
+        return VariableStatistics(
+            minimum=self.minimum,
+            maximum=self.maximum,
+            mean=self.mean if self.count else math.nan,
+            std=math.sqrt(self.m2 / self.count) if self.count else math.nan,
+            nan_count=self.nan_count,
+            fill_count=self.fill_count,
+        )
+
+
+def variable_statistics(
+    variable: netCDF4.Variable | h5py.Dataset, max_block_bytes: int = DEFAULT_BLOCK_BYTES
+) -> VariableStatistics | None:
+    """Compute the summary statistics of a variable, reading it one block of chunks at a time.
+
+    Values that are masked by netCDF4, or equal to the `_FillValue` attribute of an HDF5 dataset,
+    are counted as fill values, and are excluded (as are NaNs) from the other statistics.
+
+    Parameters
+    ----------
+    variable
+        an open netCDF4 variable or h5py dataset
+    max_block_bytes
+        upper bound on the number of bytes read at a time
+
+    Returns
+    -------
+    VariableStatistics or None
+        None if the variable does not hold real numbers, or holds no data at all
+    """
+    dtype = variable.dtype
+    if not (isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.number)) or (dtype.kind == "c"):
+        return None
+    if variable.shape is None:
+        # An HDF5 dataset with a null dataspace
+        return None
+
+    fill_value = None
+    if isinstance(variable, h5py.Dataset) and "_FillValue" in variable.attrs:
+        fill_value = np.asarray(variable.attrs["_FillValue"]).ravel()[0]
+
+    shape = tuple(variable.shape)
+    statistics = RunningStatistics()
+    block = block_shape(shape, element_size(variable), native_chunks(variable), max_block_bytes)
+    for slices in iter_blocks(shape, block):
+        statistics.update(variable[slices], fill_value)
+    return statistics.result()
+
+
+def format_statistics(statistics: VariableStatistics | None) -> tuple[str, ...]:
+    """Format each statistic for display, or get blank strings if there are no statistics."""
+    if statistics is None:
+        return ("",) * len(STATISTICS_LABELS)
+    return tuple(f"{value:.7g}" if isinstance(value, float) else str(value) for value in statistics)
+
+
+def with_statistics(properties: VarProperties) -> VarProperties:
+    """Add the summary statistics of an open variable to its properties."""
+    if properties.variable is None:
+        return properties
+    return properties._replace(statistics=variable_statistics(properties.variable))
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal, TypedDict
 
-valid_file_type_ids = Literal["netcdf", "hdf5"]
+valid_file_type_ids = Literal["netcdf", "hdf5", "manifest"]
 
 
 @dataclass
@@ -12,13 +12,15 @@ class FileToCompare:
 
     path: Path | str
     type: valid_file_type_ids = "netcdf"
+    # An in-memory manifest, which is used in place of loading the file at `path`.
+    manifest: "Manifest | None" = None
 
     def __post_init__(self):
         # We'll validate the inputs here.
         if not isinstance(self.path, (str, Path)):
             raise TypeError(f"'path' must be a str or Path, was {type(self.path)}")
-        if self.type not in ("netcdf", "hdf5"):
-            raise ValueError("'type' must be either 'netcdf' or 'hdf5'")
+        if self.type not in ("netcdf", "hdf5", "manifest"):
+            raise ValueError("'type' must be either 'netcdf', 'hdf5', or 'manifest'")
 
 
 class SummaryDifferencesDict(TypedDict):
@@ -34,7 +36,22 @@ class SummaryDifferencesDict(TypedDict):
 SummaryDifferenceKeys = Literal["shared", "left", "right", "both"]
 
 VarProperties = namedtuple(
-    "VarProperties", "varname, variable, dtype, dimensions, shape, chunking, attributes"
+    "VarProperties",
+    "varname, variable, dtype, dimensions, shape, chunking, attributes, scale_factor, "
+    "data_digest, raw_digest, statistics, attribute_digests",
+    defaults=(None, None, None, None),
+)
+
+VariableStatistics = namedtuple(
+    "VariableStatistics",
+    "minimum, maximum, mean, std, nan_count, fill_count",
+)
+
+ValueComparison = namedtuple(
+    "ValueComparison",
+    "num_compared, num_mismatches, max_abs_diff, max_rel_diff, first_diff_index, "
+    "coverage, differing_chunks_bound",
+    defaults=(1.0, None),
 )
 
 GroupPair = namedtuple(
@@ -42,3 +59,58 @@ GroupPair = namedtuple(
     "group_a_name group_a group_b_name group_b",
     defaults=("", None, "", None),
 )
+
+
+class ManifestGroup:
+    """A group from a structural manifest, which stands in for an open netCDF or HDF5 group."""
+
+    __slots__ = ("name", "groups", "variables")
+
+    def __init__(
+        self,
+        name: str,
+        groups: dict[str, "ManifestGroup"] | None = None,
+        variables: dict[str, VarProperties] | None = None,
+    ):
+        self.name = name
+        self.groups: dict[str, ManifestGroup] = groups if groups is not None else {}
+        self.variables: dict[str, VarProperties] = variables if variables is not None else {}
+
+    def __getitem__(self, key: str) -> "ManifestGroup":
+        return self.groups[key]
+
+
+class Manifest(ManifestGroup):
+    """The root group of a structural manifest, along with information about the source file."""
+
+    __slots__ = ("source", "source_type", "root_dims", "root_groups", "digests", "statistics")
+
+    def __init__(
+        self,
+        source: str,
+        source_type: str,
+        root_dims: list[tuple[str, int]],
+        root_groups: list[str],
+        groups: dict[str, ManifestGroup] | None = None,
+        variables: dict[str, VarProperties] | None = None,
+        digests: bool = False,
+        statistics: bool = False,
+    ):
+        super().__init__("/", groups, variables)
+        self.source = source
+        self.source_type = source_type
+        self.root_dims = root_dims
+        self.root_groups = root_groups
+        # Whether the data digests, and summary statistics, of every variable were recorded.
+        self.digests = digests
+        self.statistics = statistics
+
+    # A manifest can be used in place of an open file handle, e.g., in a `with` statement.
+    def __enter__(self):  # noqa: D105
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):  # noqa: D105
+        self.close()
+
+    def close(self) -> None:
+        """Do nothing, as there is no underlying file to close."""
@@ -0,0 +1,497 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+"""Compare the data values of two variables, chunk by chunk, with bounded memory."""
+
+import itertools
+import math
+import zlib
+from collections.abc import Iterable, Iterator
+
+import h5py
+import netCDF4
+import numpy as np
+
+from ncompare.getters import open_dataset
+from ncompare.utility_types import FileToCompare, ValueComparison
+
+# Upper bound on the number of bytes read from each variable at a time.
+DEFAULT_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Assumed size of each element of a variable-length (e.g., string) type, for sizing blocks.
+_VLEN_ITEMSIZE = 8
+
+
+def native_chunks(variable: netCDF4.Variable | h5py.Dataset) -> tuple[int, ...] | None:
+    """Get the chunk shape of a variable as it is stored on disk, or None if it is not chunked."""
+    if isinstance(variable, h5py.Dataset):
+        return variable.chunks
+    chunking = variable.chunking()
+    if chunking == "contiguous" or chunking is None:
+        return None
+    return tuple(chunking)
+
+
+def element_size(variable: netCDF4.Variable | h5py.Dataset) -> int:
+    """Get the (approximate, for variable-length types) number of bytes per element of a variable."""
+    dtype = variable.dtype
+    # netCDF4 reports the type of variable-length strings as `str`, rather than a numpy dtype.
+    if isinstance(dtype, np.dtype) and dtype.kind != "O":
+        return dtype.itemsize
+    return _VLEN_ITEMSIZE
+
+
+def block_shape(
+    shape: tuple[int, ...],
+    itemsize: int,
+    chunks: tuple[int, ...] | None = None,
+    max_block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> tuple[int, ...]:
+    """Choose the shape of the blocks in which a variable is read.
+
+    Blocks are aligned with the native chunks of the variable, when it is chunked,
+    and several chunks are grouped along the first axis as long as a block fits within the budget.
+    Otherwise, blocks are contiguous runs of the trailing axes.
+
+    Parameters
+    ----------
+    shape
+        shape of the variable
+    itemsize
+        number of bytes per element
+    chunks
+        native chunk shape of the variable, if any
+    max_block_bytes
+        upper bound on the number of bytes in one block (unless a single chunk is larger)
+
+    Returns
+    -------
+    tuple
+        the block shape, with one entry per dimension of the variable
+    """
+    max_items = max(1, max_block_bytes // max(1, itemsize))
+
+    if chunks is not None and len(chunks) == len(shape):
+        block = [min(chunk, size) for chunk, size in zip(chunks, shape)]
+        if block:
+            block[0] = min(shape[0], block[0] * max(1, max_items // max(1, math.prod(block))))
+        return tuple(block)
+
+    block = [1] * len(shape)
+    for axis in reversed(range(len(shape))):
+        block[axis] = min(shape[axis], max_items)
+        max_items //= max(1, block[axis])
+        if block[axis] < shape[axis] or max_items == 0:
+            break
+    return tuple(block)
+
+
+def iter_blocks(shape: tuple[int, ...], block: tuple[int, ...]) -> Iterator[tuple[slice, ...]]:
+    """Yield the slices that cover an array of the given shape, one block at a time, in C order."""
+    starts = [range(0, size, max(1, step)) for size, step in zip(shape, block)]
+    for corner in itertools.product(*starts):
+        yield tuple(
+            slice(start, min(start + step, size)) for start, step, size in zip(corner, block, shape)
+        )
+
+
+def compare_values(
+    variable_a: netCDF4.Variable | h5py.Dataset,
+    variable_b: netCDF4.Variable | h5py.Dataset,
+    atol: float = 0.0,
+    rtol: float = 0.0,
+    max_block_bytes: int = DEFAULT_BLOCK_BYTES,
+    sample_fraction: float | None = None,
+    sample_bytes: int | None = None,
+    seed: int = 0,
+) -> ValueComparison | None:
+    """Compare the data values of two variables, reading them one block of chunks at a time.
+
+    For two HDF5 datasets that are stored in the same way (see `have_same_stored_layout`),
+    chunks are first compared as stored, i.e., still compressed,
+    and only the chunks whose bytes differ are decompressed and compared value by value.
+
+    Numeric values are equal when ``|a - b| <= atol + rtol * |a|``, and NaNs are equal to each other.
+    Other types (e.g., strings) must be exactly equal. Masked (fill) values are equal to each other,
+    and differ from any unmasked value.
+
+    If a sample fraction or a number of sample bytes is given, only a random (but reproducible,
+    for a given seed and variable) subset of the chunks of each variable is compared.
+
+    Parameters
+    ----------
+    variable_a
+        variable from the first file
+    variable_b
+        variable from the second file
+    atol
+        absolute tolerance
+    rtol
+        relative tolerance, with respect to the value from the first file
+    max_block_bytes
+        upper bound on the number of bytes read from each variable at a time
+    sample_fraction
+        fraction (between 0 and 1) of the chunks of the variable to compare
+    sample_bytes
+        number of bytes of the variable to compare, rounded up to a whole chunk;
+        if both this and `sample_fraction` are given, the smaller sample is used
+    seed
+        seed for the random selection of sampled chunks
+
+    Returns
+    -------
+    ValueComparison or None
+        None if the values cannot be compared, because the variables have different shapes,
+        or either one has no data (i.e., an HDF5 dataset with a null dataspace)
+    """
+    if (variable_a.shape is None) or (variable_b.shape is None):
+        return None
+    shape = tuple(variable_a.shape)
+    if shape != tuple(variable_b.shape):
+        return None
+
+    same_stored_layout = have_same_stored_layout(variable_a, variable_b)
+    sampled = (sample_fraction is not None) or (sample_bytes is not None)
+    chunks = native_chunks(variable_a)
+    if (chunks is not None) and (sampled or same_stored_layout):
+        # Single chunks are the unit of sampling, and of comparisons of stored bytes.
+        block = block_shape(shape, element_size(variable_a), chunks, max_block_bytes=1)
+    else:
+        block = block_shape(shape, element_size(variable_a), chunks, max_block_bytes)
+
+    if sampled:
+        num_blocks = math.prod(math.ceil(size / max(1, step)) for size, step in zip(shape, block))
+        num_samples = _num_samples(
+            num_blocks, element_size(variable_a) * math.prod(block), sample_fraction, sample_bytes
+        )
+        rng = np.random.default_rng([seed, zlib.crc32(variable_path(variable_a).encode())])
+        block_slices = sample_blocks(shape, block, num_samples, rng)
+    else:
+        block_slices = iter_blocks(shape, block)
+
+    if same_stored_layout:
+        # Chunks whose stored (compressed) bytes are identical need not be decompressed.
+        blocks = _compare_stored_chunks(variable_a, variable_b, block_slices)
+    else:
+        blocks = ((slices, False) for slices in block_slices)
+
+    num_compared = 0
+    num_mismatches = 0
+    num_blocks_compared = 0
+    num_blocks_differing = 0
+    max_abs_diff = 0.0
+    max_rel_diff = 0.0
+    first_diff_index: tuple[int, ...] | None = None
+    for slices, stored_bytes_are_identical in blocks:
+        num_blocks_compared += 1
+        if stored_bytes_are_identical:
+            num_compared += math.prod(s.stop - s.start for s in slices)
+            continue
+
+        mismatch, abs_diff, rel_diff = _compare_block(
+            variable_a[slices], variable_b[slices], atol, rtol
+        )
+
+        num_compared += mismatch.size
+        block_mismatches = int(np.count_nonzero(mismatch))
+        if block_mismatches:
+            num_mismatches += block_mismatches
+            num_blocks_differing += 1
+            offset = np.unravel_index(int(np.argmax(mismatch.ravel())), mismatch.shape)
+            index = tuple(int(s.start + i) for s, i in zip(slices, offset))
+            if first_diff_index is None or index < first_diff_index:
+                first_diff_index = index
+        max_abs_diff = max(max_abs_diff, abs_diff)
+        max_rel_diff = max(max_rel_diff, rel_diff)
+
+    num_elements = math.prod(shape)
+    coverage = (num_compared / num_elements) if num_elements else 1.0
+    return ValueComparison(
+        num_compared=num_compared,
+        num_mismatches=num_mismatches,
+        max_abs_diff=max_abs_diff,
+        max_rel_diff=max_rel_diff,
+        first_diff_index=first_diff_index,
+        coverage=coverage,
+        differing_chunks_bound=(
+            differing_fraction_bound(num_blocks_compared, num_blocks_differing)
+            if coverage < 1.0
+            else None
+        ),
+    )
+
+
+def _num_samples(
+    num_blocks: int,
+    bytes_per_block: int,
+    sample_fraction: float | None,
+    sample_bytes: int | None,
+) -> int:
+    """Get the number of blocks to sample for a budget given as a fraction and/or as bytes."""
+    if sample_fraction is not None and not 0 < sample_fraction <= 1:
+        raise ValueError(f"The sample fraction must be in (0, 1]. Got <{sample_fraction}>.")
+    if sample_bytes is not None and sample_bytes <= 0:
+        raise ValueError(f"The number of sample bytes must be positive. Got <{sample_bytes}>.")
+
+    num_samples = num_blocks
+    if sample_fraction is not None:
+        num_samples = min(num_samples, math.ceil(sample_fraction * num_blocks))
+    if sample_bytes is not None:
+        num_samples = min(num_samples, math.ceil(sample_bytes / max(1, bytes_per_block)))
+    return num_samples
+
+
+def sample_blocks(
+    shape: tuple[int, ...], block: tuple[int, ...], num_samples: int, rng: np.random.Generator
+) -> Iterator[tuple[slice, ...]]:
+    """Yield the slices of a random subset of the blocks that cover an array, in C order."""
+    grid = tuple(math.ceil(size / max(1, step)) for size, step in zip(shape, block))
+    num_blocks = math.prod(grid)
+    if not num_blocks:
+        return
+    for flat_index in np.sort(rng.choice(num_blocks, size=num_samples, replace=False)):
+        corner = np.unravel_index(int(flat_index), grid)
+        yield tuple(
+            slice(int(i) * step, min((int(i) + 1) * step, size))
+            for i, step, size in zip(corner, block, shape)
+        )
+
+
+def differing_fraction_bound(
+    num_sampled: int, num_differing: int, confidence: float = 0.95
+) -> float:
+    """Get an upper confidence bound on the fraction of all blocks that differ, from a sample.
+
+    This is the one-sided Clopper-Pearson bound, which, when no sampled block differs,
+    reduces to ``1 - (1 - confidence) ** (1 / num_sampled)`` (about 3 / num_sampled, at 95%).
+    """
+    if num_sampled == 0 or num_differing >= num_sampled:
+        return 1.0
+    if num_differing == 0:
+        return 1.0 - (1.0 - confidence) ** (1.0 / num_sampled)
+
+    # Bisect for the fraction p at which P(X <= num_differing | num_sampled, p) = 1 - confidence.
+    low, high = num_differing / num_sampled, 1.0
+    for _ in range(60):
+        middle = (low + high) / 2
+        if _binomial_cdf(num_differing, num_sampled, middle) > 1.0 - confidence:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def _binomial_cdf(k: int, n: int, p: float) -> float:
+    """Get P(X <= k) for X ~ Binomial(n, p), with 0 < p < 1, summing terms in log space."""
+    log_p, log_q = math.log(p), math.log1p(-p)
+    log_n_factorial = math.lgamma(n + 1)
+    return sum(
+        math.exp(
+            log_n_factorial
+            - math.lgamma(i + 1)
+            - math.lgamma(n - i + 1)
+            + i * log_p
+            + (n - i) * log_q
+        )
+        for i in range(k + 1)
+    )
+
+
+def have_same_stored_layout(
+    variable_a: netCDF4.Variable | h5py.Dataset, variable_b: netCDF4.Variable | h5py.Dataset
+) -> bool:
+    """Check whether two HDF5 datasets have the same dtype, shape, chunks, and filter pipeline.
+
+    If so, two identical stored (compressed) chunks hold identical values.
+    Variable-length types are excluded, as their chunks only hold references to the data.
+    """
+    if not (isinstance(variable_a, h5py.Dataset) and isinstance(variable_b, h5py.Dataset)):
+        return False
+    return (
+        (variable_a.chunks is not None)
+        and (variable_a.chunks == variable_b.chunks)
+        and (variable_a.shape == variable_b.shape)
+        and (variable_a.dtype == variable_b.dtype)
+        and (not variable_a.dtype.hasobject)
+        and (_filter_pipeline(variable_a) == _filter_pipeline(variable_b))
+    )
+
+
+def _filter_pipeline(dataset: h5py.Dataset) -> list[tuple]:
+    """Get the (id, flags, parameters) of each filter, e.g., compression, applied to a dataset."""
+    plist = dataset.id.get_create_plist()
+    return [plist.get_filter(index)[:3] for index in range(plist.get_nfilters())]
+
+
+def _stored_chunks(dataset: h5py.Dataset) -> dict[tuple[int, ...], tuple[int, int]]:
+    """Get the filter mask and stored size of each allocated chunk, keyed by the chunk's offset."""
+    chunks: dict[tuple[int, ...], tuple[int, int]] = {}
+
+    def _add_chunk(info) -> None:
+        chunks[tuple(info.chunk_offset)] = (info.filter_mask, info.size)
+
+    try:
+        # A single pass through the chunk index (HDF5 1.12.3 or later).
+        dataset.id.chunk_iter(_add_chunk)
+    except (AttributeError, NotImplementedError):
+        for index in range(dataset.id.get_num_chunks()):
+            _add_chunk(dataset.id.get_chunk_info(index))
+    return chunks
+
+
+def _compare_stored_chunks(
+    dataset_a: h5py.Dataset, dataset_b: h5py.Dataset, chunk_slices: Iterable[tuple[slice, ...]]
+) -> Iterator[tuple[tuple[slice, ...], bool]]:
+    """Yield the slices of each chunk, and whether the chunk is stored identically in both datasets.
+
+    Chunks that are not allocated (i.e., only hold fill values) in either dataset
+    are reported as not identical, so that their values are compared.
+    """
+    stored_a = _stored_chunks(dataset_a)
+    stored_b = _stored_chunks(dataset_b)
+    for slices in chunk_slices:
+        offset = tuple(s.start for s in slices)
+        info_a, info_b = stored_a.get(offset), stored_b.get(offset)
+        yield (
+            slices,
+            (info_a is not None)
+            and (info_a == info_b)
+            and (
+                dataset_a.id.read_direct_chunk(offset)[1]
+                == dataset_b.id.read_direct_chunk(offset)[1]
+            ),
+        )
+
+
+def variable_path(variable: netCDF4.Variable | h5py.Dataset) -> str:
+    """Get the full path of a variable within its file, e.g., "/group/subgroup/variable"."""
+    if isinstance(variable, h5py.Dataset):
+        return variable.name
+    return f"{variable.group().path.rstrip('/')}/{variable.name}"
+
+
+# The files opened by a worker process, for `compare_values_at`.
+#   Each worker opens its own handles, as open netCDF4 and h5py objects cannot be shared across processes.
+_worker_files: tuple = ()
+
+
+def open_worker_files(file_a: FileToCompare, file_b: FileToCompare) -> None:
+    """Open the two files in this worker process, to be read by `compare_values_at`."""
+    global _worker_files  # pylint: disable=global-statement
+    _worker_files = (open_dataset(file_a), open_dataset(file_b))
+
+
+def compare_values_at(task: tuple[str, str, dict]) -> ValueComparison | None:
+    """Compare the values of a variable in each of the files opened by `open_worker_files`.
+
+    Parameters
+    ----------
+    task
+        the path of the variable in the first file, the path of the variable in the second file,
+        and the keyword arguments for `compare_values` (e.g., the tolerances)
+
+    Returns
+    -------
+    ValueComparison or None
+        see `compare_values`
+    """
+    path_a, path_b, options = task
+    dataset_a, dataset_b = _worker_files
+    return compare_values(dataset_a[path_a], dataset_b[path_b], **options)
+
+
+def _compare_block(values_a, values_b, atol: float, rtol: float) -> tuple[np.ndarray, float, float]:
+    """Find the mismatching elements of two blocks, and the largest absolute and relative differences.
+
+    Returns
+    -------
+    tuple
+        np.ndarray
+            boolean array that is True where the values differ
+        float
+            largest absolute difference between (unmasked, finite) numeric values
+        float
+            largest relative difference between (unmasked, finite) numeric values
+    """
+    mask_a = np.ma.getmaskarray(values_a)
+    mask_b = np.ma.getmaskarray(values_b)
+    data_a = np.atleast_1d(np.ma.getdata(values_a))
+    data_b = np.atleast_1d(np.ma.getdata(values_b))
+    mask_a, mask_b = np.atleast_1d(mask_a), np.atleast_1d(mask_b)
+    unmasked = ~mask_a & ~mask_b
+
+    if _is_integer(data_a.dtype) and _is_integer(data_b.dtype):
+        # Integers are not converted to float64, in which e.g. int64 values that only differ
+        # above 2**53 would be equal; their differences are exact, and only the tolerance is float.
+        exact_diff = _integer_abs_diff(data_a, data_b)
+        abs_diff = exact_diff.astype(np.float64)
+        magnitude_a = np.abs(data_a.astype(np.float64))
+        close = (exact_diff == 0) | (abs_diff <= atol + rtol * magnitude_a)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel_diff = abs_diff / magnitude_a
+        abs_diff = abs_diff[unmasked]
+        rel_diff = rel_diff[unmasked & np.isfinite(rel_diff)]
+        max_abs_diff = float(abs_diff.max()) if abs_diff.size else 0.0
+        max_rel_diff = float(rel_diff.max()) if rel_diff.size else 0.0
+    elif _is_numeric(data_a.dtype) and _is_numeric(data_b.dtype):
+        common_dtype = np.result_type(data_a.dtype, data_b.dtype, np.float64)
+        data_a = data_a.astype(common_dtype, copy=False)
+        data_b = data_b.astype(common_dtype, copy=False)
+        close = np.isclose(data_b, data_a, atol=atol, rtol=rtol, equal_nan=True)
+
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            abs_diff = np.abs(data_a - data_b)
+            rel_diff = abs_diff / np.abs(data_a)
+        abs_diff = abs_diff[unmasked & np.isfinite(abs_diff)]
+        rel_diff = rel_diff[unmasked & np.isfinite(rel_diff)]
+        max_abs_diff = float(abs_diff.max()) if abs_diff.size else 0.0
+        max_rel_diff = float(rel_diff.max()) if rel_diff.size else 0.0
+    else:
+        close = np.asarray(data_a == data_b)
+        if close.shape != data_a.shape:
+            # e.g., when comparing strings with numbers.
+            close = np.zeros(data_a.shape, dtype=bool)
+        max_abs_diff = max_rel_diff = 0.0
+
+    mismatch = (mask_a != mask_b) | (unmasked & ~close)
+    return mismatch, max_abs_diff, max_rel_diff
+
+
+def _is_numeric(dtype: np.dtype) -> bool:
+    return np.issubdtype(dtype, np.number)
+
+
+def _is_integer(dtype: np.dtype) -> bool:
+    return np.issubdtype(dtype, np.integer)
+
+
+def _integer_abs_diff(data_a: np.ndarray, data_b: np.ndarray) -> np.ndarray:
+    """Get the exact absolute differences of two integer arrays, as unsigned 64-bit integers."""
+    # The subtraction wraps around modulo 2**64, which gives the exact difference of the larger
+    # minus the smaller value, as long as that fits in 64 bits.
+    unsigned_a = data_a.astype(np.uint64)
+    unsigned_b = data_b.astype(np.uint64)
+    return np.where(data_a >= data_b, unsigned_a - unsigned_b, unsigned_b - unsigned_a)
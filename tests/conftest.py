@@ -27,6 +27,7 @@ import os
 from pathlib import Path
 
 import earthaccess
+import h5py
 import netCDF4 as nC
 import numpy as np
 import pytest
@@ -123,6 +124,18 @@ def temp_data_dir(tmpdir_factory) -> Path:
     return Path(tmpdir_factory.mktemp("data"))
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_metadata_cache(tmpdir_factory):
+    """Keep the default metadata cache of test runs out of the user's own cache directory."""
+    original = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = str(tmpdir_factory.mktemp("xdg_cache"))
+    yield
+    if original is None:
+        del os.environ["XDG_CACHE_HOME"]
+    else:
+        os.environ["XDG_CACHE_HOME"] = original
+
+
 @pytest.fixture(scope="function")
 def outputter_to_console():
     return Outputter()
@@ -326,3 +339,76 @@ def ds_3dims_3vars_4coords_1subgroup(temp_data_dir):
     f.close()
 
     return filepath
+
+
+@pytest.fixture(scope="session")
+def hdf5_2beams_nested(temp_data_dir) -> Path:
+    """An HDF5 file with an ICESat-2-like hierarchy of beam groups, subgroups, and datasets."""
+    filepath = temp_data_dir / "test_2beams_nested.h5"
+
+    with h5py.File(filepath, "w") as f:
+        f["delta_time"] = np.linspace(0, 1.0, 5)
+        f["delta_time"].make_scale("delta_time")
+        for beam in ("gt1l", "gt1r"):
+            segments = f.create_group(f"{beam}/land_ice_segments")
+            segments["h_li"] = np.arange(5, dtype="f4")
+            segments["h_li"].attrs["units"] = "meters"
+            segments.create_group("fit_statistics")["n_fit_photons"] = np.arange(5, dtype="i4")
+        f.create_group("ancillary_data")["start_rgt"] = np.array([1], dtype="i2")
+
+    return filepath
+
+
+@pytest.fixture(scope="session")
+def hdf5_3beams_nested(temp_data_dir) -> Path:
+    """Like `hdf5_2beams_nested`, but with an extra beam, and one dataset changed in type."""
+    filepath = temp_data_dir / "test_3beams_nested.h5"
+
+    with h5py.File(filepath, "w") as f:
+        f["delta_time"] = np.linspace(0, 1.0, 5)
+        f["delta_time"].make_scale("delta_time")
+        for beam in ("gt1l", "gt1r", "gt2l"):
+            segments = f.create_group(f"{beam}/land_ice_segments")
+            segments["h_li"] = np.arange(5, dtype="f8")
+            segments["h_li"].attrs["units"] = "meters"
+            segments.create_group("fit_statistics")["n_fit_photons"] = np.arange(5, dtype="i4")
+        f.create_group("ancillary_data")["start_rgt"] = np.array([1], dtype="i2")
+
+    return filepath
+
+
+def _write_values_file(filepath: Path, perturb: bool) -> Path:
+    with nC.Dataset(filepath, "w") as ds:
+        ds.createDimension("time", 40)
+        ds.createDimension("x", 30)
+        temperature = ds.createVariable(
+            "temperature", "f8", ("time", "x"), chunksizes=(8, 10), fill_value=-999.0
+        )
+        values = np.arange(40 * 30, dtype="f8").reshape(40, 30)
+        values[0, 0] = np.nan
+        values = np.ma.masked_array(values, mask=np.zeros_like(values, dtype=bool))
+        values[1, 1] = np.ma.masked
+        if perturb:
+            values[10, 5] += 0.5
+            values[35, 29] += 1e-9
+        temperature[:] = values
+
+        counts = ds.createVariable("counts", "i4", ("time",))
+        counts[:] = np.arange(40)
+
+        labels = ds.createVariable("labels", str, ("x",))
+        labels[:] = np.array([f"label_{i}" for i in range(30)], dtype=object)
+
+    return filepath
+
+
+@pytest.fixture(scope="session")
+def nc_values_a(temp_data_dir) -> Path:
+    """A netCDF file with chunked, NaN-containing, and masked data values."""
+    return _write_values_file(temp_data_dir / "test_values_a.nc", perturb=False)
+
+
+@pytest.fixture(scope="session")
+def nc_values_b(temp_data_dir) -> Path:
+    """Like `nc_values_a`, but with one large and one tiny change to the `temperature` values."""
+    return _write_values_file(temp_data_dir / "test_values_b.nc", perturb=True)
@@ -0,0 +1,204 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import csv
+import shutil
+
+import pytest
+
+import ncompare.batch
+from ncompare.batch import (
+    compare_directories,
+    compare_many,
+    pair_files,
+    summarize,
+)
+from ncompare.console import _batch_cli, _many_cli, batch_main, many_main
+from ncompare.manifest import write_manifest
+
+from . import data_for_tests_dir
+
+
+@pytest.fixture
+def two_delivery_dirs(tmp_path):
+    """Two directories of granules, where one granule is missing from the second directory."""
+    dir_a, dir_b = tmp_path / "v01", tmp_path / "v02"
+    dir_a.mkdir()
+    dir_b.mkdir()
+    for name in ("granule_1", "granule_2"):
+        shutil.copy(data_for_tests_dir / "test_a.nc", dir_a / f"{name}_v01.nc")
+        shutil.copy(data_for_tests_dir / "test_b.nc", dir_b / f"{name}_v02.nc")
+    shutil.copy(data_for_tests_dir / "test_a.nc", dir_a / "granule_3_v01.nc")
+    return dir_a, dir_b
+
+
+def test_pair_files_by_regex(two_delivery_dirs):
+    dir_a, dir_b = two_delivery_dirs
+    pairs = pair_files(dir_a, dir_b, pattern="*.nc", regex=r"_v01\.nc$", replacement="_v02.nc")
+
+    assert [(a.name, b.name if b else None) for a, b in pairs] == [
+        ("granule_1_v01.nc", "granule_1_v02.nc"),
+        ("granule_2_v01.nc", "granule_2_v02.nc"),
+        ("granule_3_v01.nc", None),
+    ]
+
+
+def test_pair_files_by_name(two_delivery_dirs):
+    dir_a, dir_b = two_delivery_dirs
+    assert all(b is None for _, b in pair_files(dir_a, dir_b))
+
+
+def test_pair_files_requires_regex_and_replacement(two_delivery_dirs):
+    with pytest.raises(ValueError):
+        pair_files(*two_delivery_dirs, regex="v01")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_compare_directories(tmp_path, two_delivery_dirs, jobs):
+    output_dir = tmp_path / "reports"
+    results = compare_directories(
+        *two_delivery_dirs,
+        output_dir,
+        regex=r"_v01\.nc$",
+        replacement="_v02.nc",
+        jobs=jobs,
+        formats=["txt", "csv"],
+        show_attributes=True,
+    )
+
+    summary = summarize(results)
+    assert summary["pairs"] == 3
+    assert summary["pairs_with_differences"] == 2
+    assert summary["errors"] == 1
+    assert results[0].total_diff_count == results[1].total_diff_count > 0
+
+    assert (output_dir / "granule_1_v01.txt").exists()
+    assert (output_dir / "granule_2_v01.csv").exists()
+    with open(output_dir / "summary.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows[-1] == ["TOTAL", "", str(summary["total_differences"]), ""]
+
+
+def test_batch_exit_status(monkeypatch, tmp_path, two_delivery_dirs):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    dir_a, dir_b = two_delivery_dirs
+    reference = str(data_for_tests_dir / "test_a.nc")
+    commands = [
+        # One granule is missing from the second directory, so its comparison fails.
+        (batch_main, [str(dir_a), str(dir_b), "--output-dir", str(tmp_path / "batch")], 2),
+        (many_main, [reference, str(dir_a / "granule_3_v01.nc"), "--jobs", "1"], 0),
+        (many_main, [reference, *map(str, sorted(dir_b.glob("*.nc"))), "--jobs", "1"], 1),
+    ]
+    for command, args, expected_status in commands:
+        monkeypatch.setattr("sys.argv", ["ncompare-batch", *args])
+        with pytest.raises(SystemExit) as exit_info:
+            command()
+        assert exit_info.value.code == expected_status
+
+
+def test_batch_arg_parser():
+    parsed = _batch_cli(["dir1", "dir2", "--output-dir", "out", "--jobs", "4"])
+
+    assert parsed.dir_a == "dir1"
+    assert parsed.jobs == 4
+    assert parsed.formats == ["txt"]
+    assert parsed.pattern == "*"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_compare_many(tmp_path, two_delivery_dirs, jobs):
+    _, dir_b = two_delivery_dirs
+    candidates = sorted(dir_b.glob("*.nc")) + [data_for_tests_dir / "test_a.nc"]
+    results = compare_many(
+        data_for_tests_dir / "test_a.nc",
+        candidates,
+        jobs=jobs,
+        output_dir=tmp_path / "reports",
+        show_attributes=True,
+    )
+
+    assert [result.path_b for result in results] == [str(path) for path in candidates]
+    assert results[0].total_diff_count == results[1].total_diff_count > 0
+    assert results[2].total_diff_count == 0
+    assert (tmp_path / "reports" / "granule_1_v02.txt").exists()
+    assert (tmp_path / "reports" / "summary.csv").exists()
+
+
+def test_compare_many_reads_reference_once(monkeypatch, two_delivery_dirs):
+    _, dir_b = two_delivery_dirs
+    opened = []
+    original_open_dataset = ncompare.batch.open_dataset
+
+    def _counting_open_dataset(file):
+        opened.append(file.path)
+        return original_open_dataset(file)
+
+    monkeypatch.setattr(ncompare.batch, "open_dataset", _counting_open_dataset)
+    results = compare_many(data_for_tests_dir / "test_a.nc", sorted(dir_b.glob("*.nc")) * 3)
+
+    assert len(results) == 6
+    assert len(opened) == 1
+    assert all(result.path_a == str(data_for_tests_dir / "test_a.nc") for result in results)
+
+
+def test_compare_many_writes_a_report_per_same_named_candidate(tmp_path):
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        shutil.copy(data_for_tests_dir / "test_b.nc", tmp_path / directory / "granule.nc")
+    candidates = [tmp_path / "a" / "granule.nc", tmp_path / "b" / "granule.nc"] * 2
+    compare_many(data_for_tests_dir / "test_a.nc", candidates, output_dir=tmp_path / "reports")
+
+    assert sorted(path.name for path in (tmp_path / "reports").glob("*.txt")) == [
+        "a__granule.txt",
+        "a__granule__2.txt",
+        "b__granule.txt",
+        "b__granule__2.txt",
+    ]
+
+
+def test_compare_many_rejects_comparing_values():
+    with pytest.raises(ValueError, match="Data values cannot be compared"):
+        compare_many(
+            data_for_tests_dir / "test_a.nc",
+            [data_for_tests_dir / "test_b.nc"],
+            compare_values=True,
+        )
+
+
+@pytest.mark.parametrize("option", ["digests", "statistics"])
+def test_compare_many_rejects_options_missing_from_a_reference_manifest(tmp_path, option):
+    reference = write_manifest(data_for_tests_dir / "test_a.nc", tmp_path / "test_a.json")
+
+    with pytest.raises(ValueError, match=f"has no {option}"):
+        compare_many(reference, [data_for_tests_dir / "test_b.nc"], **{option: True})
+
+
+def test_many_arg_parser():
+    parsed = _many_cli(["ref.nc", "cand1.nc", "cand2.nc", "--jobs", "0"])
+
+    assert parsed.reference == "ref.nc"
+    assert parsed.candidates == ["cand1.nc", "cand2.nc"]
+    assert parsed.jobs == 0
+    assert parsed.output_dir is None
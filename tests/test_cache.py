@@ -0,0 +1,149 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import os
+import shutil
+
+import pytest
+
+import ncompare.cache
+from ncompare.cache import MetadataCache, default_cache_dir
+from ncompare.console import _cli
+from ncompare.core import compare
+from ncompare.path_and_string_operations import validate_file_type
+
+from . import data_for_tests_dir
+
+
+@pytest.fixture
+def copied_test_files(tmp_path):
+    a = shutil.copy(data_for_tests_dir / "test_a.nc", tmp_path / "test_a.nc")
+    b = shutil.copy(data_for_tests_dir / "test_b.nc", tmp_path / "test_b.nc")
+    return a, b
+
+
+def test_default_cache_dir_follows_xdg(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "ncompare"
+
+
+def test_cache_hit_does_not_reopen_files(monkeypatch, tmp_path, copied_test_files):
+    cache_dir = tmp_path / "cache"
+    first = compare(*copied_test_files, show_attributes=True, cache=True, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("A cached file should not be reopened.")
+
+    monkeypatch.setattr(ncompare.cache, "open_dataset", _fail)
+    second = compare(*copied_test_files, show_attributes=True, cache=True, cache_dir=cache_dir)
+
+    assert first == second > 0
+
+
+def test_cached_manifest_without_digests_is_refreshed(tmp_path, copied_test_files):
+    cache = MetadataCache(tmp_path / "cache")
+    file_a = validate_file_type(copied_test_files[0])
+
+    assert not cache.open(file_a).digests
+    assert cache.open(file_a, digests=True).digests
+    # A manifest with digests also serves requests that do not need them.
+    assert cache.open(file_a).digests
+
+
+def test_cache_is_only_used_when_asked_for(monkeypatch, tmp_path, copied_test_files):
+    # The library does not use the cache by default, but the command line does.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    compare(*copied_test_files)
+    compare(*copied_test_files, cache=False, cache_dir=tmp_path / "cache")
+    assert not (tmp_path / "ncompare").exists()
+    assert not (tmp_path / "cache").exists()
+
+    assert _cli([*map(str, copied_test_files)]).cache
+    assert not _cli([*map(str, copied_test_files), "--no-cache"]).cache
+
+
+def test_modified_file_is_not_matched(tmp_path, copied_test_files):
+    cache = MetadataCache(tmp_path / "cache")
+    key_before = cache.key(copied_test_files[0])
+
+    stat = os.stat(copied_test_files[0])
+    os.utime(copied_test_files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.key(copied_test_files[0]) != key_before
+
+
+def test_fingerprint_changes_key(tmp_path, copied_test_files):
+    plain = MetadataCache(tmp_path / "cache")
+    fingerprinted = MetadataCache(tmp_path / "cache", fingerprint=True)
+    assert plain.key(copied_test_files[0]) != fingerprinted.key(copied_test_files[0])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, copied_test_files):
+    cache_dir = tmp_path / "cache"
+    compare(*copied_test_files, cache=True, cache_dir=cache_dir)
+    entry_sizes = [entry.stat().st_size for entry in cache_dir.glob("*.json")]
+
+    # Make the entry for File A the least recently used one.
+    cache = MetadataCache(cache_dir, max_size_mb=max(entry_sizes) / (1024 * 1024))
+    os.utime(cache.directory / f"{cache.key(copied_test_files[0])}.json", (0, 0))
+
+    # With room for only one entry, only the most recently used one (File B) remains.
+    cache.evict()
+
+    assert [entry.name for entry in cache_dir.glob("*.json")] == [
+        f"{cache.key(copied_test_files[1])}.json"
+    ]
+
+
+def test_eviction_only_deletes_files_of_the_cache(tmp_path, copied_test_files):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    foreign = cache_dir / "important.json"
+    foreign.write_text("{}")
+    cache = MetadataCache(cache_dir, max_size_mb=0)
+    fresh_temporary = cache_dir / f"{cache.key(copied_test_files[0])}.123.tmp"
+    stale_temporary = cache_dir / f"{cache.key(copied_test_files[1])}.456.tmp"
+    for temporary in (fresh_temporary, stale_temporary):
+        temporary.write_text("{")
+    os.utime(stale_temporary, (0, 0))
+
+    compare(*copied_test_files, cache=True, cache_dir=cache_dir, cache_size=0)
+
+    # The entries do not fit, and a leftover temporary file is removed, but nothing else.
+    assert sorted(path.name for path in cache_dir.iterdir()) == [
+        fresh_temporary.name,
+        "important.json",
+    ]
+
+
+def test_corrupt_entry_is_treated_as_miss(tmp_path, copied_test_files):
+    cache = MetadataCache(tmp_path / "cache")
+    cache.directory.mkdir()
+    entry = cache.directory / f"{cache.key(copied_test_files[0])}.json"
+    entry.write_text("{not json")
+
+    assert cache.get(copied_test_files[0]) is None
+    assert not entry.exists()
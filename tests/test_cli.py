@@ -24,9 +24,28 @@
 # See the License for the specific language governing permissions and limitations under the License.
 
 import os
+import subprocess
+import sys
+import time
+
+import pytest
 
 from ncompare.console import _cli
 
+from . import data_for_tests_dir
+
+# Dependencies that are slow to import and must only be loaded when a code path needs them.
+HEAVY_MODULES = ("xarray", "pandas", "openpyxl", "netCDF4", "h5py")
+
+
+def _modules_loaded_after(statement: str) -> list[str]:
+    """Run a statement in a fresh interpreter and report which heavy modules it imported."""
+    code = f"import sys; {statement}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
 
 def test_console_version():
     exit_status = os.system("ncompare --version")
@@ -46,3 +65,53 @@ def test_arg_parser():
     assert getattr(parsed, "show_attributes") is False
     assert getattr(parsed, "show_chunks") is False
     assert getattr(parsed, "only_diffs") is False
+
+
+@pytest.mark.parametrize(
+    "file_b, expected_status",
+    [("test_a.nc", 0), ("test_b.nc", 1), ("does_not_exist.nc", 2)],
+)
+@pytest.mark.parametrize("option", ["--quiet", "--fail-fast"])
+def test_quiet_exit_status(option, file_b, expected_status):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "ncompare.console",
+            str(data_for_tests_dir / "test_a.nc"),
+            str(data_for_tests_dir / file_b),
+            option,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == expected_status
+    assert result.stdout == ""
+
+
+def test_console_import_does_not_load_heavy_modules():
+    assert _modules_loaded_after("import ncompare.console") == []
+
+
+def test_compare_import_does_not_load_excel_or_xarray():
+    loaded = _modules_loaded_after("from ncompare import compare")
+    assert "openpyxl" not in loaded
+    assert "xarray" not in loaded
+    assert "pandas" not in loaded
+
+
+@pytest.mark.slow
+def test_console_startup_time_benchmark():
+    # Measure the best-of-N startup cost of the CLI module, relative to a bare interpreter,
+    #   so that regressions in import time (e.g., a new eager import of a heavy library) are caught.
+    def _best_time(statement: str, repeats: int = 5) -> float:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", statement], check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    overhead = _best_time("import ncompare.console") - _best_time("pass")
+    print(f"`import ncompare.console` startup overhead: {overhead * 1000:.1f} ms")
+    assert overhead < 0.25
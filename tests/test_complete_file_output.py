@@ -23,7 +23,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and limitations under the License.
 
+import gzip
+import json
+import sys
+
 import pandas as pd
+import pytest
 
 from ncompare.core import compare
 
@@ -82,6 +87,31 @@ def test_full_run_to_csv_output(temp_data_dir):
             assert line1 in line2
 
 
+@pytest.mark.parametrize("compression", [".gz", ".zst"])
+def test_full_run_to_compressed_csv_output(temp_data_dir, compression):
+    if compression == ".zst":
+        if sys.version_info >= (3, 14):
+            from compression.zstd import open as open_compressed
+        else:
+            open_compressed = pytest.importorskip("zstandard").open
+    else:
+        open_compressed = gzip.open
+
+    plain_path = temp_data_dir / "plain_output_file.csv"
+    compressed_path = temp_data_dir / f"compressed_output_file.csv{compression}"
+    for path in (plain_path, compressed_path):
+        compare(
+            data_for_tests_dir / "test_a.nc",
+            data_for_tests_dir / "test_b.nc",
+            show_chunks=True,
+            show_attributes=True,
+            file_csv=str(path),
+        )
+
+    with open_compressed(compressed_path, "rt", encoding="utf-8") as f:
+        assert f.read() == plain_path.read_text(encoding="utf-8")
+
+
 def test_full_run_to_xlsx_output(temp_data_dir):
     # Compare the `ncompare` output (of test_a.nc vs. test_b.nc) against a pre-computed 'golden' file
     out_path = temp_data_dir / "output_file.xlsx"
@@ -101,3 +131,43 @@ def test_full_run_to_xlsx_output(temp_data_dir):
     rows_with_differences = [(idx, row) for idx, row in difference.notnull().iterrows() if any(row)]
 
     assert len(rows_with_differences) == 0
+
+
+def test_full_run_to_ndjson_output(temp_data_dir):
+    out_path = temp_data_dir / "output_file.ndjson.gz"
+
+    total_diff_count = compare(
+        data_for_tests_dir / "test_a.nc",
+        data_for_tests_dir / "test_b.nc",
+        show_attributes=True,
+        file_ndjson=str(out_path),
+    )
+
+    with gzip.open(out_path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+
+    assert [r["type"] for r in records[:3]] == ["root_dimensions", "root_groups", "group"]
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["total_diff_count"] == total_diff_count
+    # Property records use the same classification as the side-by-side output.
+    statuses = {r["status"] for r in records if r["type"] == "property"}
+    assert statuses <= {"shared", "left", "right", "both"}
+    assert {"shared", "both"} <= statuses
+    differing = {
+        r["property"] for r in records if r["type"] == "property" and r["status"] != "shared"
+    }
+    assert differing == set(records[-1]["attribute_difference_types"])
+
+
+def test_ndjson_to_stdout_replaces_console_output(capsys):
+    compare(
+        data_for_tests_dir / "test_a.nc",
+        data_for_tests_dir / "test_b.nc",
+        only_diffs=True,
+        file_ndjson="-",
+    )
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    # Only differences are recorded for variables and properties.
+    assert all(r["status"] != "shared" for r in records if r["type"] in ("variable", "property"))
+    assert records[-1]["type"] == "summary"
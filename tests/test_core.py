@@ -29,11 +29,16 @@ Tests for the core module.
 Note that full comparison tests are performed in both directions, i.e., A -> B and B -> A.
 """
 
+import sys
 from contextlib import nullcontext as does_not_raise
 
+import h5py
+import netCDF4
+import numpy as np
 import pytest
 
-from ncompare.core import compare
+from ncompare.core import compare, diff
+from ncompare.manifest import write_manifest
 
 from . import data_for_tests_dir
 
@@ -100,3 +105,184 @@ def test_error_on_different_file_types(temp_data_dir, icesat2_atl06_granule_1):
 
     with pytest.raises(TypeError):
         compare(icesat2_atl06_granule_1, file2)
+
+
+def test_no_error_compare_hdf5(hdf5_2beams_nested, hdf5_3beams_nested):
+    compare_ab(hdf5_2beams_nested, hdf5_3beams_nested)
+    compare_ba(hdf5_2beams_nested, hdf5_3beams_nested)
+
+
+def test_zero_for_hdf5_comparison_with_no_differences(hdf5_2beams_nested):
+    assert compare(hdf5_2beams_nested, hdf5_2beams_nested) == 0
+
+
+def test_nonzero_for_hdf5_comparison_with_differences(hdf5_2beams_nested, hdf5_3beams_nested):
+    assert compare(hdf5_2beams_nested, hdf5_3beams_nested) > 0
+
+
+def test_fail_fast_stops_at_the_first_difference(capsys):
+    path_a, path_b = data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc"
+    full = diff(path_a, path_b)
+    fast = diff(path_a, path_b, fail_fast=True)
+
+    assert full.complete
+    assert not fast.complete
+    assert 0 < fast.total_diff_count <= full.total_diff_count
+    compared = sum(len(group.variables) for group in fast.groups)
+    assert compared < sum(len(group.variables) for group in full.groups)
+
+    # Nothing is printed in quiet mode, but the count still tells whether the files differ.
+    assert compare(path_a, path_b, fail_fast=True, quiet=True) > 0
+    assert capsys.readouterr().out == ""
+
+
+def test_fail_fast_compares_everything_when_there_are_no_differences(hdf5_2beams_nested):
+    result = diff(hdf5_2beams_nested, hdf5_2beams_nested, fail_fast=True)
+    assert result.complete
+    assert result.total_diff_count == 0
+
+
+def test_references_are_resolved_against_their_own_file(temp_data_dir):
+    paths = []
+    for name in ("a_only", "b_only"):
+        paths.append(temp_data_dir / f"test_reference_{name}.h5")
+        with h5py.File(paths[-1], "w") as f:
+            f[name] = np.arange(3)
+            f["data"] = np.zeros(3)
+            f["data"].attrs["ref"] = f[name].ref
+
+    result = diff(*paths, show_attributes=True)
+
+    data = next(var for group in result.groups for var in group.variables if var.name_a == "data")
+    ref = next(prop for prop in data.properties if prop.name == "ref")
+    assert (ref.value_a, ref.value_b) == ("/a_only", "/b_only")
+
+
+@pytest.mark.parametrize("b_as_manifest", [False, True])
+def test_array_attributes_are_compared_in_full(temp_data_dir, b_as_manifest):
+    paths = []
+    for name, offset in (("a", 0.0), ("b", 1.0)):
+        paths.append(temp_data_dir / f"test_long_attribute_{name}.nc")
+        with netCDF4.Dataset(paths[-1], "w") as ds:
+            ds.createDimension("x", 3)
+            var = ds.createVariable("radiance", "f4", ("x",))
+            coefficients = np.arange(2000, dtype="f8")
+            # The difference is well past the elements that are shown.
+            coefficients[1500] += offset
+            var.setncattr("calibration_coefficients", coefficients)
+            var.setncattr("lookup_table", np.arange(2000, dtype="i4"))
+    if b_as_manifest:
+        paths[1] = write_manifest(paths[1], temp_data_dir / "test_long_attribute_b.json")
+
+    result = diff(*paths, show_attributes=True)
+
+    radiance = next(
+        var for group in result.groups for var in group.variables if var.name_a == "radiance"
+    )
+    statuses = {prop.name: prop.status for prop in radiance.properties}
+    assert statuses["calibration_coefficients"] == "both"
+    assert statuses["lookup_table"] == "shared"
+    assert result.attribute_counts["difference_types"] == {"calibration_coefficients"}
+
+
+def test_groups_only_in_b_have_their_full_path(hdf5_2beams_nested, hdf5_3beams_nested):
+    result = diff(hdf5_2beams_nested, hdf5_3beams_nested)
+
+    assert [group.name_b for group in result.groups if not group.name_a] == [
+        "/gt2l",
+        "/gt2l/land_ice_segments",
+        "/gt2l/land_ice_segments/fit_statistics",
+    ]
+
+
+def test_hierarchy_deeper_than_the_recursion_limit(temp_data_dir):
+    depth = 400
+    path = temp_data_dir / "test_deep_hierarchy.h5"
+    with h5py.File(path, "w") as f:
+        f.create_group("/".join(["g"] * depth))
+
+    # A lowered limit keeps the test file small, while still being well below its depth.
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(300)
+    try:
+        result = diff(path, path)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    assert len(result.groups) == depth + 1
+    assert result.groups[-1].name_b.count("/") == depth
+    assert result.total_diff_count == 0
+
+
+def test_partial_comparisons_list_the_same_linked_groups(temp_data_dir):
+    path = temp_data_dir / "test_linked_groups.h5"
+    with h5py.File(path, "w") as f:
+        f["g1/v"] = np.arange(3)
+        f["g2"] = f["g1"]
+        f.create_group("g3")
+        f["g3/shared"] = f["g1/v"]
+        f["soft"] = h5py.SoftLink("/g1/v")
+
+    for options in ({}, {"exclude": ["/nothing"]}, {"fail_fast": True}):
+        result = diff(path, path, **options)
+        assert result.group_counts["shared"] == 3
+        assert result.variable_counts["shared"] == 4
+
+
+def _record_opened_groups(monkeypatch) -> set:
+    opened = set()
+    original_getitem = h5py.Group.__getitem__
+
+    def _getitem(self, name):
+        item = original_getitem(self, name)
+        if isinstance(item, h5py.Group):
+            opened.add(item.name)
+        return item
+
+    monkeypatch.setattr(h5py.Group, "__getitem__", _getitem)
+    return opened
+
+
+def test_include_prunes_groups_before_opening_them(
+    monkeypatch, hdf5_2beams_nested, hdf5_3beams_nested
+):
+    opened = _record_opened_groups(monkeypatch)
+
+    result = diff(hdf5_2beams_nested, hdf5_3beams_nested, include=["/gt1l"])
+
+    assert [group.name_a for group in result.groups] == [
+        "/",
+        "/gt1l",
+        "/gt1l/land_ice_segments",
+        "/gt1l/land_ice_segments/fit_statistics",
+    ]
+    assert opened.isdisjoint({"/gt1r", "/gt2l", "/ancillary_data"})
+    # Only the changed dtype of /gt1l/land_ice_segments/h_li is found.
+    assert result.attribute_counts["difference_types"] == {"dtype"}
+    assert result.group_counts["right"] == 0
+
+
+def test_exclude_max_depth_and_ignored_attributes(hdf5_2beams_nested, hdf5_3beams_nested):
+    result = diff(
+        hdf5_2beams_nested,
+        hdf5_3beams_nested,
+        exclude=["*/land_ice_segments"],
+        show_attributes=True,
+    )
+    # The only remaining difference is the extra beam, and its (empty) contents are not compared.
+    assert result.attribute_counts["difference_types"] == set()
+    assert result.group_counts["right"] == 1
+
+    result = diff(hdf5_2beams_nested, hdf5_3beams_nested, max_depth=1)
+    assert max(group.name_a.count("/") for group in result.groups) == 1
+
+    result = diff(
+        hdf5_2beams_nested,
+        hdf5_3beams_nested,
+        show_attributes=True,
+        ignore_attributes=["units"],
+    )
+    names = {
+        prop.name for group in result.groups for var in group.variables for prop in var.properties
+    }
+    assert "units" not in names
@@ -0,0 +1,95 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import csv
+
+import h5py
+import netCDF4 as nC
+import numpy as np
+
+from ncompare.core import compare
+from ncompare.digests import data_digest, raw_digest
+from ncompare.manifest import load_manifest, write_manifest
+
+
+def test_data_digest_does_not_depend_on_chunking(nc_values_a, tmp_path):
+    rechunked_path = tmp_path / "rechunked.nc"
+    with nC.Dataset(nc_values_a) as source, nC.Dataset(rechunked_path, "w") as target:
+        for name, dim in source.dimensions.items():
+            target.createDimension(name, len(dim))
+        temperature = target.createVariable(
+            "temperature", "f8", ("time", "x"), chunksizes=(40, 3), fill_value=-999.0, zlib=True
+        )
+        temperature[:] = source["temperature"][:]
+
+    with nC.Dataset(nc_values_a) as ds_a, nC.Dataset(rechunked_path) as ds_b:
+        assert data_digest(ds_a["temperature"]) == data_digest(ds_b["temperature"])
+        assert data_digest(ds_a["temperature"], max_block_bytes=64) == data_digest(
+            ds_b["temperature"]
+        )
+
+
+def test_data_digest_finds_changes(nc_values_a, nc_values_b):
+    with nC.Dataset(nc_values_a) as ds_a, nC.Dataset(nc_values_b) as ds_b:
+        assert data_digest(ds_a["temperature"]) != data_digest(ds_b["temperature"])
+        assert data_digest(ds_a["counts"]) == data_digest(ds_b["counts"])
+        assert data_digest(ds_a["labels"]) == data_digest(ds_b["labels"])
+
+
+def test_raw_digest_of_scaled_variable(tmp_path):
+    filepath = tmp_path / "scaled.nc"
+    with nC.Dataset(filepath, "w") as ds:
+        ds.createDimension("x", 4)
+        packed = ds.createVariable("packed", "i2", ("x",))
+        packed.scale_factor = 0.5
+        packed[:] = np.array([0.0, 0.5, 1.0, 1.5])
+
+    with nC.Dataset(filepath) as ds:
+        variable = ds["packed"]
+        assert raw_digest(variable) != data_digest(variable)
+        # The decoding settings of the variable are restored.
+        assert variable.scale
+        np.testing.assert_array_equal(variable[:], [0.0, 0.5, 1.0, 1.5])
+
+
+def test_compare_digests_against_manifest(nc_values_a, nc_values_b, tmp_path):
+    manifest_path = write_manifest(nc_values_a, tmp_path / "reference.json", digests=True)
+    assert load_manifest(manifest_path).digests
+
+    compare(manifest_path, nc_values_b, digests=True, file_csv=tmp_path / "digests.csv")
+
+    with open(tmp_path / "digests.csv") as f:
+        rows = [row for row in csv.reader(f) if row and row[0] == "data digest:"]
+    # counts, labels, and temperature (in that order); only temperature changed.
+    assert [row[1] == row[2] for row in rows] == [True, True, False]
+
+
+def test_data_digest_of_dataset_without_data(tmp_path):
+    with h5py.File(tmp_path / "test_empty.h5", "w") as f:
+        f["a"] = h5py.Empty("f4")
+        f["b"] = h5py.Empty("f4")
+        f["c"] = h5py.Empty("i2")
+        assert data_digest(f["a"]) == data_digest(f["b"]) == raw_digest(f["a"])
+        assert data_digest(f["a"]) != data_digest(f["c"])
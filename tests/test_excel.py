@@ -0,0 +1,109 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+import time
+import tracemalloc
+
+import openpyxl
+import pytest
+
+from ncompare.excel import DIFFERENCE_STYLE, SUBHEADER_STYLE, ExcelWriter
+from ncompare.printing import Outputter
+
+
+def test_rows_are_styled_with_shared_named_styles(tmp_path):
+    xlsx_path = tmp_path / "styled.xlsx"
+    with ExcelWriter(xlsx_path) as writer:
+        writer.append(["shape:", "(5,)", "(6,)", "***"])
+        writer.append(["GROUP #01", "", ""])
+        writer.append(["dtype:", "int32", "int32", ""])
+
+    sheet = openpyxl.load_workbook(xlsx_path).active
+    rows = [[cell.value for cell in row] for row in sheet.iter_rows(max_col=3)]
+    assert rows[:2] == [["Info", "File A", "File B"], ["shape:", "(5,)", "(6,)"]]
+    assert [sheet.cell(2, column).style for column in (1, 2, 3)] == [DIFFERENCE_STYLE] * 3
+    assert sheet["A2"].font.color.rgb == "FFFF0000"
+    assert [sheet.cell(3, column).style for column in (1, 2, 3)] == [SUBHEADER_STYLE] * 3
+    assert sheet["A4"].style == "Normal"
+
+
+def test_sheets_are_split_by_row_limit(tmp_path):
+    xlsx_path = tmp_path / "split.xlsx"
+    with ExcelWriter(xlsx_path, max_rows=4) as writer:
+        for index in range(7):
+            writer.append([f"row {index}", "a", "b", ""])
+
+    workbook = openpyxl.load_workbook(xlsx_path)
+    assert workbook.sheetnames == ["Sheet", "Sheet (2)", "Sheet (3)"]
+    # Each sheet starts with a header row, followed by at most three rows of output.
+    assert [workbook[name].max_row for name in workbook.sheetnames] == [4, 4, 2]
+    assert workbook["Sheet (3)"]["A2"].value == "row 6"
+
+
+def test_sheets_are_split_per_group(tmp_path):
+    xlsx_path = tmp_path / "groups.xlsx"
+    with Outputter(no_color=True, xlsx_file=xlsx_path, xlsx_sheet_per_group=True) as out:
+        out.side_by_side("GROUP #00", "/", "/", dash_line=True)
+        out.side_by_side("dtype:", "int32", "int32")
+        out.side_by_side("GROUP #01", "/sub", "/sub", dash_line=True)
+        out.side_by_side("SUMMARY", "-", "-", dash_line=True)
+        # Nothing is kept in memory when only an Excel file is written.
+        assert out._line_history == []
+
+    workbook = openpyxl.load_workbook(xlsx_path)
+    assert workbook.sheetnames == ["Sheet", "GROUP #00", "GROUP #01", "SUMMARY"]
+    assert workbook["GROUP #00"]["A3"].value == "dtype:"
+
+
+def _write_benchmark_rows(filename, num_rows):
+    with ExcelWriter(filename) as writer:
+        for index in range(num_rows):
+            marker = "***" if index % 10 == 0 else ""
+            writer.append([f"variable #{index:06}", "float32", "float64", marker])
+
+
+@pytest.mark.slow
+def test_excel_export_time_and_memory_benchmark(tmp_path):
+    # Stream rows that look like comparison output, and report the cost per million rows,
+    #   so that a regression to a workbook that is held in memory (and grows with it) is caught.
+    num_rows = 20_000
+    start = time.perf_counter()
+    _write_benchmark_rows(tmp_path / "timed.xlsx", num_rows)
+    seconds_per_million = (time.perf_counter() - start) * 1_000_000 / num_rows
+
+    # Memory is traced separately (tracing slows the export down), for two numbers of rows.
+    peaks = []
+    for traced_rows in (2_500, 10_000):
+        tracemalloc.start()
+        _write_benchmark_rows(tmp_path / f"traced_{traced_rows}.xlsx", traced_rows)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(
+        f"Excel export: {seconds_per_million:.1f} s per million rows; "
+        f"peak memory {peaks[0] / 2**20:.2f} MiB for 2,500 rows "
+        f"and {peaks[1] / 2**20:.2f} MiB for 10,000 rows"
+    )
+    # The peak memory does not grow with the number of rows.
+    assert peaks[1] < 1.5 * peaks[0]
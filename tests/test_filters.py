@@ -0,0 +1,103 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+import pytest
+
+from ncompare.filters import PathFilter, PathPattern, matches_any
+
+
+def test_glob_without_leading_slash_matches_at_any_depth():
+    pattern = PathPattern("ancillary_data")
+
+    assert pattern.matches("/ancillary_data")
+    assert pattern.matches("/gt1l/ancillary_data")
+    assert not pattern.matches("/ancillary_data_2")
+
+
+def test_regex_must_match_the_whole_path():
+    pattern = PathPattern("re:/gt[12]l/.*")
+
+    assert pattern.matches("/gt1l/land_ice_segments")
+    assert not pattern.matches("/gt3l/land_ice_segments")
+    assert not pattern.matches("/x/gt1l/land_ice_segments")
+
+
+@pytest.mark.parametrize(
+    ("include", "group_path", "pruned"),
+    [
+        (["/gt1l"], "/gt1l", False),
+        (["/gt1l"], "/gt1l/land_ice_segments", False),
+        (["/gt1l"], "/gt1r", True),
+        (["/gt1l"], "/gt1lx", True),
+        (["/gt1l/land_ice_segments/h_li"], "/gt1l", False),
+        (["/gt1l/land_ice_segments/h_li"], "/gt2l", True),
+        (["/gt1*/h_li"], "/gt1r", False),
+        (["/gt1*/h_li"], "/gt2r", True),
+        (["re:/gt1l?/.*"], "/gt2l", True),
+        (["re:/gt1l?/.*"], "/gt1x", False),
+        (["re:/gt1l|/gt2l"], "/anything", False),
+        (["*/h_li"], "/anything", False),
+    ],
+)
+def test_include_prunes_groups_that_cannot_contain_a_match(include, group_path, pruned):
+    assert PathFilter(include=include).prunes(group_path) is pruned
+
+
+def test_exclude_covers_everything_under_a_group():
+    path_filter = PathFilter(exclude=["/gt1l", "*/fit_statistics"])
+
+    assert path_filter.prunes("/gt1l")
+    assert path_filter.prunes("/gt2l/land_ice_segments/fit_statistics")
+    assert not path_filter.prunes("/gt2l/land_ice_segments")
+    assert not path_filter.selects("/gt1l/land_ice_segments/h_li")
+    assert path_filter.selects("/gt2l/land_ice_segments/h_li")
+
+
+def test_include_selects_variables_under_matching_groups():
+    path_filter = PathFilter(include=["/gt1l/land_ice_segments"], exclude=["*/n_fit_photons"])
+
+    assert path_filter.selects("/gt1l/land_ice_segments/h_li")
+    assert path_filter.selects("/gt1l/land_ice_segments/fit_statistics/h_mean")
+    assert not path_filter.selects("/gt1l/land_ice_segments/fit_statistics/n_fit_photons")
+    assert not path_filter.selects("/gt1l/delta_time")
+    assert not path_filter.selects("/delta_time")
+
+
+def test_max_depth():
+    path_filter = PathFilter(max_depth=1)
+
+    assert not path_filter.prunes("/gt1l")
+    assert path_filter.prunes("/gt1l/land_ice_segments")
+    with pytest.raises(ValueError):
+        PathFilter(max_depth=-1)
+
+
+def test_empty_filter_is_falsy():
+    assert not PathFilter()
+    assert PathFilter(max_depth=0)
+
+
+def test_matches_any():
+    assert matches_any("date_created", ["history", "date_*"])
+    assert not matches_any("units", ["history", "date_*"])
@@ -1,3 +1,23 @@
+import h5py
+import numpy as np
+import pytest
+
+from ncompare.getters import (
+    LazyHdf5Hierarchy,
+    attribute_digest,
+    detach_var_properties,
+    get_root_dims,
+    get_root_groups,
+    get_subgroups,
+    get_var_properties,
+    get_variables,
+    open_dataset,
+    walk_hdf5_hierarchy,
+)
+from ncompare.utility_types import FileToCompare
+
+from . import data_for_tests_dir
+
 # def test_var_properties(ds_3dims_3vars_4coords_1group):
 #     with nc.Dataset(ds_3dims_3vars_4coords_1group) as ds:
 #         result = get_var_properties(ds.groups["Group1"], varname="step", file_type="netcdf")
@@ -14,3 +34,155 @@
 #
 #         result = get_and_check_variable_scale_factor(step_varProps, step_varProps)
 #         assert result == ("0.5", "0.5")
+
+
+def test_get_root_dims_netcdf():
+    with open_dataset(FileToCompare(data_for_tests_dir / "test_a.nc", "netcdf")) as ds:
+        assert sorted(get_root_dims(ds, "netcdf")) == [("conditions", 2), ("time", 5)]
+
+
+def test_get_root_groups_netcdf():
+    with open_dataset(FileToCompare(data_for_tests_dir / "test_a.nc", "netcdf")) as ds:
+        assert sorted(get_root_groups(ds, "netcdf")) == ["Data", "Position", "Statistics"]
+
+
+def test_get_root_dims_hdf5(temp_data_dir):
+    filepath = temp_data_dir / "test_root_dims.h5"
+    with h5py.File(filepath, "w") as f:
+        f["x"] = np.arange(4)
+        f["x"].make_scale("x")
+        f["data"] = np.zeros(4)
+        f["data"].dims[0].attach_scale(f["x"])
+        f.create_group("grp")
+
+    with open_dataset(FileToCompare(filepath, "hdf5")) as ds:
+        assert get_root_dims(ds, "hdf5") == [("x", 4)]
+        assert sorted(get_root_groups(ds, "hdf5")) == ["data", "grp", "x"]
+
+
+def test_get_root_dims_hdf5_only_reports_used_and_phony_dimensions(temp_data_dir):
+    filepath = temp_data_dir / "test_root_phony_dims.h5"
+    with h5py.File(filepath, "w") as f:
+        f["y"] = np.arange(2.0)
+        f["y"].make_scale("y")
+        f.create_dataset("unused", data=np.zeros(3)).make_scale(
+            "This is a netCDF dimension but not a netCDF variable.         3"
+        )
+        f["a"] = np.zeros(7)
+        f["b"] = np.zeros((2, 2, 7))
+        f["dangling"] = h5py.SoftLink("/nowhere")
+
+    with open_dataset(FileToCompare(filepath, "hdf5")) as ds:
+        # Unscaled axes take a scale of the same size, and then phony dimensions.
+        assert get_root_dims(ds, "hdf5") == [("phony_dim_0", 7), ("y", 2), ("phony_dim_1", 2)]
+
+
+def _write_hdf5_with_links(filepath):
+    with h5py.File(filepath, "w") as f:
+        f["g1/v"] = np.arange(3)
+        f["g2"] = f["g1"]
+        f.create_group("g3")
+        f["g3/shared"] = f["g1/v"]
+        f["soft"] = h5py.SoftLink("/g1/v")
+        f["soft_group"] = h5py.SoftLink("/g3")
+    return filepath
+
+
+@pytest.mark.parametrize("with_links", [False, True])
+def test_walk_hdf5_hierarchy_matches_per_key_lookups(temp_data_dir, hdf5_2beams_nested, with_links):
+    if with_links:
+        filepath = _write_hdf5_with_links(temp_data_dir / "test_walk_links.h5")
+    else:
+        filepath = hdf5_2beams_nested
+
+    with h5py.File(filepath, "r") as f:
+        hierarchy = walk_hdf5_hierarchy(f)
+        lazy_hierarchy = LazyHdf5Hierarchy(f)
+
+        if with_links:
+            assert hierarchy["/"] == (["g1", "g2", "g3", "soft_group"], ["soft"])
+            assert hierarchy["/g2"] == ([], ["v"])
+            assert hierarchy["/g3"] == hierarchy["/soft_group"] == ([], ["shared"])
+        else:
+            assert hierarchy["/"] == (["ancillary_data", "gt1l", "gt1r"], ["delta_time"])
+            assert hierarchy["/gt1l/land_ice_segments"] == (["fit_statistics"], ["h_li"])
+
+        def _check(group):
+            assert lazy_hierarchy[group.name] == hierarchy[group.name]
+            assert get_subgroups(group, "hdf5", hierarchy) == get_subgroups(group, "hdf5")
+            assert get_variables(group, "hdf5", hierarchy) == get_variables(group, "hdf5")
+
+        for path in hierarchy:
+            _check(f[path])
+
+
+def test_walk_hdf5_hierarchy_skips_dangling_and_cyclic_links(temp_data_dir):
+    filepath = _write_hdf5_with_links(temp_data_dir / "test_walk_cycles.h5")
+    with h5py.File(filepath, "a") as f:
+        f["dangling"] = h5py.SoftLink("/nowhere")
+        f["g3/up"] = h5py.SoftLink("/g3")
+        f["g1/root"] = f["/"]
+
+    with h5py.File(filepath, "r") as f:
+        hierarchy = walk_hdf5_hierarchy(f)
+
+        assert sorted(hierarchy) == ["/", "/g1", "/g2", "/g3", "/soft_group"]
+        assert hierarchy["/"] == (["g1", "g2", "g3", "soft_group"], ["soft"])
+        assert hierarchy["/g3"] == ([], ["shared"])
+        assert LazyHdf5Hierarchy(f)["/g2"] == ([], ["v"])
+
+
+def _write_hdf5_with_references(filepath, referenced_name):
+    with h5py.File(filepath, "w") as f:
+        f[referenced_name] = np.arange(5.0)
+        f[referenced_name].make_scale(referenced_name)
+        data = f.create_dataset("grp/data", data=np.ones((5, 3)), chunks=(5, 1))
+        data.dims[0].attach_scale(f[referenced_name])
+        data.dims[0].label = "t"
+        data.attrs["units"] = "m"
+        data.attrs["ref"] = f[referenced_name].ref
+    return filepath
+
+
+def test_get_var_properties_hdf5(temp_data_dir):
+    filepath = _write_hdf5_with_references(temp_data_dir / "test_references.h5", "time")
+
+    with h5py.File(filepath, "r") as f:
+        properties = get_var_properties(f["grp"], "data", "hdf5")
+
+        assert isinstance(properties.variable, h5py.Dataset)
+        assert properties.dtype == "float64"
+        assert properties.dimensions == "['t', '']"
+        assert properties.shape == "(5, 3)"
+        assert properties.chunking == "(5, 1)"
+        assert properties.attributes["units"] == "m"
+        # Object references are shown by name, but string arrays are not taken as references.
+        assert properties.attributes["ref"] == "/time"
+        assert properties.attributes["DIMENSION_LIST"] == "/time"
+        assert properties.attributes["DIMENSION_LABELS"] == "['t' '']"
+
+        detached = detach_var_properties(properties)
+
+    assert detached.variable is None
+    assert detached.attributes == properties.attributes
+    assert detached.dtype == properties.dtype
+
+
+def test_attribute_digest_covers_full_length_and_dtype():
+    coefficients = np.arange(5000, dtype="f8")
+    changed = coefficients.copy()
+    changed[4321] += 1e-9
+
+    assert attribute_digest(coefficients) == attribute_digest(coefficients.copy())
+    assert attribute_digest(coefficients) != attribute_digest(changed)
+    assert attribute_digest(np.arange(10, dtype="i4")) != attribute_digest(
+        np.arange(10, dtype="i8")
+    )
+    # Strings inside object arrays are hashed by value.
+    assert attribute_digest(np.array(["a", "b"], dtype=object)) == attribute_digest(
+        np.array(["a", "b"], dtype=object)
+    )
+    assert attribute_digest(["a", "b"]) != attribute_digest(["a", "c"])
+    # Strings and scalars are compared as shown, so they have no digest.
+    assert attribute_digest("meters") is None
+    assert attribute_digest(np.float32(1.5)) is None
@@ -0,0 +1,119 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import json
+
+import pytest
+
+from ncompare.core import compare
+from ncompare.manifest import load_manifest, write_manifest
+
+from . import data_for_tests_dir
+
+
+@pytest.fixture(scope="module")
+def manifest_a(temp_data_dir):
+    return write_manifest(data_for_tests_dir / "test_a.nc", temp_data_dir / "manifest_a.json")
+
+
+@pytest.fixture(scope="module")
+def manifest_b(temp_data_dir):
+    return write_manifest(data_for_tests_dir / "test_b.nc", temp_data_dir / "manifest_b.json")
+
+
+def test_manifest_round_trip(manifest_a):
+    manifest = load_manifest(manifest_a)
+
+    assert manifest.source_type == "netcdf"
+    assert sorted(manifest.root_dims) == [("conditions", 2), ("time", 5)]
+    assert sorted(manifest.groups) == ["Data", "Position", "Statistics"]
+    assert manifest["Data"].variables["level"].dtype == "int32"
+
+
+def test_zero_for_manifest_compared_with_its_own_file(manifest_a):
+    assert compare(manifest_a, data_for_tests_dir / "test_a.nc") == 0
+    assert compare(data_for_tests_dir / "test_a.nc", manifest_a) == 0
+
+
+def test_manifest_comparison_matches_file_comparison(temp_data_dir, manifest_a, manifest_b):
+    kwargs = dict(show_chunks=True, show_attributes=True)
+    from_files = compare(
+        data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc", **kwargs
+    )
+    from_manifest_a = compare(manifest_a, data_for_tests_dir / "test_b.nc", **kwargs)
+    from_manifests = compare(manifest_a, manifest_b, **kwargs)
+
+    assert from_files == from_manifest_a == from_manifests > 0
+
+
+def test_manifests_to_text_output_matches_golden_file(temp_data_dir, manifest_a, manifest_b):
+    out_path = temp_data_dir / "output_file_from_manifests.txt"
+
+    compare(manifest_a, manifest_b, show_chunks=True, show_attributes=True, file_text=out_path)
+
+    with (
+        open(data_for_tests_dir / "a-b_test_golden_file.txt") as f1,
+        open(str(out_path)) as f2,
+    ):
+        exclude_n_lines = 3
+
+        for _ in range(exclude_n_lines):
+            next(f1)
+            next(f2)
+
+        for line1, line2 in zip(f1, f2):
+            assert line1 in line2
+
+
+def test_hdf5_manifest(temp_data_dir, hdf5_2beams_nested, hdf5_3beams_nested):
+    manifest = write_manifest(hdf5_2beams_nested, temp_data_dir / "manifest_2beams.json")
+
+    assert compare(manifest, hdf5_2beams_nested, show_attributes=True) == 0
+    assert compare(manifest, hdf5_3beams_nested) == compare(hdf5_2beams_nested, hdf5_3beams_nested)
+
+
+def test_error_on_manifest_of_different_file_type(temp_data_dir, hdf5_2beams_nested):
+    manifest = write_manifest(hdf5_2beams_nested, temp_data_dir / "manifest_2beams.json")
+
+    with pytest.raises(TypeError):
+        compare(manifest, data_for_tests_dir / "test_a.nc")
+
+
+def test_error_on_invalid_manifest(temp_data_dir):
+    not_a_manifest = temp_data_dir / "not_a_manifest.json"
+    not_a_manifest.write_text(json.dumps({"hello": "world"}))
+
+    with pytest.raises(ValueError):
+        load_manifest(not_a_manifest)
+
+
+def test_save_manifests_while_comparing(temp_data_dir):
+    destination = temp_data_dir / "saved_manifest_b.json"
+
+    compare(
+        data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc", manifest_b=destination
+    )
+
+    assert compare(destination, data_for_tests_dir / "test_b.nc") == 0
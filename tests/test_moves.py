@@ -0,0 +1,130 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+import json
+
+import netCDF4
+import numpy as np
+import pytest
+
+from ncompare.core import compare, diff
+from ncompare.moves import UnmatchedVariable, pair_moved_variables
+
+
+def _unmatched(path, signature="float32"):
+    return UnmatchedVariable(path, (signature,))
+
+
+def test_pairs_moves_and_renames_by_signature():
+    only_a = [_unmatched("/g1/temp"), _unmatched("/g1/pres", "int16"), _unmatched("/g1/gone", "u1")]
+    only_b = [
+        _unmatched("/g2/pressure", "int16"),
+        _unmatched("/g2/temp"),
+        _unmatched("/g2/new", "u2"),
+    ]
+
+    pairs = pair_moved_variables(only_a, only_b)
+
+    assert [(a.path, b.path) for a, b in pairs] == [
+        ("/g1/temp", "/g2/temp"),
+        ("/g1/pres", "/g2/pressure"),
+    ]
+
+
+def test_prefers_the_same_name_and_then_the_same_group():
+    only_a = [_unmatched("/g1/temp"), _unmatched("/g1/old_name")]
+    only_b = [_unmatched("/g1/new_name"), _unmatched("/g3/other"), _unmatched("/g2/temp")]
+
+    pairs = pair_moved_variables(only_a, only_b)
+
+    assert [(a.path, b.path) for a, b in pairs] == [
+        ("/g1/temp", "/g2/temp"),
+        ("/g1/old_name", "/g1/new_name"),
+    ]
+
+
+def test_ambiguous_signatures_are_not_paired():
+    only_a = [_unmatched("/g1/x"), _unmatched("/g1/y")]
+    only_b = [_unmatched("/g2/z")]
+
+    assert pair_moved_variables(only_a, only_b) == []
+
+
+@pytest.fixture(scope="module")
+def restructured_files(temp_data_dir):
+    paths = []
+    for name, layout in (
+        ("a", {"grp1": ["temperature", "pressure", "removed"]}),
+        ("b", {"grp1": ["surface_pressure"], "grp2": ["temperature", "added"]}),
+    ):
+        paths.append(temp_data_dir / f"test_restructured_{name}.nc")
+        with netCDF4.Dataset(paths[-1], "w") as ds:
+            ds.createDimension("x", 4)
+            for group_name, varnames in layout.items():
+                group = ds.createGroup(group_name)
+                for varname in varnames:
+                    dtype = {"temperature": "f4", "removed": "i8", "added": "u1"}.get(varname, "f8")
+                    var = group.createVariable(varname, dtype, ("x",))
+                    var.units = "K" if varname == "temperature" else "hPa"
+                    var[:] = np.arange(4)
+    return paths
+
+
+def test_detect_moves_in_a_comparison(restructured_files, temp_data_dir):
+    without = diff(*restructured_files)
+    result = diff(*restructured_files, detect_moves=True)
+
+    assert [(moved.path_a, moved.path_b, moved.kind) for moved in result.moved_variables] == [
+        ("/grp1/pressure", "/grp1/surface_pressure", "renamed"),
+        ("/grp1/temperature", "/grp2/temperature", "moved"),
+    ]
+    assert result.variable_counts["left"] == without.variable_counts["left"] - 2 == 1
+    assert result.variable_counts["right"] == without.variable_counts["right"] - 2 == 1
+    assert 0 < result.total_diff_count < without.total_diff_count
+
+    ndjson_path = temp_data_dir / "test_restructured.ndjson"
+    compare(*restructured_files, detect_moves=True, file_ndjson=ndjson_path)
+    records = [json.loads(line) for line in ndjson_path.read_text().splitlines()]
+    assert [record["kind"] for record in records if record["type"] == "moved"] == [
+        "renamed",
+        "moved",
+    ]
+    assert records[-1]["moved_variables"] == 2
+
+
+def test_only_moves_leave_no_attribute_differences(temp_data_dir):
+    paths = []
+    for name, group_name in (("a", "grp1"), ("b", "grp2")):
+        paths.append(temp_data_dir / f"test_moved_only_{name}.nc")
+        with netCDF4.Dataset(paths[-1], "w") as ds:
+            ds.createDimension("x", 4)
+            var = ds.createGroup(group_name).createVariable("temperature", "f4", ("x",))
+            var.units = "K"
+
+    without = diff(*paths, show_attributes=True)
+    result = diff(*paths, show_attributes=True, detect_moves=True)
+
+    assert without.attribute_counts["difference_types"] == {"dtype", "dimensions", "shape", "units"}
+    assert result.attribute_counts["left"] == result.attribute_counts["right"] == 0
+    assert result.attribute_counts["difference_types"] == set()
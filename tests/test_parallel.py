@@ -0,0 +1,98 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import pytest
+
+from ncompare.parallel import _cgroup_cpu_quota, available_cpu_count, run_pool
+
+
+def test_available_cpu_count():
+    assert available_cpu_count() >= 1
+
+
+@pytest.mark.parametrize(
+    "proc_cgroup, files, expected",
+    [
+        # cgroup v2, in a nested cgroup (e.g., a systemd slice) whose root has no quota
+        (
+            "0::/system.slice/job.service\n",
+            {"cpu.max": "max 100000", "system.slice/job.service/cpu.max": "200000 100000"},
+            2.0,
+        ),
+        # cgroup v2, where the quota of an ancestor is smaller than that of the own cgroup
+        (
+            "0::/slice/job\n",
+            {"slice/cpu.max": "150000 100000", "slice/job/cpu.max": "max 100000"},
+            1.5,
+        ),
+        # cgroup v2, in a cgroup namespace, where the own cgroup is the root
+        ("0::/\n", {"cpu.max": "100000 100000"}, 1.0),
+        # cgroup v2, in a container whose own cgroup is mounted as the root
+        ("0::/docker/abc\n", {"cpu.max": "400000 100000"}, 4.0),
+        # cgroup v1, in a nested cgroup
+        (
+            "5:memory:/slurm/job\n4:cpu,cpuacct:/slurm/job\n",
+            {
+                "cpu/cpu.cfs_quota_us": "-1",
+                "cpu/cpu.cfs_period_us": "100000",
+                "cpu/slurm/job/cpu.cfs_quota_us": "300000",
+                "cpu/slurm/job/cpu.cfs_period_us": "100000",
+            },
+            3.0,
+        ),
+        # no quota at all
+        ("0::/user.slice\n", {"cpu.max": "max 100000"}, None),
+    ],
+)
+def test_cgroup_cpu_quota_of_own_cgroup(tmp_path, proc_cgroup, files, expected):
+    cgroup_root = tmp_path / "cgroup"
+    for name, content in files.items():
+        (cgroup_root / name).parent.mkdir(parents=True, exist_ok=True)
+        (cgroup_root / name).write_text(content)
+    (tmp_path / "proc_cgroup").write_text(proc_cgroup)
+
+    assert _cgroup_cpu_quota(cgroup_root, tmp_path / "proc_cgroup") == expected
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_pool_keeps_task_order(jobs):
+    assert run_pool(abs, [-3, 2, -1, 0], jobs=jobs) == [3, 2, 1, 0]
+
+
+_initialized = False
+
+
+def _initialize():
+    global _initialized  # pylint: disable=global-statement
+    _initialized = True
+
+
+def _is_initialized(_):
+    return _initialized
+
+
+def test_run_pool_does_not_initialize_this_process():
+    assert run_pool(_is_initialized, [0], jobs=4, initializer=_initialize) == [True]
+    assert not _initialized
@@ -0,0 +1,109 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+import pytest
+
+from ncompare.batch import PARQUET_DATASET_DIR, compare_many
+from ncompare.core import compare, diff
+from ncompare.parquet import PARQUET_COLUMNS
+
+from . import data_for_tests_dir
+
+pyarrow = pytest.importorskip("pyarrow")
+pyarrow_dataset = pytest.importorskip("pyarrow.dataset")
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+
+def test_parquet_rows_match_the_result_tree(tmp_path):
+    path_a, path_b = data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc"
+    out_path = tmp_path / "output_file.parquet"
+    compare(path_a, path_b, show_attributes=True, file_parquet=out_path)
+
+    table = pyarrow_parquet.read_table(out_path)
+    assert tuple(table.column_names) == PARQUET_COLUMNS
+
+    result = diff(path_a, path_b, show_attributes=True)
+    expected = [
+        (group.name_a, variable.name_a, prop.name, prop.value_a, prop.value_b, prop.status)
+        for group in result.groups
+        for variable in group.variables
+        for prop in variable.properties
+    ]
+    rows = table.select(
+        ["group_a", "variable_a", "property", "value_a", "value_b", "status"]
+    ).to_pylist()
+    assert [tuple(row.values()) for row in rows] == expected
+    assert set(table.column("file_a").to_pylist()) == {str(path_a)}
+
+
+def test_parquet_schema_is_typed(tmp_path):
+    out_path = tmp_path / "output_file.parquet"
+    compare(
+        data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc", file_parquet=out_path
+    )
+
+    schema = pyarrow_parquet.read_schema(out_path)
+    assert schema.field("property").type == pyarrow.string()
+    assert schema.field("status").type == pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    for name in ("num_compared", "num_mismatches"):
+        assert schema.field(name).type == pyarrow.int64()
+    for name in ("number_a", "differing_fraction", "max_abs_diff", "differing_chunks_bound"):
+        assert schema.field(name).type == pyarrow.float64()
+
+
+def test_parquet_values_and_statistics_are_numbers(nc_values_a, nc_values_b, tmp_path):
+    out_path = tmp_path / "output_file.parquet"
+    compare(nc_values_a, nc_values_b, compare_values=True, statistics=True, file_parquet=out_path)
+
+    table = pyarrow_parquet.read_table(out_path)
+    rows = table.to_pylist()
+    (values,) = [
+        row for row in rows if row["property"] == "values" and row["variable_a"] == "temperature"
+    ]
+    assert values["num_mismatches"] == 2
+    assert values["differing_fraction"] == values["num_mismatches"] / values["num_compared"]
+    assert values["max_abs_diff"] > 0
+    assert values["differing_chunks_bound"] is None
+
+    means = {row["variable_a"]: row for row in rows if row["property"] == "mean"}
+    assert isinstance(means["temperature"]["number_a"], float)
+    assert means["temperature"]["num_compared"] is None
+    assert means["labels"]["number_a"] is None
+
+
+def test_batch_comparisons_are_appended_to_one_dataset(tmp_path):
+    candidates = [tmp_path / f"candidate_{index}.nc" for index in range(3)]
+    for candidate in candidates:
+        candidate.write_bytes((data_for_tests_dir / "test_b.nc").read_bytes())
+
+    output_dir = tmp_path / "reports"
+    compare_many(
+        data_for_tests_dir / "test_a.nc", candidates, output_dir=output_dir, formats=("parquet",)
+    )
+
+    table = pyarrow_dataset.dataset(output_dir / PARQUET_DATASET_DIR).to_table()
+    assert set(table.column("file_b").to_pylist()) == {str(c) for c in candidates}
+    # The rows of each comparison are the same, as every candidate is the same file.
+    assert table.num_rows % len(candidates) == 0
+    assert "both" in table.column("status").to_pylist()
@@ -30,6 +30,7 @@ import pytest
 from ncompare.path_and_string_operations import (
     coerce_to_str,
     ensure_valid_path_exists,
+    ensure_valid_path_with_suffix,
     validate_file_type,
 )
 
@@ -54,6 +55,13 @@ def test_make_valid_path_from_Path_in_repo():
     assert isinstance(returnval, Path)
 
 
+def test_ensure_valid_path_with_suffix_keeps_compression_suffix():
+    assert ensure_valid_path_with_suffix("out", ".csv", (".gz",)) == Path("out.csv")
+    assert ensure_valid_path_with_suffix("out.csv.gz", ".csv", (".gz",)) == Path("out.csv.gz")
+    assert ensure_valid_path_with_suffix("out.gz", ".csv", (".gz",)) == Path("out.csv.gz")
+    assert ensure_valid_path_with_suffix("out.txt.gz", ".csv") == Path("out.txt.csv")
+
+
 def test_validate_file_type():
     with pytest.raises(TypeError):
         validate_file_type(Path(__file__))
@@ -23,6 +23,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and limitations under the License.
 
+from ncompare.printing import Outputter
+
 
 def test_list_of_strings_diff(outputter_to_console):
     left, right, shared = outputter_to_console.lists_diff(
@@ -30,3 +32,44 @@ def test_list_of_strings_diff(outputter_to_console):
     )
 
     assert (left, right, shared) == (2, 3, 1)
+
+
+def test_csv_rows_are_written_as_they_are_produced(tmp_path):
+    csv_path = tmp_path / "streamed.csv"
+    with Outputter(no_color=True, csv_file=csv_path) as out:
+        out.side_by_side("shape:", "(5,)", "(6,)", highlight_diff=True)
+        # Nothing is kept in memory when only a CSV file is written.
+        assert out._line_history == []
+
+    assert csv_path.read_text().splitlines() == [
+        "Info,File A,File B,Other marks",
+        'shape:,"(5,)","(6,)",***',
+    ]
+
+
+def test_console_output_is_buffered_until_flushed(tmp_path, capsys):
+    text_path = tmp_path / "output.txt"
+    with Outputter(no_color=True, text_file=text_path) as out:
+        out.print("first line")
+        out.side_by_side("shape:", "(5,)", "(6,)", highlight_diff=True)
+        assert capsys.readouterr().out == ""
+        out.flush()
+        assert capsys.readouterr().out.splitlines() == [
+            "first line",
+            f" {'shape:':>33} {'(5,)':>48} {'(6,)':>48}",
+        ]
+
+    assert text_path.read_text().splitlines()[0] == "first line"
+
+
+def test_text_file_has_no_color_codes_and_keeps_alignment(tmp_path):
+    text_path = tmp_path / "colored.txt"
+    with Outputter(text_file=text_path, column_widths=(10, 6, 6)) as out:
+        out.side_by_side("shape:", "(5,)", "(6,)", highlight_diff=True)
+        out.side_by_side("dtype:", "i4", "i4", highlight_diff=True)
+
+    lines = text_path.read_text().splitlines()
+    assert "\x1b" not in text_path.read_text()
+    assert lines[0].strip() == "shape:   (5,)   (6,)"
+    assert lines[0].endswith("     shape:   (5,)   (6,)")
+    assert lines[1] == "     dtype:     i4     i4"
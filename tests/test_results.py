@@ -0,0 +1,98 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+import pytest
+
+from ncompare.core import compare, diff
+from ncompare.printing import Outputter
+from ncompare.rendering import ResultRenderer
+from ncompare.results import ComparisonResult, PropertyDiff, VariableDiff, difference_status
+from ncompare.utility_types import ValueComparison
+
+from . import data_for_tests_dir
+
+
+@pytest.mark.parametrize(
+    "value_a, value_b, expected",
+    [
+        ("int32", "int32", "shared"),
+        ("int32", "", "left"),
+        ("", "int32", "right"),
+        ("int32", "float64", "both"),
+        (0, 3, "right"),
+    ],
+)
+def test_difference_status(value_a, value_b, expected):
+    assert difference_status(value_a, value_b) == expected
+
+
+def test_diff_returns_a_result_tree_without_printing(capsys):
+    result = diff(
+        data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc", show_attributes=True
+    )
+
+    assert capsys.readouterr().out == ""
+    assert isinstance(result, ComparisonResult)
+    assert [group.index for group in result.groups] == list(range(len(result.groups)))
+    assert result.groups[0].name_a == result.groups[0].name_b == "/"
+    assert "/Statistics" in [group.name_a for group in result.groups]
+
+    # The tree holds the same differences that `compare` displays and counts.
+    assert result.total_diff_count == compare(
+        data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc", show_attributes=True
+    )
+    differing = {
+        (variable.name_a, prop.name)
+        for group in result.groups
+        for variable in group.variables
+        for prop in variable.properties
+        if prop.status != "shared"
+    }
+    assert differing
+    assert {name for _, name in differing} == result.attribute_counts["difference_types"]
+
+
+def test_variable_with_differing_values_has_differences():
+    properties = [PropertyDiff("dtype", "int32", "int32", "shared")]
+    assert not VariableDiff("x", "x", properties).has_differences
+    assert VariableDiff(
+        "x", "x", properties, values=ValueComparison(4, 1, 1.0, 1.0, (0,))
+    ).has_differences
+
+
+def test_rendering_a_result_matches_the_streamed_output(tmp_path):
+    result = diff(data_for_tests_dir / "test_a.nc", data_for_tests_dir / "test_b.nc")
+    rendered_path = tmp_path / "rendered.txt"
+    with Outputter(no_color=True, text_file=rendered_path) as out:
+        ResultRenderer(out).render(result)
+
+    streamed_path = tmp_path / "streamed.txt"
+    compare(
+        data_for_tests_dir / "test_a.nc",
+        data_for_tests_dir / "test_b.nc",
+        no_color=True,
+        file_text=streamed_path,
+    )
+    # The streamed output also has a header with the file names, and a closing line.
+    assert rendered_path.read_text() in streamed_path.read_text()
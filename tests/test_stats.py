@@ -0,0 +1,93 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import csv
+
+import h5py
+import netCDF4 as nC
+import numpy as np
+import pytest
+
+from ncompare.core import compare
+from ncompare.manifest import load_manifest, write_manifest
+from ncompare.stats import RunningStatistics, variable_statistics
+
+
+def test_running_statistics_match_numpy():
+    rng = np.random.default_rng(42)
+    values = rng.normal(loc=1e6, scale=3.0, size=10_000)
+
+    statistics = RunningStatistics()
+    for block in np.array_split(values, 37):
+        statistics.update(block)
+    result = statistics.result()
+
+    assert result.minimum == values.min()
+    assert result.maximum == values.max()
+    assert result.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert result.std == pytest.approx(values.std(), rel=1e-9)
+
+
+def test_variable_statistics_of_netcdf(nc_values_a):
+    with nC.Dataset(nc_values_a) as ds:
+        result = variable_statistics(ds["temperature"], max_block_bytes=64)
+        assert variable_statistics(ds["labels"]) is None
+
+    # The value at index (0, 0) is NaN, and the value at index (1, 1) is masked.
+    valid = np.delete(np.arange(1200, dtype="f8"), [0, 31])
+    assert result.nan_count == 1
+    assert result.fill_count == 1
+    assert result.minimum == valid.min()
+    assert result.maximum == valid.max()
+    assert result.mean == pytest.approx(valid.mean())
+    assert result.std == pytest.approx(valid.std())
+
+
+def test_variable_statistics_of_hdf5_with_fill_value(tmp_path):
+    with h5py.File(tmp_path / "fill.h5", "w") as f:
+        dataset = f.create_dataset("h_li", data=np.array([1.0, 2.0, 3.4e38, 3.0], dtype="f4"))
+        dataset.attrs["_FillValue"] = np.array([3.4e38], dtype="f4")
+        result = variable_statistics(dataset)
+
+    assert result.fill_count == 1
+    assert (result.minimum, result.maximum, result.mean) == (1.0, 3.0, 2.0)
+
+
+def test_compare_statistics_against_manifest(nc_values_a, nc_values_b, tmp_path):
+    manifest_path = write_manifest(nc_values_a, tmp_path / "reference.json", statistics=True)
+    assert load_manifest(manifest_path).statistics
+
+    compare(manifest_path, nc_values_b, statistics=True, file_csv=tmp_path / "statistics.csv")
+
+    with open(tmp_path / "statistics.csv") as f:
+        rows = [row for row in csv.reader(f) if row and row[0] in ("max:", "mean:")]
+    # counts, labels (not numeric), and temperature (in that order); only its mean changed.
+    assert [row[1] == row[2] for row in rows] == [True, True, True, True, True, False]
+
+
+def test_variable_statistics_of_dataset_without_data(tmp_path):
+    with h5py.File(tmp_path / "test_empty.h5", "w") as f:
+        f["empty"] = h5py.Empty("f8")
+        assert variable_statistics(f["empty"]) is None
@@ -0,0 +1,311 @@
+# Copyright 2024 United States Government as represented by the Administrator of the
+# National Aeronautics and Space Administration. All Rights Reserved.
+#
+# This software calls the following third-party software,
+# which is subject to the terms and conditions of its licensor, as applicable.
+# Users must license their own copies; the links are provided for convenience only.
+#
+# colorama - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# netCDF4 - MIT License - https://opensource.org/licenses/MIT
+# numpy - BSD-3-Clause - https://opensource.org/licenses/BSD-3-Clause
+# openpyxl - MIT License - https://opensource.org/licenses/MIT
+# xarray - Apache License, version 2.0 - https://www.apache.org/licenses/LICENSE-2.0
+# Python Standard Library - Python Software Foundation (PSF) License Agreement-
+#   https://docs.python.org/3/license.html#psf-license
+#
+# The ncompare: NetCDF structural comparison tool platform is licensed under the
+# Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and limitations under the License.
+
+import csv
+
+import h5py
+import netCDF4 as nC
+import numpy as np
+import pytest
+
+import ncompare.Comparison
+import ncompare.values
+from ncompare.core import compare
+from ncompare.values import (
+    block_shape,
+    compare_values,
+    differing_fraction_bound,
+    have_same_stored_layout,
+    iter_blocks,
+    sample_blocks,
+)
+
+
+def test_block_shape_is_aligned_with_chunks():
+    assert block_shape((40, 30), itemsize=8, chunks=(8, 10), max_block_bytes=8 * 80) == (8, 10)
+    assert block_shape((40, 30), itemsize=8, chunks=(8, 10), max_block_bytes=8 * 160) == (16, 10)
+
+
+def test_block_shape_without_chunks_is_bounded():
+    assert block_shape((40, 30), itemsize=8, max_block_bytes=8 * 90) == (3, 30)
+    assert block_shape((40, 30), itemsize=8, max_block_bytes=8 * 10) == (1, 10)
+    assert block_shape((), itemsize=8) == ()
+
+
+def test_iter_blocks_covers_array():
+    covered = np.zeros((7, 5), dtype=int)
+    for slices in iter_blocks((7, 5), (3, 2)):
+        covered[slices] += 1
+    assert (covered == 1).all()
+
+
+def test_compare_values_identical(nc_values_a):
+    with nC.Dataset(nc_values_a) as ds:
+        result = compare_values(ds["temperature"], ds["temperature"])
+
+    assert result.num_compared == 1200
+    assert result.num_mismatches == 0
+    assert result.first_diff_index is None
+
+
+@pytest.mark.parametrize("max_block_bytes", [64, 1024 * 1024])
+def test_compare_values_finds_differences(nc_values_a, nc_values_b, max_block_bytes):
+    with nC.Dataset(nc_values_a) as ds_a, nC.Dataset(nc_values_b) as ds_b:
+        result = compare_values(
+            ds_a["temperature"], ds_b["temperature"], max_block_bytes=max_block_bytes
+        )
+
+    assert result.num_mismatches == 2
+    assert result.max_abs_diff == pytest.approx(0.5)
+    assert result.max_rel_diff == pytest.approx(0.5 / 305)
+    assert result.first_diff_index == (10, 5)
+
+
+def test_compare_values_with_tolerance(nc_values_a, nc_values_b):
+    with nC.Dataset(nc_values_a) as ds_a, nC.Dataset(nc_values_b) as ds_b:
+        assert (
+            compare_values(ds_a["temperature"], ds_b["temperature"], atol=1e-6).num_mismatches == 1
+        )
+        assert (
+            compare_values(ds_a["temperature"], ds_b["temperature"], rtol=0.01).num_mismatches == 0
+        )
+        assert compare_values(ds_a["labels"], ds_b["labels"]).num_mismatches == 0
+        assert compare_values(ds_a["counts"], ds_b["temperature"]) is None
+
+
+def test_compare_values_of_large_integers_exactly(tmp_path):
+    with h5py.File(tmp_path / "a.h5", "w") as file_a, h5py.File(tmp_path / "b.h5", "w") as file_b:
+        file_a["ids"] = np.array([2**60, 7], dtype=np.int64)
+        file_b["ids"] = np.array([2**60 + 1, 7], dtype=np.int64)
+
+        result = compare_values(file_a["ids"], file_b["ids"])
+        assert result.num_mismatches == 1
+        assert result.max_abs_diff == 1.0
+        assert result.first_diff_index == (0,)
+        assert compare_values(file_a["ids"], file_b["ids"], atol=1).num_mismatches == 0
+
+
+def test_compare_with_values_in_outputs(nc_values_a, nc_values_b, tmp_path):
+    total_diff_count = compare(
+        nc_values_a,
+        nc_values_b,
+        compare_values=True,
+        file_csv=tmp_path / "values.csv",
+    )
+
+    assert total_diff_count == 1
+    with open(tmp_path / "values.csv") as f:
+        rows = list(csv.reader(f))
+    assert ["value mismatches:", "2 of 1200", "2 of 1200", "***"] in rows
+    assert ["first difference at index:", "(10, 5)", "(10, 5)", "***"] in rows
+    assert ["values:", "equal (40 compared)", "equal (40 compared)", ""] in rows
+
+
+def test_compare_hdf5_values(hdf5_2beams_nested, hdf5_3beams_nested, tmp_path):
+    structure_only = compare(hdf5_2beams_nested, hdf5_3beams_nested)
+    with_values = compare(
+        hdf5_2beams_nested, hdf5_3beams_nested, compare_values=True, file_csv=tmp_path / "h5.csv"
+    )
+
+    # The datasets that changed in type still hold the same values.
+    assert with_values == structure_only
+    with open(tmp_path / "h5.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows.count(["values:", "equal (5 compared)", "equal (5 compared)", ""]) == 5
+    assert ["values:", "equal (1 compared)", "equal (1 compared)", ""] in rows
+
+
+@pytest.mark.parametrize(
+    "fixture_names", [("nc_values_a", "nc_values_b"), ("hdf5_2beams_nested", "hdf5_3beams_nested")]
+)
+def test_parallel_value_comparison_matches_sequential(request, tmp_path, fixture_names):
+    path_a, path_b = (request.getfixturevalue(name) for name in fixture_names)
+    sequential = compare(
+        path_a, path_b, compare_values=True, jobs=1, file_csv=tmp_path / "sequential.csv"
+    )
+    parallel = compare(
+        path_a, path_b, compare_values=True, jobs=2, file_csv=tmp_path / "parallel.csv"
+    )
+
+    assert parallel == sequential
+    assert (tmp_path / "parallel.csv").read_text() == (tmp_path / "sequential.csv").read_text()
+
+
+def test_parallel_value_comparison_plans_the_traversed_variables(monkeypatch, tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        paths.append(tmp_path / f"test_planned_{name}.h5")
+        with h5py.File(paths[-1], "w") as f:
+            f["grp/x"] = np.arange(4.0)
+            f["grp/y"] = np.zeros(4)
+            f["grp/dangling"] = h5py.SoftLink("/nowhere")
+
+    planned = []
+    original_run_pool = ncompare.Comparison.run_pool
+
+    def _run_pool(function, tasks, **kwargs):
+        planned.extend(task[:2] for task in tasks)
+        return original_run_pool(function, tasks, **kwargs)
+
+    monkeypatch.setattr(ncompare.Comparison, "run_pool", _run_pool)
+
+    assert compare(*paths, compare_values=True, jobs=2) == 0
+    assert planned == [("/grp/x", "/grp/x"), ("/grp/y", "/grp/y")]
+
+
+def test_parallel_value_comparison_leaves_no_files_open(nc_values_a, nc_values_b):
+    compare(nc_values_a, nc_values_b, compare_values=True, jobs=4, include=["/temperature"])
+    assert ncompare.values._worker_files == ()
+
+
+def _write_chunked_h5(filepath, values, **kwargs):
+    with h5py.File(filepath, "w") as f:
+        f.create_dataset("data", data=values, chunks=(10, 10), **kwargs)
+    return filepath
+
+
+def test_identical_stored_chunks_are_not_decompressed(monkeypatch, tmp_path):
+    values = np.arange(40 * 30, dtype="f8").reshape(40, 30)
+    changed = values.copy()
+    changed[25, 12] = -1.0
+    path_a = _write_chunked_h5(tmp_path / "a.h5", values, compression="gzip")
+    path_b = _write_chunked_h5(tmp_path / "b.h5", changed, compression="gzip")
+
+    decoded_blocks = []
+    original_compare_block = ncompare.values._compare_block
+
+    def _counting_compare_block(values_a, values_b, atol, rtol):
+        decoded_blocks.append(values_a.shape)
+        return original_compare_block(values_a, values_b, atol, rtol)
+
+    monkeypatch.setattr(ncompare.values, "_compare_block", _counting_compare_block)
+    with h5py.File(path_a) as ds_a, h5py.File(path_b) as ds_b:
+        assert have_same_stored_layout(ds_a["data"], ds_b["data"])
+        result = compare_values(ds_a["data"], ds_b["data"])
+
+    # Only the one chunk (out of 12) whose stored bytes differ is decompressed.
+    assert decoded_blocks == [(10, 10)]
+    assert result.num_compared == 1200
+    assert result.num_mismatches == 1
+    assert result.first_diff_index == (25, 12)
+
+
+def test_different_filters_fall_back_to_decoded_values(tmp_path):
+    values = np.arange(40 * 30, dtype="f8").reshape(40, 30)
+    path_a = _write_chunked_h5(tmp_path / "a.h5", values, compression="gzip")
+    path_b = _write_chunked_h5(tmp_path / "b.h5", values, compression="lzf")
+
+    with h5py.File(path_a) as ds_a, h5py.File(path_b) as ds_b:
+        assert not have_same_stored_layout(ds_a["data"], ds_b["data"])
+        result = compare_values(ds_a["data"], ds_b["data"])
+
+    assert result.num_compared == 1200
+    assert result.num_mismatches == 0
+
+
+def test_sample_blocks_are_reproducible():
+    def _sample(seed):
+        return [
+            tuple((s.start, s.stop) for s in slices)
+            for slices in sample_blocks((40, 30), (8, 10), 4, np.random.default_rng(seed))
+        ]
+
+    assert _sample(1) == _sample(1)
+    assert len(set(_sample(1))) == 4
+    assert _sample(1) != _sample(2)
+
+
+def test_differing_fraction_bound():
+    assert differing_fraction_bound(100, 0) == pytest.approx(0.0295, abs=1e-4)
+    assert 0.05 < differing_fraction_bound(100, 5) < 0.12
+    assert differing_fraction_bound(0, 0) == 1.0
+
+
+@pytest.mark.parametrize(
+    "budget", [{"sample_fraction": 0.19}, {"sample_bytes": 3 * 8 * 80}, {"sample_fraction": 1.0}]
+)
+def test_sampled_value_comparison(nc_values_a, nc_values_b, budget):
+    with nC.Dataset(nc_values_a) as ds_a, nC.Dataset(nc_values_b) as ds_b:
+        results = [
+            compare_values(ds_a["temperature"], ds_b["temperature"], seed=seed, **budget)
+            for seed in (0, 0, 1)
+        ]
+
+    assert results[0] == results[1]
+    if budget.get("sample_fraction") == 1.0:
+        assert results[0].coverage == 1.0
+        assert results[0].differing_chunks_bound is None
+        assert results[0].num_mismatches == 2
+    else:
+        # 3 of the 15 chunks, of 80 values each.
+        assert all(result.num_compared == 240 for result in results)
+        assert results[0].coverage == pytest.approx(0.2)
+        assert 0 < results[0].differing_chunks_bound < 1
+
+
+def test_sample_budget_must_be_valid(nc_values_a):
+    with nC.Dataset(nc_values_a) as ds, pytest.raises(ValueError):
+        compare_values(ds["temperature"], ds["temperature"], sample_fraction=1.5)
+
+
+def test_compare_with_sampled_values(nc_values_a, nc_values_b, tmp_path):
+    compare(
+        nc_values_a,
+        nc_values_b,
+        compare_values=True,
+        sample_fraction=0.5,
+        file_csv=tmp_path / "sampled.csv",
+    )
+
+    with open(tmp_path / "sampled.csv") as f:
+        labels = [row[0] for row in csv.reader(f) if row]
+    assert "sampled coverage:" in labels
+    assert "95% bound, differing chunks:" in labels
+
+
+def test_datasets_without_data_are_not_compared(tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        paths.append(tmp_path / f"test_empty_{name}.h5")
+        with h5py.File(paths[-1], "w") as f:
+            f["empty"] = h5py.Empty("f4")
+            f["data"] = np.arange(3.0)
+
+    with h5py.File(paths[0], "r") as f:
+        assert compare_values(f["empty"], f["empty"]) is None
+
+    for jobs in (1, 2):
+        assert (
+            compare(
+                *paths,
+                compare_values=True,
+                digests=True,
+                statistics=True,
+                jobs=jobs,
+                file_csv=tmp_path / "empty.csv",
+            )
+            == 0
+        )
+        assert "not compared (no data)" in (tmp_path / "empty.csv").read_text()